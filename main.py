@@ -6,18 +6,35 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from dotenv import load_dotenv
+from src.piv.graph.checkpoint import DEFAULT_CHECKPOINT_PATH, invoke_checkpointed, open_checkpointer
 from src.piv.graph.graph import build_graph
-from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.graph.tracing import write_trace
+from src.piv.llm.client_pool import get_llm
+from src.piv.io.text_cache import WorkbookTextCache
+from src.piv.llm.telemetry import TELEMETRY
 
-def run_pipeline(xlsx_path: str, prompts_dir: str = None):
+def run_pipeline(xlsx_path: str, prompts_dir: str = None, cache_dir: str = None, llm_cache: str = None,
+                 metrics_out: str = None, deadline: float = None, fail_fast: bool = False, resume: bool = False,
+                 checkpoint_db: str = None, trace_out: str = None, trace_memory: bool = False):
     if prompts_dir is None:
         prompts_dir = Path(__file__).parent / "prompts"
     else:
         prompts_dir = Path(prompts_dir).resolve()
     
     load_dotenv()
-    llm = AzureOpenAILLM()
+    # Shared per process: runs over many files reuse the client and its warm connections
+    llm = get_llm(cache_path=llm_cache)
     context = {"llm": llm, "prompts_dir": str(prompts_dir)}
+    if cache_dir:
+        context["text_cache"] = WorkbookTextCache(cache_dir)
+    if deadline:
+        context["deadline_s"] = deadline
+    if fail_fast:
+        context["fail_fast"] = True
+    if resume or checkpoint_db:
+        context["checkpointer"] = open_checkpointer(checkpoint_db or DEFAULT_CHECKPOINT_PATH)
+    if trace_memory:
+        context["trace_memory"] = True
     graph = build_graph(context)
     initial = {
         "source_path": str(Path(xlsx_path).resolve()),
@@ -26,8 +43,15 @@ def run_pipeline(xlsx_path: str, prompts_dir: str = None):
         "validation": {},
         "final_feedback": None,
     }
-    out = graph.invoke(initial)
+    if "checkpointer" in context:
+        out = invoke_checkpointed(graph, initial, resume=resume, deadline_s=deadline)
+    else:
+        out = graph.invoke(initial)
     print(out["final_feedback"])
+    if metrics_out:
+        TELEMETRY.write(metrics_out)
+    if trace_out:
+        write_trace(out.get("timings", []), trace_out)
     return out
 
 if __name__ == "__main__":
@@ -35,5 +59,21 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Project Intake Validator (Azure OpenAI)")
     parser.add_argument("xlsx_path")
     parser.add_argument("--prompts_dir", default=None)
+    parser.add_argument("--cache_dir", default=None, help="Reuse extracted workbook text cached in this directory")
+    parser.add_argument("--llm_cache", default=None, help="SQLite file caching LLM responses across runs")
+    parser.add_argument("--metrics_out", default=None,
+                        help="Write LLM call metrics here (.prom for Prometheus text, otherwise JSON)")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Time budget in seconds per document; LLM calls still running past it are cancelled")
+    parser.add_argument("--fail_fast", action="store_true",
+                        help="Stop validating at the first section with an error (triage runs)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the checkpoint for this workbook instead of starting over")
+    parser.add_argument("--checkpoint_db", default=None,
+                        help="SQLite checkpoint file (default .piv_cache/checkpoints.sqlite; implied by --resume)")
+    parser.add_argument("--trace_out", default=None,
+                        help="Write per-node spans here (.prom for Prometheus text, otherwise Chrome trace JSON)")
+    parser.add_argument("--trace_memory", action="store_true", help="Also record allocation peaks per node")
     args = parser.parse_args()
-    run_pipeline(args.xlsx_path, args.prompts_dir)
+    run_pipeline(args.xlsx_path, args.prompts_dir, args.cache_dir, args.llm_cache, args.metrics_out, args.deadline,
+                 args.fail_fast, args.resume, args.checkpoint_db, args.trace_out, args.trace_memory)
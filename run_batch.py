@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+# Add current directory to path to allow relative imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+import json
+from dotenv import load_dotenv
+from src.piv.batch.files import collect_workbooks
+from src.piv.batch.runner import DEFAULT_MAX_IN_FLIGHT, run_batch
+from src.piv.graph.checkpoint import DEFAULT_CHECKPOINT_PATH, open_checkpointer
+from src.piv.graph.graph import build_graph
+from src.piv.graph.tracing import write_trace
+from src.piv.llm.client_pool import get_llm
+from src.piv.llm.telemetry import TELEMETRY
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Validate a directory of intakes in one process, streaming NDJSON")
+    parser.add_argument("inputs", help="Directory of .xlsx files or a glob pattern")
+    parser.add_argument("--out", default="-", help="NDJSON output file ('-' for stdout)")
+    parser.add_argument("--prompts_dir", default=None)
+    parser.add_argument("--parse_workers", type=int, default=None, help="Workbook parsing processes (CPU count)")
+    parser.add_argument("--max_in_flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="Documents extracted concurrently")
+    parser.add_argument("--cache_dir", default=None, help="Reuse extracted workbook text cached in this directory")
+    parser.add_argument("--llm_cache", default=None, help="SQLite file caching LLM responses across runs")
+    parser.add_argument("--deadline", type=float, default=None, help="Time budget in seconds per document")
+    parser.add_argument("--fail_fast", action="store_true", help="Stop validating at the first section with an error")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from checkpoints: parsed and extracted workbooks are only re-validated")
+    parser.add_argument("--checkpoint_db", default=None,
+                        help="SQLite checkpoint file (default .piv_cache/checkpoints.sqlite; implied by --resume)")
+    parser.add_argument("--trace_out", default=None,
+                        help="Write per-node spans here (.prom for Prometheus text, otherwise Chrome trace JSON)")
+    parser.add_argument("--trace_memory", action="store_true", help="Also record allocation peaks per node")
+    parser.add_argument("--metrics_out", default=None,
+                        help="Write LLM call metrics here (.prom for Prometheus text, otherwise JSON)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    prompts_dir = Path(args.prompts_dir).resolve() if args.prompts_dir else Path(__file__).parent / "prompts"
+    context = {"llm": get_llm(cache_path=args.llm_cache), "prompts_dir": str(prompts_dir)}
+    if args.deadline:
+        context["deadline_s"] = args.deadline
+    if args.fail_fast:
+        context["fail_fast"] = True
+    if args.resume or args.checkpoint_db:
+        context["checkpointer"] = open_checkpointer(args.checkpoint_db or DEFAULT_CHECKPOINT_PATH)
+    if args.trace_memory:
+        context["trace_memory"] = True
+    graph = build_graph(context)
+
+    paths = collect_workbooks(args.inputs)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    spans = []
+    try:
+        summary = run_batch(paths, graph, out, parse_workers=args.parse_workers, max_in_flight=args.max_in_flight,
+                            cache_dir=args.cache_dir, resume=args.resume, deadline_s=args.deadline, trace=spans)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    # Summary on stderr so stdout stays valid NDJSON
+    print(f"{summary['files']} workbooks in {summary['elapsed_s']}s ({summary['files_per_s']} files/s), "
+          f"{summary['failed']} failed; stage seconds {json.dumps(summary['stage_s'])}, "
+          f"node seconds {json.dumps(summary['node_s'])}", file=sys.stderr)
+    if args.trace_out:
+        write_trace(spans, args.trace_out)
+    if args.metrics_out:
+        TELEMETRY.write(args.metrics_out)
+
+
+if __name__ == "__main__":
+    main()
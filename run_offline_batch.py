@@ -0,0 +1,42 @@
+
+import sys
+from pathlib import Path
+
+# Add current directory to path to allow relative imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+from src.piv.batch.backends import AzureBatchBackend, LocalBatchBackend
+from src.piv.batch.files import collect_workbooks
+from src.piv.batch.offline import run_offline_batch
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Validate a backlog of intakes through the Azure OpenAI Batch API")
+    parser.add_argument("inputs", help="Directory of .xlsx files or a glob pattern")
+    parser.add_argument("--work_dir", default=".piv_batch", help="Requests, results and resume state live here")
+    parser.add_argument("--prompts_dir", default=None)
+    parser.add_argument("--poll_interval", type=float, default=60.0)
+    parser.add_argument("--timeout", type=float, default=None, help="Stop polling after this many seconds; rerun to resume")
+    parser.add_argument("--local", action="store_true",
+                        help="Use the file-based stand-in backend answered by the PIV_LLM_MODE client")
+    args = parser.parse_args()
+
+    load_dotenv()
+    prompts_dir = Path(args.prompts_dir).resolve() if args.prompts_dir else Path(__file__).parent / "prompts"
+    if args.local:
+        from src.piv.llm.factory import create_llm
+        backend = LocalBatchBackend.from_llm(Path(args.work_dir) / "local_backend", create_llm())
+    else:
+        backend = AzureBatchBackend()
+
+    paths = collect_workbooks(args.inputs)
+    results = run_offline_batch(paths, args.work_dir, backend, str(prompts_dir),
+                                poll_interval=args.poll_interval, timeout=args.timeout)
+    failed = sum(1 for rec in results.values() if rec["error"] is not None)
+    print(f"{len(results)}/{len(paths)} workbooks finished, {failed} with errors; results in {Path(args.work_dir) / 'results.jsonl'}")
+
+
+if __name__ == "__main__":
+    main()
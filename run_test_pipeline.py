@@ -7,11 +7,11 @@ load_dotenv()
 import sys
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
-from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.factory import create_llm
 from src.piv.graph.graph import build_graph
 
 print('Initializing LLM...')
-llm = AzureOpenAILLM()
+llm = create_llm()
 print('Building graph...')
 PROMPTS_DIR = Path(__file__).parent / 'prompts'
 context = {'llm': llm, 'prompts_dir': str(PROMPTS_DIR)}
@@ -0,0 +1,26 @@
+from .header_agent import validate_header
+from .business_case_agent import validate_business_case
+from .problem_agent import validate_problem
+from .scope_agent import validate_scope
+from .expected_benefits_agent import validate_expected_benefits
+from .rules import compile_rules, load_rules
+
+# Hand-written validators, kept as the reference the rule spec is checked against
+LEGACY_VALIDATORS = {
+    "header": validate_header,
+    "business_case": validate_business_case,
+    "problem_statement": validate_problem,
+    "project_scope": validate_scope,
+    "expected_benefits": validate_expected_benefits,
+}
+
+# Section key in the extracted JSON -> validator, in report order; compiled once from
+# validation_rules.json (or PIV_VALIDATION_RULES) so rule changes need no code edits
+SECTION_VALIDATORS = compile_rules(load_rules())
+
+
+def validate_sections(sections, validators=None):
+    """Run every section validator outside the graph; returns {section key: ValidationResult}."""
+    sections = sections if isinstance(sections, dict) else {}
+    validators = validators or SECTION_VALIDATORS
+    return {key: validator(sections.get(key, {})) for key, validator in validators.items()}
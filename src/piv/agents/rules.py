@@ -0,0 +1,142 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import json
+import os
+from logger import CustomLogger
+from exception import ValidationException
+from .base import ValidationResult, ValidationIssue
+from .header_agent import _is_valid_date
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("validation_rules.json")
+
+# Keys of a field rule that are not checks
+_FIELD_KEYS = ("field", "path", "label", "required")
+
+
+def load_rules(path=None):
+    """Load a rule spec (JSON, or YAML when PyYAML is installed).
+
+    `path` defaults to PIV_VALIDATION_RULES, else the bundled validation_rules.json.
+    The spec maps section keys to ordered field rules, e.g.::
+
+        {"field": "Why now", "required": "Missing 'Why now'",
+         "min_length": {"min": 30, "severity": "WARNING", "message": "Answer is weak or too short"}}
+
+    A check given as a plain string is an ERROR with that message. Supported
+    checks: ``required``, ``min_length`` (``min``), ``keywords`` (``any``,
+    case-insensitive substrings), ``date`` and ``url``. Nested fields use
+    ``path`` (a list of keys) plus a ``label`` for the reported field name.
+    """
+    path = Path(path or os.getenv("PIV_VALIDATION_RULES") or DEFAULT_RULES_PATH)
+    try:
+        text = path.read_text(encoding="utf-8")
+        if path.suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ValidationException("YAML rule specs need PyYAML installed", e) from e
+            return yaml.safe_load(text)
+        return json.loads(text)
+    except ValidationException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to load validation rules: %s", path)
+        raise ValidationException(f"Failed to load validation rules: {path}", e) from e
+
+
+def _check(spec, default_severity="ERROR"):
+    """Normalise a check to ``(severity, message, options)``."""
+    if isinstance(spec, str):
+        return default_severity, spec, {}
+    return spec.get("severity", default_severity), spec["message"], spec
+
+
+def _predicate(kind, options):
+    """Return a function of the stripped value that is True when the check fails."""
+    if kind == "min_length":
+        minimum = int(options["min"])
+        return lambda value: len(value) < minimum
+    if kind == "keywords":
+        keywords = tuple(k.lower() for k in options["any"])
+        return lambda value: not any(k in value.lower() for k in keywords)
+    if kind == "date":
+        return lambda value: not _is_valid_date(value)
+    if kind == "url":
+        # A plain http(s) URL or a markdown-style embedded link such as "PROJ-1 (https://...)"
+        return lambda value: not (value.startswith(("http://", "https://")) or "(http" in value)
+    raise ValidationException(f"Unknown validation check '{kind}'")
+
+
+def _getter(rule):
+    path = tuple(rule["path"]) if "path" in rule else (rule["field"],)
+
+    def get(fields):
+        node = fields
+        for key in path:
+            if not isinstance(node, dict):
+                return ""
+            node = node.get(key)
+        if not node:
+            return ""
+        return node.strip() if isinstance(node, str) else str(node).strip()
+    return get
+
+
+def compile_section(section_key, rules):
+    """Compile one section's field rules into a validator ``section -> ValidationResult``."""
+    compiled = []
+    for rule in rules:
+        label = rule.get("label") or rule.get("field") or ":".join(rule["path"])
+        required = _check(rule["required"]) if "required" in rule else None
+        checks = []
+        for kind, spec in rule.items():
+            if kind in _FIELD_KEYS:
+                continue
+            severity, message, options = _check(spec)
+            checks.append((_predicate(kind, options), severity, message))
+        compiled.append((label, _getter(rule), required, tuple(checks)))
+    compiled = tuple(compiled)
+
+    def validate(section):
+        try:
+            if not isinstance(section, dict):
+                section = {}
+            fields = section.get("fields") or {}
+            if not isinstance(fields, dict):
+                fields = {}
+            issues = []
+            for label, get, required, checks in compiled:
+                value = get(fields)
+                if not value:
+                    if required is not None:
+                        issues.append(ValidationIssue(field=label, severity=required[0], description=required[1]))
+                    continue
+                for failed, severity, message in checks:
+                    if failed(value):
+                        issues.append(ValidationIssue(field=label, severity=severity, description=message))
+                        break
+            return ValidationResult(passed=not any(i.severity == "ERROR" for i in issues), issues=issues)
+        except Exception as e:
+            logger.exception("Unhandled exception validating %s", section_key)
+            raise ValidationException(f"validate {section_key} failed", e) from e
+
+    validate.__name__ = f"validate_{section_key}"
+    return validate
+
+
+def compile_rules(spec):
+    """Compile a whole spec once into ``{section key: validator}``, in spec order."""
+    try:
+        return {section_key: compile_section(section_key, rules) for section_key, rules in spec.items()}
+    except ValidationException:
+        raise
+    except Exception as e:
+        logger.exception("Invalid validation rule spec")
+        raise ValidationException("compile_rules failed", e) from e
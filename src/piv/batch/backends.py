@@ -0,0 +1,150 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import json
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from logger import CustomLogger
+from exception import ValidationException
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Batch states (names follow the OpenAI Batch API)
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchBackend(ABC):
+    """Submits a JSONL file of chat-completion requests and returns one output line per request.
+
+    Output lines follow the OpenAI Batch API format:
+    ``{"custom_id": ..., "response": {"status_code": ..., "body": {...}}, "error": ...}``.
+    """
+
+    @abstractmethod
+    def submit(self, requests_path: str) -> str:
+        """Upload the requests file and start a batch; returns the batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Current batch status, e.g. "in_progress" or one of TERMINAL_STATUSES."""
+
+    @abstractmethod
+    def results(self, batch_id: str):
+        """Iterate the output (and error) lines of a finished batch as dicts."""
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for the batch service, used for tests and dry runs.
+
+    `submit` copies the requests file under `root_dir/<batch_id>/`; the batch is
+    worked off on the first `status` call by passing each request body to
+    `responder(body) -> str` (the assistant message content). A responder that
+    raises produces an error line for that request only.
+    """
+
+    def __init__(self, root_dir, responder):
+        self.root_dir = Path(root_dir)
+        self.responder = responder
+
+    @classmethod
+    def from_llm(cls, root_dir, llm):
+        """Answer requests with a synchronous `complete_json` client."""
+        def responder(body):
+            messages = {m["role"]: m["content"] for m in body["messages"]}
+            return json.dumps(llm.complete_json(messages.get("system", ""), messages.get("user", "")))
+        return cls(root_dir, responder)
+
+    def _dir(self, batch_id):
+        return self.root_dir / batch_id
+
+    def submit(self, requests_path: str) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        try:
+            self._dir(batch_id).mkdir(parents=True)
+            shutil.copyfile(requests_path, self._dir(batch_id) / "input.jsonl")
+            (self._dir(batch_id) / "status").write_text("validating", encoding="utf-8")
+        except OSError as e:
+            logger.exception("Failed to submit local batch")
+            raise ValidationException("LocalBatchBackend.submit failed", e) from e
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        status_file = self._dir(batch_id) / "status"
+        if not status_file.exists():
+            raise ValidationException(f"Unknown batch id: {batch_id}")
+        status = status_file.read_text(encoding="utf-8")
+        if status not in TERMINAL_STATUSES:
+            self._process(batch_id)
+            status = status_file.read_text(encoding="utf-8")
+        return status
+
+    def _process(self, batch_id):
+        out_path = self._dir(batch_id) / "output.jsonl"
+        with open(self._dir(batch_id) / "input.jsonl", encoding="utf-8") as src, \
+                open(out_path, "w", encoding="utf-8") as out:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                record = {"id": f"req_{uuid.uuid4().hex}", "custom_id": request["custom_id"], "response": None, "error": None}
+                try:
+                    content = self.responder(request["body"])
+                    record["response"] = {
+                        "status_code": 200,
+                        "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]},
+                    }
+                except Exception as e:
+                    record["error"] = {"code": type(e).__name__, "message": str(e)}
+                out.write(json.dumps(record) + "\n")
+        (self._dir(batch_id) / "status").write_text("completed", encoding="utf-8")
+
+    def results(self, batch_id: str):
+        out_path = self._dir(batch_id) / "output.jsonl"
+        if not out_path.exists():
+            raise ValidationException(f"Batch {batch_id} has no output yet")
+        with open(out_path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class AzureBatchBackend(BatchBackend):
+    """Azure OpenAI Batch API (global-batch deployment) through the openai SDK files/batches endpoints."""
+
+    def __init__(self, client=None, completion_window: str = "24h"):
+        if client is None:
+            from ..llm.azure_openai_client import AzureOpenAILLM
+            client = AzureOpenAILLM().client
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, requests_path: str) -> str:
+        try:
+            with open(requests_path, "rb") as fh:
+                uploaded = self.client.files.create(file=fh, purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint="/chat/completions",
+                completion_window=self.completion_window,
+            )
+            return batch.id
+        except Exception as e:
+            logger.exception("Failed to submit Azure OpenAI batch")
+            raise ValidationException("AzureBatchBackend.submit failed", e) from e
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str):
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
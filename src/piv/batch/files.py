@@ -0,0 +1,23 @@
+
+import glob
+import hashlib
+from pathlib import Path
+
+
+def collect_workbooks(pattern):
+    """Expand a directory (non-recursive *.xlsx) or glob pattern into a sorted list of paths."""
+    p = Path(pattern)
+    if p.is_dir():
+        paths = p.glob("*.xlsx")
+    else:
+        paths = (Path(x) for x in glob.glob(str(pattern), recursive=True))
+    # Skip Excel lock files such as "~$intake.xlsx"
+    return sorted(str(x.resolve()) for x in paths if x.is_file() and not x.name.startswith("~$"))
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
@@ -0,0 +1,231 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import json
+import os
+import time
+from logger import CustomLogger
+from exception import ValidationException
+from ..io.excel_reader import read_workbook_text
+from ..llm.azure_openai_client import _build_messages
+from ..llm.prompts import load_extractor_schema
+from ..llm.structured import parse_structured, response_format_for
+from ..preprocessing.compactor import compact_document
+from ..preprocessing.semantic_extractor import build_extraction_prompt
+from ..preprocessing.table_extractor import extract_sections_via_rules
+from ..agents.registry import validate_sections
+from ..report import format_feedback
+from .backends import TERMINAL_STATUSES
+from .files import file_digest
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Azure OpenAI accepts up to 100k requests and 200 MB per batch file
+MAX_REQUESTS_PER_BATCH = 100000
+MAX_BATCH_FILE_BYTES = 200 * 1024 * 1024
+
+STATE_FILE = "state.json"
+RESULTS_FILE = "results.jsonl"
+
+
+def build_batch_request(custom_id: str, text: str, prompts_dir, deployment: str, schema=None) -> dict:
+    """One JSONL line for the batch file: the section_extractor.md chat request for `text`,
+    constrained to `schema` with a strict json_schema response format when given."""
+    system_prompt, payload = build_extraction_prompt(text, prompts_dir)
+    _, msgs = _build_messages(system_prompt, payload)
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/chat/completions",
+        "body": {
+            "model": deployment,
+            "messages": msgs,
+            "temperature": 0,
+            "response_format": response_format_for(schema) if schema else {"type": "json_object"},
+        },
+    }
+
+
+def _load_state(work_dir: Path) -> dict:
+    path = work_dir / STATE_FILE
+    if not path.exists():
+        return {"batches": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _save_state(work_dir: Path, state: dict):
+    tmp = work_dir / f"{STATE_FILE}.tmp"
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, work_dir / STATE_FILE)
+
+
+def load_results(work_dir) -> dict:
+    """custom_id -> latest result record written to `work_dir/results.jsonl`."""
+    path = Path(work_dir) / RESULTS_FILE
+    results = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    results[record["custom_id"]] = record
+    return results
+
+
+def _append_result(work_dir: Path, record: dict):
+    with open(work_dir / RESULTS_FILE, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def _validated_record(custom_id, paths, sections, method):
+    validation = validate_sections(sections)
+    return {
+        "custom_id": custom_id,
+        "source_paths": paths,
+        "method": method,
+        "sections": sections,
+        "validation": {key: res.model_dump() for key, res in validation.items()},
+        "final_feedback": format_feedback(validation),
+        "error": None,
+    }
+
+
+def _error_record(custom_id, paths, error):
+    return {"custom_id": custom_id, "source_paths": paths, "method": "batch", "sections": None,
+            "validation": None, "final_feedback": None, "error": error}
+
+
+def _chunk_lines(requests, max_requests=MAX_REQUESTS_PER_BATCH, max_bytes=MAX_BATCH_FILE_BYTES):
+    """Yield lists of serialized JSONL lines, each within both batch file limits."""
+    chunk, size = [], 0
+    for request in requests:
+        line = json.dumps(request) + "\n"
+        length = len(line.encode("utf-8"))
+        if chunk and (len(chunk) >= max_requests or size + length > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append((request["custom_id"], line))
+        size += length
+    if chunk:
+        yield chunk
+
+
+def _parse_output_line(line, schema):
+    """Return ``(sections, error)`` for one batch output line, repairing malformed JSON locally."""
+    if line.get("error"):
+        return None, line["error"]
+    response = line.get("response") or {}
+    if response.get("status_code") != 200:
+        return None, {"code": str(response.get("status_code")), "message": json.dumps(response.get("body"))}
+    try:
+        content = response["body"]["choices"][0]["message"]["content"]
+        return parse_structured(content, schema)[0], None
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        return None, {"code": type(e).__name__, "message": str(e)}
+
+
+def run_offline_batch(paths, work_dir, backend, prompts_dir, deployment: str = None, reader_options=None,
+                      rule_extraction: bool = True, compaction: bool = True, token_budget: int = None,
+                      poll_interval: float = 60.0, timeout: float = None):
+    """Validate many workbooks through a batch backend instead of real-time completions.
+
+    Each distinct workbook becomes one request whose custom_id is the SHA-256 of
+    its bytes. Workbooks fully mapped by the table rules are validated directly;
+    the rest are written to a JSONL batch file, submitted, polled every
+    `poll_interval` seconds and, once finished, run through the section
+    validators. Results are appended to `work_dir/results.jsonl` and in-flight
+    batch ids kept in `work_dir/state.json`, so an interrupted run picks up where
+    it stopped: finished ids are skipped, submitted batches are polled again and
+    failed requests are resubmitted. Returns ``{source path: result record}``;
+    workbooks still pending when `timeout` expires are absent.
+    """
+    try:
+        work_dir = Path(work_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        deployment = deployment or os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+        schema = load_extractor_schema(f"{prompts_dir}/section_extractor.md")
+
+        by_id = {}
+        for path in paths:
+            by_id.setdefault(file_digest(path), []).append(str(path))
+
+        state = _load_state(work_dir)
+        done = {cid for cid, rec in load_results(work_dir).items() if rec.get("error") is None}
+        in_flight = {cid for batch in state["batches"].values() for cid in batch["custom_ids"]}
+        pending = [cid for cid in by_id if cid not in done and cid not in in_flight]
+        logger.info("Offline batch: %d workbooks, %d done, %d in flight, %d to submit",
+                    len(by_id), len(done & by_id.keys()), len(in_flight & by_id.keys()), len(pending))
+
+        requests = []
+        for cid in pending:
+            try:
+                text = read_workbook_text(by_id[cid][0], **(reader_options or {}))
+                if compaction:
+                    text, _ = compact_document(text, schema, token_budget=token_budget)
+            except Exception as e:
+                # One unreadable workbook must not stop the run; it is retried on the next one
+                logger.exception("Failed to read workbook: %s", by_id[cid][0])
+                _append_result(work_dir, _error_record(cid, by_id[cid], {"code": type(e).__name__, "message": str(e)}))
+                continue
+            if rule_extraction:
+                sections, report = extract_sections_via_rules(text, schema)
+                if report["complete"]:
+                    _append_result(work_dir, _validated_record(cid, by_id[cid], sections, "rules"))
+                    continue
+            requests.append(build_batch_request(cid, text, prompts_dir, deployment, schema))
+
+        for index, chunk in enumerate(_chunk_lines(requests)):
+            requests_path = work_dir / f"requests_{int(time.time())}_{index}.jsonl"
+            with open(requests_path, "w", encoding="utf-8") as fh:
+                fh.writelines(line for _, line in chunk)
+            batch_id = backend.submit(str(requests_path))
+            state["batches"][batch_id] = {"custom_ids": [cid for cid, _ in chunk], "requests_file": requests_path.name}
+            _save_state(work_dir, state)
+            logger.info("Submitted batch %s with %d requests", batch_id, len(chunk))
+
+        _collect(work_dir, state, backend, by_id, schema, poll_interval, timeout)
+
+        results = load_results(work_dir)
+        return {path: results[cid] for cid, id_paths in by_id.items() if cid in results for path in id_paths}
+    except ValidationException:
+        raise
+    except Exception as e:
+        logger.exception("Offline batch run failed")
+        raise ValidationException("run_offline_batch failed", e) from e
+
+
+def _collect(work_dir, state, backend, by_id, schema, poll_interval, timeout):
+    """Poll in-flight batches until all are finished (or `timeout`), recording their results."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while state["batches"]:
+        for batch_id in list(state["batches"]):
+            status = backend.status(batch_id)
+            if status not in TERMINAL_STATUSES:
+                continue
+            seen = set()
+            for line in backend.results(batch_id):
+                cid = line.get("custom_id")
+                seen.add(cid)
+                # Batches may be shared across runs over different inputs; keep every answer
+                paths = by_id.get(cid, [])
+                sections, error = _parse_output_line(line, schema)
+                if error is not None:
+                    _append_result(work_dir, _error_record(cid, paths, error))
+                else:
+                    _append_result(work_dir, _validated_record(cid, paths, sections, "batch"))
+            missing = set(state["batches"][batch_id]["custom_ids"]) - seen
+            if missing:
+                # Failed/expired batches leave requests unanswered; they are resubmitted on the next run
+                logger.warning("Batch %s ended '%s' with %d unanswered requests", batch_id, status, len(missing))
+            del state["batches"][batch_id]
+            _save_state(work_dir, state)
+        if not state["batches"]:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.info("Offline batch: %d batches still running; rerun to resume", len(state["batches"]))
+            break
+        time.sleep(poll_interval)
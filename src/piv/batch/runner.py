@@ -0,0 +1,176 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from logger import CustomLogger
+from exception import ValidationException
+from ..io.excel_reader import read_workbook_text
+from ..io.text_cache import WorkbookTextCache
+from ..agents.registry import SECTION_VALIDATORS
+from ..graph.checkpoint import has_document_text, invoke_checkpointed
+from ..graph.tracing import error_spans
+from ..llm.deadline import is_deadline_exceeded
+from ..llm.scheduler import PRIORITY_BATCH, priority_scope
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+def parse_workbook(path, reader_options=None, cache_dir=None):
+    """Process-pool task: return ``(text, seconds)`` for one workbook."""
+    started = time.perf_counter()
+    if cache_dir:
+        text = WorkbookTextCache(cache_dir).read(path, **(reader_options or {}))
+    else:
+        text = read_workbook_text(path, **(reader_options or {}))
+    return text, time.perf_counter() - started
+
+
+def _record(index, path, out=None, error=None, parse_s=0.0, pipeline_s=0.0):
+    record = {"index": index, "source_path": path, "parse_s": round(parse_s, 6), "pipeline_s": round(pipeline_s, 6)}
+    if error is not None:
+        kind = "deadline_exceeded" if is_deadline_exceeded(error) else type(error).__name__
+        record.update(status="error", error={"code": kind, "message": str(error)}, timings=error_spans(error))
+        return record
+    validation = out.get("validation") or {}
+    record.update(
+        status="ok",
+        method=(out.get("extraction") or {}).get("method"),
+        short_circuit=out.get("short_circuit"),
+        # Report order, not completion order, so records diff cleanly between runs; sections
+        # only a custom rule spec has follow, sorted by key
+        validation={key: validation[key].model_dump()
+                    for key in [*(k for k in SECTION_VALIDATORS if k in validation),
+                                *sorted(k for k in validation if k not in SECTION_VALIDATORS)]},
+        final_feedback=out.get("final_feedback"),
+        timings=out.get("timings", []),
+        error=None,
+    )
+    return record
+
+
+def run_batch(paths, graph, out, parse_workers: int = None, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+              reader_options=None, cache_dir: str = None, resume: bool = False, deadline_s: float = None,
+              trace: list = None):
+    """Validate many workbooks in one process and write one NDJSON record per workbook to `out`.
+
+    Workbooks are parsed in a process pool of `parse_workers` (CPU count by
+    default) and their text is run through `graph` on `max_in_flight` threads, so
+    at most that many documents are being extracted at once. Parsing runs ahead
+    of extraction by at most `max_in_flight` further documents. Records are
+    written in input order regardless of completion order; a failing workbook
+    (including one that exceeds its deadline) yields an error record instead of
+    stopping the run. When `graph` was built with a checkpointer every document
+    is checkpointed under its file hash; with `resume`, documents whose text is
+    already checkpointed skip parsing and continue via `invoke_checkpointed`
+    (`deadline_s` renews their budget). Node spans of every document are
+    appended to `trace` when given. Returns the throughput summary.
+    """
+    try:
+        paths = [str(p) for p in paths]
+        started = time.perf_counter()
+        finished = {}
+        lock = threading.Condition()
+        window = threading.BoundedSemaphore(max(1, max_in_flight) * 2)
+        totals = {"written": 0, "failed": 0, "parse_s": 0.0, "pipeline_s": 0.0}
+        checkpointed = getattr(graph, "checkpointer", None) is not None
+        node_s = {}
+
+        def finish(index, record):
+            with lock:
+                finished[index] = record
+                lock.notify_all()
+            window.release()
+
+        def run_graph(index, text, parse_s, prefilled=True):
+            pipeline_started = time.perf_counter()
+            try:
+                # text_prefilled stops node_read from parsing a blank workbook a second time
+                initial = {"source_path": paths[index], "document_text": text, "text_prefilled": prefilled,
+                           "sections": {}, "validation": {}, "final_feedback": None}
+                # Batch lane: an in-process interactive caller sharing the scheduler goes first
+                with priority_scope(PRIORITY_BATCH):
+                    if checkpointed:
+                        result = invoke_checkpointed(graph, initial, resume=resume, deadline_s=deadline_s)
+                    else:
+                        result = graph.invoke(initial)
+                record = _record(index, paths[index], result, parse_s=parse_s,
+                                 pipeline_s=time.perf_counter() - pipeline_started)
+            except Exception as e:
+                logger.exception("Batch pipeline failed for %s", paths[index])
+                record = _record(index, paths[index], error=e, parse_s=parse_s,
+                                 pipeline_s=time.perf_counter() - pipeline_started)
+            finish(index, record)
+
+        def parsed(index, future):
+            try:
+                text, parse_s = future.result()
+            except Exception as e:
+                logger.exception("Batch parse failed for %s", paths[index])
+                finish(index, _record(index, paths[index], error=e))
+                return
+            runners.submit(run_graph, index, text, parse_s)
+
+        def flush(block):
+            # Write the contiguous run of finished records starting at the next unwritten index
+            while totals["written"] < len(paths):
+                with lock:
+                    while totals["written"] not in finished:
+                        if not block:
+                            return
+                        lock.wait()
+                    record = finished.pop(totals["written"])
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                totals["written"] += 1
+                totals["failed"] += record["status"] != "ok"
+                totals["parse_s"] += record["parse_s"]
+                totals["pipeline_s"] += record["pipeline_s"]
+                for span in record.get("timings", ()):
+                    node_s[span["node"]] = node_s.get(span["node"], 0.0) + span["wall_s"]
+                    if trace is not None:
+                        trace.append(span)
+
+        with ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count()) as parsers, \
+                ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as runners:
+            for index, path in enumerate(paths):
+                window.acquire()
+                try:
+                    restored = resume and checkpointed and has_document_text(graph, path)
+                except Exception as e:
+                    logger.exception("Batch checkpoint lookup failed for %s", path)
+                    finish(index, _record(index, path, error=e))
+                    flush(block=False)
+                    continue
+                if restored:
+                    runners.submit(run_graph, index, "", 0.0, False)
+                    flush(block=False)
+                    continue
+                future = parsers.submit(parse_workbook, path, reader_options, cache_dir)
+                future.add_done_callback(lambda f, index=index: parsed(index, f))
+                flush(block=False)
+            flush(block=True)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "files": len(paths),
+            "failed": totals["failed"],
+            "elapsed_s": round(elapsed, 3),
+            "files_per_s": round(len(paths) / elapsed, 3) if elapsed > 0 else 0.0,
+            "stage_s": {"parse": round(totals["parse_s"], 3), "pipeline": round(totals["pipeline_s"], 3)},
+            "node_s": {node: round(seconds, 3) for node, seconds in sorted(node_s.items())},
+        }
+        logger.info("Batch finished: %s", summary)
+        return summary
+    except Exception as e:
+        logger.exception("Batch run failed")
+        raise ValidationException("run_batch failed", e) from e
@@ -0,0 +1,83 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import os
+import sqlite3
+import time
+from logger import CustomLogger
+from exception import ValidationException
+from ..agents.base import ValidationIssue, ValidationResult
+from ..batch.files import file_digest
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(os.getcwd(), ".piv_cache", "checkpoints.sqlite")
+
+# Nodes after read that run before extraction has finished; resuming at one renews the deadline
+_BEFORE_EXTRACT = frozenset(("compact", "extract"))
+
+
+def open_checkpointer(path: str = DEFAULT_CHECKPOINT_PATH):
+    """SQLite checkpointer for `build_graph` (context["checkpointer"]); safe to share across threads."""
+    try:
+        from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError as e:
+        raise ValidationException("Resumable runs need the langgraph-checkpoint-sqlite package", e) from e
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    # Validation results are stored as pydantic models; allow them back explicitly
+    serde = JsonPlusSerializer(allowed_msgpack_modules=[(cls.__module__, cls.__name__)
+                                                        for cls in (ValidationResult, ValidationIssue)])
+    saver = SqliteSaver(sqlite3.connect(str(path), check_same_thread=False), serde=serde)
+    saver.setup()
+    return saver
+
+
+def thread_config(source_path) -> dict:
+    # Keyed by content, so a renamed copy resumes and an edited workbook starts over
+    return {"configurable": {"thread_id": file_digest(source_path)}}
+
+
+def has_document_text(graph, source_path) -> bool:
+    """True when a checkpoint for this workbook already holds its text, so parsing can be skipped."""
+    return bool(graph.get_state(thread_config(source_path)).values.get("document_text"))
+
+
+def invoke_checkpointed(graph, initial, resume: bool = True, deadline_s: float = None):
+    """Run `graph` (compiled with a checkpointer) on `initial`, checkpointing under the workbook hash.
+
+    With `resume`, an interrupted run continues from its first unfinished node
+    and a finished run keeps its read/extract output and only validates and
+    formats again; otherwise any earlier checkpoints are discarded. A resumed
+    document gets a fresh `deadline_s` budget, and its ``timings`` only hold the
+    spans of this invocation.
+    """
+    try:
+        config = thread_config(initial["source_path"])
+        if not resume:
+            graph.checkpointer.delete_thread(config["configurable"]["thread_id"])
+            return graph.invoke(initial, config)
+        snapshot = graph.get_state(config)
+        if not snapshot.values:
+            return graph.invoke(initial, config)
+        # Spans of earlier runs are dropped so `timings` covers this invocation only
+        update = {"timings": None}
+        if deadline_s:
+            update["deadline"] = time.time() + deadline_s
+        if snapshot.next:
+            logger.info("Resuming %s at %s", initial["source_path"], ", ".join(snapshot.next))
+            if _BEFORE_EXTRACT.isdisjoint(snapshot.next):
+                # Extraction has finished; its deadline no longer matters
+                update.pop("deadline", None)
+            graph.update_state(config, update)
+        else:
+            logger.info("Re-validating %s from its checkpointed extraction", initial["source_path"])
+            graph.update_state(config, {"early_validation": [], **update}, as_node="extract")
+        return graph.invoke(None, config)
+    except Exception as e:
+        logger.exception("Checkpointed run failed for %s", initial.get("source_path"))
+        raise ValidationException("invoke_checkpointed failed", e) from e
@@ -1,97 +1,303 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from langgraph.graph import StateGraph, END
-from typing import Annotated
-from langgraph.graph.message import add_messages
+import time
+from typing import Annotated, TypedDict
 from ..io.excel_reader import read_workbook_text
-from ..preprocessing.semantic_extractor import extract_sections_via_llm
-from ..agents.header_agent import validate_header
-from ..agents.business_case_agent import validate_business_case
-from ..agents.problem_agent import validate_problem
-from ..agents.scope_agent import validate_scope
-from ..agents.expected_benefits_agent import validate_expected_benefits
+from concurrent.futures import ThreadPoolExecutor
+from ..preprocessing.semantic_extractor import (
+    extract_sections_streaming, extract_sections_via_llm, extract_sections_via_llm_async,
+)
+from ..preprocessing.table_extractor import extract_sections_via_rules
+from ..preprocessing.compactor import compact_document
+from ..preprocessing.schema import get_field, iter_schema_fields
+from ..preprocessing.chunked_extractor import DEFAULT_CHUNK_TOKENS, extract_sections_chunked, extract_sections_chunked_async
+from ..preprocessing.targeted_extractor import extract_missing_fields, extract_missing_fields_async
+from ..llm.deadline import deadline_scope
+from ..llm.tokens import estimate_tokens
+from ..llm.prompts import load_extractor_schema
+from ..agents.registry import SECTION_VALIDATORS, validate_sections
+from ..agents.rules import compile_rules, load_rules
 from ..report import format_feedback
+from .tracing import traced
+from logger import CustomLogger
+from exception import ValidationException
 
-def build_graph(context):
-    # Define state with proper channel handling for validation results
-    def merge_validation(a, b):
-        """Merge validation results from different nodes"""
-        if a is None:
-            return b
-        if isinstance(a, dict) and isinstance(b, dict):
-            a.update(b)
-            return a
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+
+def merge_validation(a, b):
+    """Reducer for `validation`: merge per-section results written by parallel nodes."""
+    if a is None:
         return b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return {**a, **b}
+    return b
+
+
+def merge_timings(a, b):
+    """Reducer for `timings`: append node spans; None clears them when a run is resumed."""
+    if b is None:
+        return []
+    return (a or []) + b
+
+
+# Graph node -> section key it validates, for the bundled sections; other spec sections use their key
+VALIDATED_SECTION = {
+    "header": "header",
+    "business": "business_case",
+    "problem": "problem_statement",
+    "scope": "project_scope",
+    "benefits": "expected_benefits",
+}
+
 
-    g = StateGraph(dict)
+class PipelineState(TypedDict, total=False):
+    """Graph state. Nodes return partial updates; `validation` is merged across validators."""
+    source_path: str
+    document_text: str
+    text_prefilled: bool  # document_text was parsed ahead of time, even if blank
+    deadline: float
+    compaction: dict
+    extraction: dict
+    sections: dict
+    validation: Annotated[dict, merge_validation]
+    early_validation: list
+    last_validated: str  # fail_fast only: the section whose validator node ran last
+    short_circuit: str
+    final_feedback: str
+    timings: Annotated[list, merge_timings]
+
+def build_graph(context):
+    g = StateGraph(PipelineState)
+    schema = load_extractor_schema(f"{context['prompts_dir']}/section_extractor.md")
+    # context["validation_rules"] points at an alternative rule spec, compiled once per graph
+    validators_by_section = (compile_rules(load_rules(context["validation_rules"]))
+                             if context.get("validation_rules") else SECTION_VALIDATORS)
 
     def node_read(state):
-        txt = read_workbook_text(state["source_path"])
-        state["document_text"] = txt
-        return state
+        if state.get("text_prefilled") or (state.get("document_text") or "").strip():
+            # Text parsed ahead of time (e.g. by the batch runner's process pool)
+            update = {}
+        else:
+            cache = context.get("text_cache")
+            if cache is not None:
+                txt = cache.read(state["source_path"], **context.get("reader_options", {}))
+            else:
+                txt = read_workbook_text(state["source_path"], **context.get("reader_options", {}))
+            update = {"document_text": txt}
+        if context.get("deadline_s") and "deadline" not in state:
+            # Per-document budget, started when the document is read; LLM calls are bounded by it
+            update["deadline"] = time.time() + context["deadline_s"]
+        return update
+
+    def node_compact(state):
+        if not context.get("compaction", True):
+            return {}
+        txt, stats = compact_document(state["document_text"], schema, token_budget=context.get("token_budget"),
+                                      collapse_repeats=context.get("compact_repeats", False))
+        return {"document_text": txt, "compaction": stats}
+
+    def extract_with_rules(state, update):
+        """Map well-formed "Section | Field | Value" sheets deterministically.
+
+        Returns True when the rules found every field, so the LLM can be skipped.
+        """
+        if not context.get("rule_extraction", True):
+            return False
+        sections, report = extract_sections_via_rules(state["document_text"], schema)
+        update["extraction"] = {"method": "rules", **report}
+        if report["complete"]:
+            update["sections"] = sections
+        return report["complete"]
+
+    def needs_chunking(state):
+        """Documents larger than `chunk_tokens` (None/0 disables) are extracted map-reduce style."""
+        limit = context.get("chunk_tokens", DEFAULT_CHUNK_TOKENS)
+        return bool(limit) and estimate_tokens(state["document_text"]) > limit
+
+    def wants_retry(extraction):
+        """Targeted retry is opt-in; chunked extraction already asked every chunk for every field."""
+        return context.get("targeted_retry", False) and extraction.get("method") != "llm_chunked"
+
+    def extract_streaming(state, update):
+        """Stream the extraction and validate each section on a worker thread as soon as it arrives.
+
+        Results go to update["validation"]; the sections validated this way are
+        listed in update["early_validation"] so their graph nodes can skip them.
+        """
+        futures, streamed = {}, {}
+
+        def on_section(key, section):
+            if key in validators_by_section:
+                streamed[key] = section
+                futures[key] = pool.submit(validators_by_section[key], section)
+
+        with ThreadPoolExecutor(max_workers=len(validators_by_section)) as pool:
+            sections = extract_sections_streaming(state["document_text"], context["prompts_dir"], context["llm"],
+                                                  on_section)
+        # A re-requested answer may differ from what streamed in; keep only results for the final sections
+        kept = sorted(key for key in futures if streamed[key] == sections.get(key))
+        update["validation"] = {key: futures[key].result() for key in kept}
+        update["early_validation"] = kept
+        return sections
 
     def node_extract(state):
-        sections = extract_sections_via_llm(state["document_text"], context["prompts_dir"], context["llm"])
-        state["sections"] = sections
-        return state
-
-    def node_header(state):
-        res = validate_header(state["sections"].get("header", {}))
-        if "validation" not in state:
-            state["validation"] = {}
-        state["validation"]["header"] = res
-        return state
-
-    def node_business(state):
-        res = validate_business_case(state["sections"].get("business_case", {}))
-        if "validation" not in state:
-            state["validation"] = {}
-        state["validation"]["business_case"] = res
-        return state
-
-    def node_problem(state):
-        res = validate_problem(state["sections"].get("problem_statement", {}))
-        if "validation" not in state:
-            state["validation"] = {}
-        state["validation"]["problem_statement"] = res
-        return state
-
-    def node_scope(state):
-        res = validate_scope(state["sections"].get("project_scope", {}))
-        if "validation" not in state:
-            state["validation"] = {}
-        state["validation"]["project_scope"] = res
-        return state
-
-    def node_benefits(state):
-        res = validate_expected_benefits(state["sections"].get("expected_benefits", {}))
-        if "validation" not in state:
-            state["validation"] = {}
-        state["validation"]["expected_benefits"] = res
-        return state
+        with deadline_scope(until=state.get("deadline")):
+            return extract_sync(state)
+
+    def extract_sync(state):
+        update = {}
+        if extract_with_rules(state, update):
+            return update
+        extraction = update.setdefault("extraction", {})
+        llm = context["llm"]
+        if needs_chunking(state):
+            sections, report = extract_sections_chunked(state["document_text"], context["prompts_dir"], llm,
+                                                        schema, context.get("chunk_tokens", DEFAULT_CHUNK_TOKENS))
+            extraction.update(method="llm_chunked", **report)
+        elif context.get("streaming", True) and callable(getattr(llm, "complete_json_streaming", None)):
+            sections = extract_streaming(state, update)
+            extraction["method"] = "llm_streaming"
+        else:
+            sections = extract_sections_via_llm(state["document_text"], context["prompts_dir"], llm)
+            extraction["method"] = "llm"
+        if wants_retry(extraction):
+            # Ask again for blank fields only, in one short prompt
+            try:
+                sections, extraction["retry"] = extract_missing_fields(state["document_text"], context["prompts_dir"],
+                                                                       llm, schema, sections)
+            except Exception as e:
+                logger.warning("Targeted retry failed, keeping first-pass sections: %s", e)
+                extraction["retry"] = {"error": str(e)}
+            else:
+                # Sections that gained fields must be validated again
+                changed = {field.split(".", 1)[0] for field in extraction["retry"]["filled"]}
+                if update.get("early_validation"):
+                    update["early_validation"] = [key for key in update["early_validation"] if key not in changed]
+                    update["validation"] = {key: update["validation"][key] for key in update["early_validation"]}
+        update["sections"] = sections
+        return update
+
+    async def node_extract_async(state):
+        with deadline_scope(until=state.get("deadline")):
+            return await extract_async(state)
+
+    async def extract_async(state):
+        update = {}
+        if extract_with_rules(state, update):
+            return update
+        extraction = update.setdefault("extraction", {})
+        if needs_chunking(state):
+            sections, report = await extract_sections_chunked_async(state["document_text"], context["prompts_dir"],
+                                                                    context["llm"], schema,
+                                                                    context.get("chunk_tokens", DEFAULT_CHUNK_TOKENS))
+            extraction.update(method="llm_chunked", **report)
+        else:
+            sections = await extract_sections_via_llm_async(state["document_text"], context["prompts_dir"], context["llm"])
+            extraction["method"] = "llm"
+        if wants_retry(extraction):
+            try:
+                sections, extraction["retry"] = await extract_missing_fields_async(
+                    state["document_text"], context["prompts_dir"], context["llm"], schema, sections)
+            except Exception as e:
+                logger.warning("Targeted retry failed, keeping first-pass sections: %s", e)
+                extraction["retry"] = {"error": str(e)}
+        update["sections"] = sections
+        return update
+
+    def validator_node(section_key):
+        def node(state):
+            # Validators run one after another under fail_fast, so a plain key records how far the run got
+            update = {"last_validated": section_key} if context.get("fail_fast") else {}
+            if section_key not in state.get("early_validation", ()):
+                res = validators_by_section[section_key](state["sections"].get(section_key, {}))
+                update["validation"] = {section_key: res}
+            return update
+        return node
+
+    # One validator node per spec section, in spec order; the bundled sections keep their short names
+    node_names = {key: name for name, key in VALIDATED_SECTION.items()}
+    validated_section = {node_names.get(key, key): key for key in validators_by_section}
+    clashes = sorted(set(validated_section) & {"read", "compact", "extract", "missing", "format"})
+    if clashes:
+        raise ValidationException(f"Validation rule sections clash with graph nodes: {', '.join(clashes)}")
+    if not validated_section:
+        raise ValidationException("Validation rule spec has no sections")
+    validators = list(validated_section)
+
+    def fail_fast_route(section_key, following):
+        def route(state):
+            result = (state.get("validation") or {}).get(section_key)
+            if result is not None and any(issue.severity == "ERROR" for issue in result.issues):
+                return "format"
+            return following
+        return route
+
+    def node_missing(state):
+        """Nothing usable was read or extracted: every section is reported as missing."""
+        reason = "empty_sections" if (state.get("document_text") or "").strip() else "empty_document"
+        return {"validation": validate_sections({}, validators_by_section), "short_circuit": reason}
+
+    def has_fields(sections):
+        return any(str(get_field(sections or {}, key, path)).strip() for key, path in iter_schema_fields(schema))
+
+    def route_after_read(state):
+        return "compact" if (state.get("document_text") or "").strip() else "missing"
+
+    def route_after_extract(state):
+        # Routes to the validators come back as a list so they still fan out in parallel
+        if not has_fields(state.get("sections")):
+            return "missing"
+        return validators[0] if context.get("fail_fast") else validators
 
     def node_format(state):
-        fb = format_feedback(state.get("validation", {}))
-        state["final_feedback"] = fb
-        return state
-
-    g.add_node("read", node_read)
-    g.add_node("extract", node_extract)
-    g.add_node("header", node_header)
-    g.add_node("business", node_business)
-    g.add_node("problem", node_problem)
-    g.add_node("scope", node_scope)
-    g.add_node("benefits", node_benefits)
-    g.add_node("format", node_format)
+        validation = state.get("validation", {})
+        update = {"final_feedback": format_feedback(validation)}
+        last = state.get("last_validated")
+        if context.get("fail_fast") and "short_circuit" not in state and last != validated_section[validators[-1]]:
+            # The run stopped at `last`; later validator nodes never ran, even if streaming validated them early
+            update["short_circuit"] = f"fail_fast:{last}"
+        return update
+
+    nodes = {
+        "read": node_read,
+        "compact": node_compact,
+        **{name: validator_node(key) for name, key in validated_section.items()},
+        "missing": node_missing,
+        "format": node_format,
+    }
+    # Async-only clients (AsyncAzureOpenAILLM) get an async node; run those graphs with `ainvoke`
+    llm = context.get("llm")
+    if callable(getattr(llm, "complete_json_async", None)) and not callable(getattr(llm, "complete_json", None)):
+        nodes["extract"] = node_extract_async
+    else:
+        nodes["extract"] = node_extract
+    for name, node in nodes.items():
+        # Every node reports a span into state["timings"] unless tracing is turned off
+        if context.get("tracing", True):
+            node = traced(name, node, memory=context.get("trace_memory", False))
+        g.add_node(name, node)
 
     g.set_entry_point("read")
-    g.add_edge("read", "extract")
-    # Make validation nodes sequential instead of parallel
-    g.add_edge("extract", "header")
-    g.add_edge("header", "business")
-    g.add_edge("business", "problem")
-    g.add_edge("problem", "scope")
-    g.add_edge("scope", "benefits")
-    g.add_edge("benefits", "format")
+    # Unreadable or blank workbooks skip compaction and the LLM entirely
+    g.add_conditional_edges("read", route_after_read, ["compact", "missing"])
+    g.add_edge("compact", "extract")
+    g.add_conditional_edges("extract", route_after_extract, validators + ["missing"])
+    g.add_edge("missing", "format")
+    if context.get("fail_fast"):
+        # Validate one section at a time and stop at the first one with an ERROR
+        for name, following in zip(validators, validators[1:] + ["format"]):
+            g.add_conditional_edges(name, fail_fast_route(validated_section[name], following),
+                                    sorted({following, "format"}))
+    else:
+        # Validators fan out in parallel after extraction and join at format
+        g.add_edge(validators, "format")
     g.add_edge("format", END)
 
-    return g.compile()
+    # Optional persistent checkpointer (see checkpoint.py); runs are then resumable per workbook
+    return g.compile(checkpointer=context.get("checkpointer"))
@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import inspect
+import json
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from ..llm.telemetry import LATENCY_BUCKETS, Histogram, _labels
+
+
+# tracemalloc's peak is process-wide, so memory-traced nodes run one at a time
+_memory_lock = threading.Lock()
+
+
+def _measure(name, state, memory):
+    """Start a span; returns a function that closes it and yields the span dict.
+
+    With `memory` the caller must hold `_memory_lock` until the span is closed.
+    tracemalloc is started for the span and stopped again unless it was already on.
+    """
+    owned = False
+    if memory:
+        owned = not tracemalloc.is_tracing()
+        if owned:
+            tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    started, wall, cpu = time.time(), time.perf_counter(), time.thread_time()
+
+    def finish():
+        span = {
+            "node": name,
+            "document": state.get("source_path"),
+            "start": started,
+            "wall_s": time.perf_counter() - wall,
+            "cpu_s": time.thread_time() - cpu,
+            "thread": threading.get_ident(),
+        }
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            span["alloc_bytes"] = current - base
+            span["peak_alloc_bytes"] = peak - base
+            if owned:
+                tracemalloc.stop()
+        return span
+    return finish
+
+
+def _keep_span(exc, span):
+    """Attach the span of a node that raised to its exception (see `error_spans`)."""
+    try:
+        exc.timings = [*getattr(exc, "timings", ()), span]
+    except AttributeError:
+        pass
+
+
+def error_spans(exc) -> list:
+    """Spans of nodes that failed with `exc`, searched along its chain of causes."""
+    spans, seen = [], set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        spans.extend(getattr(exc, "timings", ()))
+        exc = exc.__cause__ or exc.__context__
+    return spans
+
+
+def traced(name, fn, memory: bool = False):
+    """Wrap graph node `fn` so its update carries a span in ``timings``.
+
+    Spans record wall time, CPU time of the node's thread (work the node hands
+    to its own pools is not included) and, with `memory`, tracemalloc's
+    allocation and peak deltas. tracemalloc is process-wide, so with `memory`
+    traced nodes run one at a time, including parallel validators and
+    concurrent documents. A node that raises still closes its span; it is
+    attached to the exception as ``timings``.
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def run_async(state):
+            if memory:
+                # Wait off the event loop so other coroutines keep running
+                await asyncio.get_running_loop().run_in_executor(None, _memory_lock.acquire)
+            try:
+                finish = _measure(name, state, memory)
+                try:
+                    update = await fn(state)
+                except BaseException as e:
+                    _keep_span(e, finish())
+                    raise
+                return {**(update or {}), "timings": [finish()]}
+            finally:
+                if memory:
+                    _memory_lock.release()
+        return run_async
+
+    @functools.wraps(fn)
+    def run(state):
+        if memory:
+            _memory_lock.acquire()
+        try:
+            finish = _measure(name, state, memory)
+            try:
+                update = fn(state)
+            except BaseException as e:
+                _keep_span(e, finish())
+                raise
+            return {**(update or {}), "timings": [finish()]}
+        finally:
+            if memory:
+                _memory_lock.release()
+    return run
+
+
+def to_chrome_trace(spans) -> dict:
+    """Spans as a Chrome trace (load in chrome://tracing or Perfetto); one row per thread."""
+    events = []
+    for span in spans:
+        args = {k: v for k, v in span.items() if k not in ("node", "start", "wall_s", "thread")}
+        events.append({"name": span["node"], "cat": "node", "ph": "X", "pid": 1, "tid": span["thread"],
+                       "ts": int(span["start"] * 1e6), "dur": int(span["wall_s"] * 1e6), "args": args})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def to_prometheus(spans, prefix: str = "piv_node") -> str:
+    """Per-node wall and CPU time histograms plus the largest allocation peak, in Prometheus text format."""
+    hists = {}
+    peaks = {}
+    for span in spans:
+        for metric in ("wall_seconds", "cpu_seconds"):
+            hist = hists.setdefault((metric, span["node"]), Histogram(LATENCY_BUCKETS))
+            hist.observe(span[metric.replace("_seconds", "_s")])
+        if "peak_alloc_bytes" in span:
+            peaks[span["node"]] = max(peaks.get(span["node"], 0), span["peak_alloc_bytes"])
+    lines = []
+    for metric in ("wall_seconds", "cpu_seconds"):
+        lines.append(f"# TYPE {prefix}_{metric} histogram")
+        for (name, node), hist in sorted(hists.items()):
+            if name != metric:
+                continue
+            total = 0
+            for bound, count in zip(hist.buckets + ("+Inf",), hist.counts):
+                total += count
+                lines.append(f"{prefix}_{metric}_bucket{_labels({'node': node, 'le': bound})} {total}")
+            lines.append(f"{prefix}_{metric}_sum{_labels({'node': node})} {hist.sum}")
+            lines.append(f"{prefix}_{metric}_count{_labels({'node': node})} {hist.count}")
+    if peaks:
+        lines.append(f"# TYPE {prefix}_peak_alloc_bytes gauge")
+        for node, peak in sorted(peaks.items()):
+            lines.append(f"{prefix}_peak_alloc_bytes{_labels({'node': node})} {peak}")
+    return "\n".join(lines) + "\n"
+
+
+def write_trace(spans, path):
+    """Dump spans to `path`: Prometheus text for ``.prom``/``.txt``, Chrome trace JSON otherwise."""
+    path = Path(path)
+    text = to_prometheus(spans) if path.suffix in (".prom", ".txt") else json.dumps(to_chrome_trace(spans))
+    path.write_text(text, encoding="utf-8")
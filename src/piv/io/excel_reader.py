@@ -2,7 +2,10 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+import posixpath
+import xml.etree.ElementTree as ET
 import openpyxl
+from openpyxl.utils.cell import coordinate_to_tuple, range_boundaries
 from logger import CustomLogger
 from exception import ValidationException
 
@@ -10,29 +13,195 @@ from exception import ValidationException
 _logger_instance = CustomLogger()
 logger = _logger_instance.get_logger(__name__)
 
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Bump whenever the text produced for a given workbook changes (invalidates cached text)
+READER_VERSION = "2"
 
-def read_workbook_text(path: str) -> str:
+# Sheets are separated by one blank line; rows themselves are never empty
+SHEET_BREAK = ""
+SHEET_SEPARATOR = "\n\n"
+
+_HYPERLINK_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+
+
+def _cell_text(value, target=None) -> str:
+    """Render one cell as text, appending its hyperlink target when it adds information."""
+    val = str(value).strip() if value is not None else ""
+    if val and target and target != val:
+        val = f"{val} ({target})"
+    return val
+
+
+def _rels_path(part_path: str) -> str:
+    folder, name = posixpath.split(part_path)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def _read_rels(archive, part_path: str, rel_type: str = None) -> dict:
+    """Return {relationship id: target} for the part at `part_path` (empty if it has no rels).
+
+    When `rel_type` is given only relationships of that type are returned.
+    """
+    rels_path = _rels_path(part_path)
+    if rels_path not in archive.namelist():
+        return {}
+    root = ET.fromstring(archive.read(rels_path))
+    return {
+        rel.get("Id"): rel.get("Target")
+        for rel in root.iter(f"{_PKG_REL_NS}Relationship")
+        if rel_type is None or rel.get("Type") == rel_type
+    }
+
+
+def _sheet_hyperlinks(archive, sheet_path: str):
+    """Collect hyperlink targets for one sheet without materialising its cells.
+
+    The ``<hyperlinks>`` block sits after ``<sheetData>``, so the sheet XML is
+    iterparsed once and every row element is cleared and detached from
+    ``<sheetData>`` as soon as it closes, keeping memory flat.
+    Returns ``(single, ranges)`` where ``single`` maps (row, col) to a target and
+    ``ranges`` holds ``(min_col, min_row, max_col, max_row, target)`` tuples.
+    Sheets without hyperlink relationships are not scanned at all.
+    """
+    rels = _read_rels(archive, sheet_path, _HYPERLINK_REL)
+    single, ranges = {}, []
+    if not rels:
+        return single, ranges
+    sheet_data = None
+    with archive.open(sheet_path) as fh:
+        for event, elem in ET.iterparse(fh, events=("start", "end")):
+            if event == "start":
+                if elem.tag == f"{_MAIN_NS}sheetData":
+                    sheet_data = elem
+                continue
+            if elem.tag == f"{_MAIN_NS}row":
+                # Detach the finished row too; a cleared row left in sheetData still costs memory
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.remove(elem)
+            elif elem.tag == f"{_MAIN_NS}hyperlink":
+                target = rels.get(elem.get(f"{_REL_NS}id"))
+                ref = elem.get("ref")
+                if target and ref:
+                    if ":" in ref:
+                        ranges.append((*range_boundaries(ref), target))
+                    else:
+                        single[coordinate_to_tuple(ref)] = target
+                elem.clear()
+    return single, ranges
+
+
+def _link_for(links, row: int, col: int):
+    single, ranges = links
+    target = single.get((row, col))
+    if target is None:
+        for min_col, min_row, max_col, max_row, rng_target in ranges:
+            if min_row <= row <= max_row and min_col <= col <= max_col:
+                return rng_target
+    return target
+
+
+def _join_sheets(sheet_rows):
+    """Chain per-sheet row iterators, yielding SHEET_BREAK between sheets that have rows."""
+    emitted = False
+    for rows in sheet_rows:
+        first = True
+        for row in rows:
+            if first and emitted:
+                yield SHEET_BREAK
+            first = False
+            emitted = True
+            yield row
+
+
+def _read_only_sheet_rows(archive, sheet):
+    links = _sheet_hyperlinks(archive, sheet._worksheet_path)
+    # Stored dimensions can be stale; ignore them so no trailing rows are cut off
+    sheet.reset_dimensions()
+    for row_idx, values in enumerate(sheet.iter_rows(values_only=True), 1):
+        row_vals = []
+        for col_idx, value in enumerate(values, 1):
+            if value is None:
+                continue
+            val = _cell_text(value, _link_for(links, row_idx, col_idx))
+            if val:
+                row_vals.append(val)
+        if row_vals:
+            yield " ".join(row_vals)
+
+
+def _full_sheet_rows(sheet):
+    for row in sheet.iter_rows():
+        row_vals = []
+        for cell in row:
+            hyperlink = getattr(cell, "hyperlink", None)
+            val = _cell_text(cell.value, hyperlink.target if hyperlink else None)
+            if val:
+                row_vals.append(val)
+        if row_vals:
+            yield " ".join(row_vals)
+
+
+def iter_workbook_rows(path: str, sheets=None):
+    """Yield the text of each non-empty row, streaming the workbook in read-only mode.
+
+    Produces the same lines as `read_workbook_text` but never builds the cell tree:
+    rows are pulled as plain values and hyperlinks are resolved from the sheet XML,
+    so peak memory stays flat regardless of workbook size. SHEET_BREAK is yielded
+    between sheets. `sheets` optionally restricts the output to the given
+    worksheet indices.
+    """
+    try:
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    except FileNotFoundError as e:
+        logger.exception("Excel file not found: %s", path)
+        raise ValidationException(f"Excel file not found: {path}", e) from e
+    except Exception as e:
+        logger.exception("Failed to read workbook: %s", path)
+        raise ValidationException(f"Failed to read workbook: {path}", e) from e
+
+    try:
+        yield from _join_sheets(
+            _read_only_sheet_rows(wb._archive, sheet)
+            for idx, sheet in enumerate(wb.worksheets)
+            if sheets is None or idx in sheets
+        )
+    except Exception as e:
+        logger.exception("Failed to read workbook: %s", path)
+        raise ValidationException(f"Failed to read workbook: {path}", e) from e
+    finally:
+        wb.close()
+
+
+def read_workbook_text(path: str, streaming: bool = False, backend: str = "openpyxl", workers: int = 1,
+                       parallel_min_bytes: int = None) -> str:
     """Read all non-empty cell text from workbook and return as plain text.
 
+    Rows are separated by newlines and sheets by a blank line (SHEET_SEPARATOR).
+
+    With ``streaming=True`` the workbook is read through `iter_workbook_rows`
+    (read-only, values-only) instead of loading the full cell tree.
+    ``backend="ooxml"`` parses the package XML directly (see `ooxml_reader`)
+    and falls back to openpyxl for anything it cannot handle.
+    ``workers > 1`` parses sheets in a process pool (see `parallel_reader`)
+    once the file is at least ``parallel_min_bytes`` large.
+
     This helper logs and wraps errors in ValidationException for callers.
     """
+    if workers and workers > 1:
+        from .parallel_reader import read_workbook_text_parallel
+        return read_workbook_text_parallel(path, workers=workers, backend=backend, min_bytes=parallel_min_bytes,
+                                           streaming=streaming)
+    if backend == "ooxml":
+        from .ooxml_reader import read_workbook_text_ooxml
+        return read_workbook_text_ooxml(path, streaming=streaming)
+    if streaming:
+        return "\n".join(iter_workbook_rows(path))
     try:
         wb = openpyxl.load_workbook(path, data_only=True)
-        parts = []
-        for sheet in wb.worksheets:
-            for row in sheet.iter_rows():
-                row_vals = []
-                for cell in row:
-                    val = str(cell.value).strip() if cell.value is not None else ""
-                    if val and getattr(cell, "hyperlink", None):
-                        target = cell.hyperlink.target
-                        if target and target != val:
-                            val = f"{val} ({target})"
-                    if val:
-                        row_vals.append(val)
-                if row_vals:
-                    parts.append(" ".join(row_vals))
-        return "\n".join(parts)
+        return "\n".join(_join_sheets(_full_sheet_rows(sheet) for sheet in wb.worksheets))
     except FileNotFoundError as e:
         logger.exception("Excel file not found: %s", path)
         raise ValidationException(f"Excel file not found: {path}", e) from e
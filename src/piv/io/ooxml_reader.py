@@ -0,0 +1,250 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.utils.datetime import MAC_EPOCH, WINDOWS_EPOCH, from_excel, from_ISO8601
+from logger import CustomLogger
+from exception import ValidationException
+from .excel_reader import (
+    _MAIN_NS, _PKG_REL_NS, _REL_NS, _cell_text, _join_sheets, _link_for, _read_rels, _sheet_hyperlinks, read_workbook_text,
+)
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_WORKSHEET_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+
+
+class UnsupportedWorkbook(Exception):
+    """Raised when the fast path meets a package layout it does not handle."""
+
+
+def _resolve(part_path: str, target: str) -> str:
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part_path), target))
+
+
+def _workbook_part(archive) -> str:
+    root = ET.fromstring(archive.read("_rels/.rels"))
+    for rel in root.iter(f"{_PKG_REL_NS}Relationship"):
+        if rel.get("Type") == _OFFICE_DOCUMENT_REL:
+            return rel.get("Target").lstrip("/")
+    raise UnsupportedWorkbook("No officeDocument relationship in package")
+
+
+def _worksheet_parts(archive, wb_path: str):
+    """Return (worksheet part paths in tab order, uses 1904 epoch)."""
+    root = ET.fromstring(archive.read(wb_path))
+    sheets = root.find(f"{_MAIN_NS}sheets")
+    if sheets is None:
+        raise UnsupportedWorkbook("Workbook has no <sheets> element")
+    wb_pr = root.find(f"{_MAIN_NS}workbookPr")
+    date1904 = wb_pr is not None and wb_pr.get("date1904") in ("1", "true")
+
+    rel_types = {}
+    rels_path = posixpath.join(posixpath.dirname(wb_path), "_rels", f"{posixpath.basename(wb_path)}.rels")
+    for rel in ET.fromstring(archive.read(rels_path)).iter(f"{_PKG_REL_NS}Relationship"):
+        rel_types[rel.get("Id")] = (rel.get("Type"), rel.get("Target"))
+
+    parts = []
+    for sheet in sheets.iter(f"{_MAIN_NS}sheet"):
+        rel_type, target = rel_types.get(sheet.get(f"{_REL_NS}id"), (None, None))
+        # Chartsheets and dangling ids are skipped, as openpyxl does for wb.worksheets
+        if rel_type == _WORKSHEET_REL and target:
+            parts.append(_resolve(wb_path, target))
+    return parts, date1904
+
+
+def _shared_strings(archive, wb_path: str) -> list:
+    path = None
+    for target in _read_rels(archive, wb_path).values():
+        if target and target.endswith("sharedStrings.xml"):
+            path = _resolve(wb_path, target)
+    if path is None or path not in archive.namelist():
+        return []
+
+    strings = []
+    with archive.open(path) as fh:
+        for _, elem in ET.iterparse(fh, events=("end",)):
+            if elem.tag == f"{_MAIN_NS}si":
+                strings.append(_inline_text(elem))
+                elem.clear()
+    return strings
+
+
+def _inline_text(elem) -> str:
+    """Plain text of an <si>/<is> element: the direct <t> plus rich-text runs, ignoring phonetics."""
+    snippets = []
+    plain = elem.find(f"{_MAIN_NS}t")
+    if plain is not None and plain.text is not None:
+        snippets.append(plain.text)
+    for run in elem.iterfind(f"{_MAIN_NS}r"):
+        t = run.find(f"{_MAIN_NS}t")
+        if t is not None and t.text is not None:
+            snippets.append(t.text)
+    return "".join(snippets)
+
+
+def _date_styles(archive, wb_path: str):
+    """Return (date style ids, timedelta style ids) from the cellXfs table."""
+    styles_path = None
+    for target in _read_rels(archive, wb_path).values():
+        if target and target.endswith("styles.xml"):
+            styles_path = _resolve(wb_path, target)
+    if styles_path is None or styles_path not in archive.namelist():
+        return set(), set()
+
+    root = ET.fromstring(archive.read(styles_path))
+    custom = {}
+    num_fmts = root.find(f"{_MAIN_NS}numFmts")
+    if num_fmts is not None:
+        for fmt in num_fmts.iter(f"{_MAIN_NS}numFmt"):
+            custom[int(fmt.get("numFmtId"))] = fmt.get("formatCode")
+
+    date_ids, timedelta_ids = set(), set()
+    cell_xfs = root.find(f"{_MAIN_NS}cellXfs")
+    if cell_xfs is None:
+        return date_ids, timedelta_ids
+    for idx, xf in enumerate(cell_xfs.iter(f"{_MAIN_NS}xf")):
+        fmt_id = int(xf.get("numFmtId", 0))
+        fmt = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+        if fmt is None:
+            continue
+        if is_date_format(fmt):
+            date_ids.add(idx)
+        if is_timedelta_format(fmt):
+            timedelta_ids.add(idx)
+    return date_ids, timedelta_ids
+
+
+def _cast_number(value: str):
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _cell_value(elem, shared, date_ids, timedelta_ids, epoch):
+    """Decode one <c> element the way openpyxl does with data_only=True."""
+    data_type = elem.get("t", "n")
+    if data_type == "inlineStr":
+        inline = elem.find(f"{_MAIN_NS}is")
+        return _inline_text(inline) if inline is not None else None
+
+    value = elem.findtext(f"{_MAIN_NS}v") or None
+    if value is None:
+        return None
+    if data_type == "n":
+        value = _cast_number(value)
+        style_id = int(elem.get("s", 0))
+        if style_id in date_ids:
+            try:
+                return from_excel(value, epoch, timedelta=style_id in timedelta_ids)
+            except (OverflowError, ValueError):
+                return "#VALUE!"
+        return value
+    if data_type == "s":
+        return shared[int(value)]
+    if data_type == "b":
+        return bool(int(value))
+    if data_type == "d":
+        return from_ISO8601(value)
+    # "str" (cached formula string) and "e" (error code) are kept verbatim
+    return value
+
+
+def _iter_sheet_rows(archive, sheet_path, shared, date_ids, timedelta_ids, epoch):
+    links = _sheet_hyperlinks(archive, sheet_path)
+    has_links = bool(links[0] or links[1])
+    row_counter = 0
+    with archive.open(sheet_path) as fh:
+        for _, elem in ET.iterparse(fh, events=("end",)):
+            if elem.tag != f"{_MAIN_NS}row":
+                continue
+            row_idx = int(elem.get("r", row_counter + 1))
+            row_counter = row_idx
+            col_counter = 0
+            row_vals = []
+            for cell in elem.iterfind(f"{_MAIN_NS}c"):
+                value = _cell_value(cell, shared, date_ids, timedelta_ids, epoch)
+                target = None
+                if has_links:
+                    # Column positions only matter for hyperlink lookup
+                    coord = cell.get("r")
+                    if coord:
+                        _, col_counter = coordinate_to_tuple(coord)
+                    else:
+                        col_counter += 1
+                    if value is not None:
+                        target = _link_for(links, row_idx, col_counter)
+                if value is None:
+                    continue
+                val = _cell_text(value, target)
+                if val:
+                    row_vals.append(val)
+            elem.clear()
+            if row_vals:
+                yield " ".join(row_vals)
+
+
+def count_worksheets(path: str) -> int:
+    """Number of worksheets in the package, read from workbook.xml alone."""
+    with zipfile.ZipFile(path) as archive:
+        sheet_parts, _ = _worksheet_parts(archive, _workbook_part(archive))
+    return len(sheet_parts)
+
+
+def _package_tables(archive, wb_path, date1904):
+    date_ids, timedelta_ids = _date_styles(archive, wb_path)
+    return _shared_strings(archive, wb_path), date_ids, timedelta_ids, MAC_EPOCH if date1904 else WINDOWS_EPOCH
+
+
+def read_ooxml_tables(path: str):
+    """Workbook-wide lookups (shared strings, date style ids, epoch) for `iter_ooxml_rows`.
+
+    Parse them once when several readers of the same package, such as per-sheet
+    worker processes, would otherwise each parse sharedStrings and styles.
+    """
+    with zipfile.ZipFile(path) as archive:
+        wb_path = _workbook_part(archive)
+        _, date1904 = _worksheet_parts(archive, wb_path)
+        return _package_tables(archive, wb_path, date1904)
+
+
+def iter_ooxml_rows(path: str, sheets=None, tables=None):
+    """Yield non-empty row text by parsing the xlsx package XML directly.
+
+    Only sharedStrings, styles (for date detection), the sheet XML and the sheet
+    hyperlink rels are read; raises UnsupportedWorkbook for layouts it cannot map.
+    `sheets` optionally restricts the output to the given worksheet indices;
+    `tables` (from `read_ooxml_tables`) skips re-parsing sharedStrings and styles.
+    """
+    with zipfile.ZipFile(path) as archive:
+        wb_path = _workbook_part(archive)
+        sheet_parts, date1904 = _worksheet_parts(archive, wb_path)
+        shared, date_ids, timedelta_ids, epoch = tables or _package_tables(archive, wb_path, date1904)
+        yield from _join_sheets(
+            _iter_sheet_rows(archive, sheet_path, shared, date_ids, timedelta_ids, epoch)
+            for idx, sheet_path in enumerate(sheet_parts)
+            if sheets is None or idx in sheets
+        )
+
+
+def read_workbook_text_ooxml(path: str, streaming: bool = False) -> str:
+    """Fast-path equivalent of `read_workbook_text`, falling back to openpyxl on failure
+    (in read-only mode when `streaming`)."""
+    if not Path(path).exists():
+        logger.error("Excel file not found: %s", path)
+        raise ValidationException(f"Excel file not found: {path}")
+    try:
+        return "\n".join(iter_ooxml_rows(path))
+    except Exception as e:
+        logger.warning("OOXML fast path failed for %s (%s); falling back to openpyxl", path, e)
+        return read_workbook_text(path, streaming=streaming)
@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from logger import CustomLogger
+from exception import ValidationException
+from .excel_reader import SHEET_SEPARATOR, iter_workbook_rows, read_workbook_text
+from .ooxml_reader import count_worksheets, iter_ooxml_rows, read_ooxml_tables
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Below this size a process pool costs more to start than it saves
+DEFAULT_PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+
+# OOXML lookup tables parsed once by the parent, handed to each worker process at start-up
+_tables = None
+
+
+def _init_worker(tables):
+    global _tables
+    _tables = tables
+
+
+def _read_sheets(path: str, indices, backend: str) -> str:
+    """Worker entry point: text of the given worksheets, read without loading the others."""
+    if backend == "ooxml":
+        try:
+            return "\n".join(iter_ooxml_rows(path, sheets=set(indices), tables=_tables))
+        except Exception as e:
+            logger.warning("OOXML fast path failed for %s sheets %s (%s); falling back to openpyxl", path, indices, e)
+    return "\n".join(iter_workbook_rows(path, sheets=set(indices)))
+
+
+def _sheet_batches(n_sheets: int, workers: int, backend: str):
+    """One sheet per task for OOXML (its tables are shared), else one run of sheets per worker:
+    openpyxl parses sharedStrings and styles on every load, so each worker loads the workbook once."""
+    if backend == "ooxml":
+        return [[i] for i in range(n_sheets)]
+    size = -(-n_sheets // workers)
+    return [list(range(start, min(start + size, n_sheets))) for start in range(0, n_sheets, size)]
+
+
+def read_workbook_text_parallel(path: str, workers: int = None, backend: str = "openpyxl", min_bytes: int = None,
+                                streaming: bool = False) -> str:
+    """Parse worksheets in a process pool and reassemble their text in sheet order.
+
+    Output matches `read_workbook_text`. Files smaller than `min_bytes`, single-sheet
+    workbooks and `workers < 2` stay in-process (honouring `streaming`).
+    `workers=None` uses every CPU. With the OOXML backend sharedStrings and
+    styles are parsed once here rather than in every worker.
+    """
+    if min_bytes is None:
+        min_bytes = DEFAULT_PARALLEL_MIN_BYTES
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError as e:
+        logger.exception("Excel file not found: %s", path)
+        raise ValidationException(f"Excel file not found: {path}", e) from e
+
+    try:
+        n_sheets = count_worksheets(path) if size >= min_bytes else 0
+    except Exception:
+        # Let the serial reader produce the proper error (or fallback) for odd packages
+        n_sheets = 0
+    workers = min(workers or os.cpu_count() or 1, n_sheets)
+    if workers < 2:
+        return read_workbook_text(path, backend=backend, streaming=streaming)
+
+    tables = None
+    if backend == "ooxml":
+        try:
+            tables = read_ooxml_tables(path)
+        except Exception as e:
+            # Workers then parse the tables themselves or fall back to openpyxl
+            logger.warning("Could not pre-parse OOXML tables for %s (%s)", path, e)
+
+    try:
+        batches = _sheet_batches(n_sheets, workers, backend)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tables,)) as pool:
+            texts = list(pool.map(_read_sheets, repeat(path), batches, repeat(backend)))
+        return SHEET_SEPARATOR.join(t for t in texts if t)
+    except ValidationException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to read workbook in parallel: %s", path)
+        raise ValidationException(f"Failed to read workbook: {path}", e) from e
@@ -0,0 +1,119 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import hashlib
+import os
+import threading
+from logger import CustomLogger
+from exception import ValidationException
+from .excel_reader import READER_VERSION, read_workbook_text
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.getcwd(), ".piv_cache", "workbook_text")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class WorkbookTextCache:
+    """Content-addressed on-disk cache of `read_workbook_text` output.
+
+    Entries are keyed by a SHA-256 of the workbook bytes plus READER_VERSION, so an
+    unchanged file is never parsed twice and a reader change invalidates everything.
+    Every backend/streaming/worker combination yields the same text, so reader
+    options are deliberately not part of the key. Least-recently-used entries
+    (by file mtime, refreshed on every hit) are evicted once the directory
+    exceeds `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key_for(path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                h.update(block)
+        h.update(f"reader={READER_VERSION}".encode())
+        return h.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.txt"
+
+    def get(self, key: str):
+        entry = self._entry(key)
+        try:
+            text = entry.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        entry = self._entry(key)
+        tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, entry)
+        except OSError:
+            # A cache that cannot be written must never fail the read itself
+            logger.warning("Could not write workbook text cache entry %s", entry, exc_info=True)
+            tmp.unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for p in self.cache_dir.glob("*.txt"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def read(self, path: str, **reader_options) -> str:
+        """Return the workbook text from cache, parsing (and storing) it on a miss."""
+        try:
+            key = self.key_for(path)
+        except FileNotFoundError as e:
+            logger.exception("Excel file not found: %s", path)
+            raise ValidationException(f"Excel file not found: {path}", e) from e
+        text = self.get(key)
+        if text is None:
+            text = read_workbook_text(path, **reader_options)
+            self.put(key, text)
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
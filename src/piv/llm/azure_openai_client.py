@@ -3,52 +3,410 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-import json, os
-from openai import AzureOpenAI
+import asyncio, json, os, time
+from types import SimpleNamespace
+from openai import AzureOpenAI, AsyncAzureOpenAI, DEFAULT_MAX_RETRIES
 from logger import CustomLogger
 from exception import ValidationException
+from .base import BaseLLM
+from .deadline import DeadlineExceeded, call_timeout, is_deadline_exceeded, remaining
+from .streaming import IncrementalSectionParser
+from .structured import parse_structured, response_format_for, schema_fingerprint
+from .telemetry import TELEMETRY
+from .usage import UsageTracker, usage_from_response
 
 # Initialize logger
 _logger_instance = CustomLogger()
 logger = _logger_instance.get_logger(__name__)
 
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant that responds with valid JSON."
 
-class AzureOpenAILLM:
-    def __init__(self):
-        try:
-            self.endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-            self.api_key = os.getenv("AZURE_OPENAI_API_KEY")
-            self.deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
-            self.api_version = os.getenv("AZURE_OPENAI_API_VERSION")
 
-            if not all([self.endpoint, self.api_key, self.deployment]):
-                raise ValidationException("Missing Azure OpenAI configuration: please set AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY and AZURE_OPENAI_DEPLOYMENT_NAME")
+def _load_azure_config():
+    """Read Azure OpenAI settings from the environment: (endpoint, api_key, deployment, api_version)."""
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+    api_key = os.getenv("AZURE_OPENAI_API_KEY")
+    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME")
+    api_version = os.getenv("AZURE_OPENAI_API_VERSION")
+
+    if not all([endpoint, api_key, deployment]):
+        raise ValidationException("Missing Azure OpenAI configuration: please set AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY and AZURE_OPENAI_DEPLOYMENT_NAME")
+    return endpoint, api_key, deployment, api_version
+
+
+def _build_messages(system_prompt: str, user_payload: str):
+    # Ensure system prompt mentions JSON for Azure OpenAI requirement
+    if not system_prompt:
+        system_prompt = DEFAULT_SYSTEM_PROMPT
+    msgs = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_payload},
+    ]
+    return system_prompt, msgs
+
+
+def _client_retries(scheduler):
+    # With a scheduler, 429 retries happen there (honouring priorities); the SDK must not also retry
+    return 0 if scheduler is not None else DEFAULT_MAX_RETRIES
+
+
+def _sdk_retries(response) -> int:
+    # The SDK numbers its own retries in this request header
+    try:
+        return int(response.http_request.headers.get("x-stainless-retry-count") or 0)
+    except (AttributeError, ValueError):
+        return 0
+
+
+def _create_timed(completions, trace, **kwargs):
+    """``completions.create`` that notes time to first byte and SDK retries in `trace`."""
+    streaming = getattr(completions, "with_streaming_response", None)
+    if streaming is None:
+        # Stand-ins without the raw-response API: no TTFB
+        return completions.create(**kwargs)
+    sent = time.perf_counter()
+    with streaming.create(**kwargs) as response:
+        trace["ttfb_s"] = time.perf_counter() - sent
+        trace["retries"] = trace.get("retries", 0) + _sdk_retries(response)
+        return response.parse()
+
+
+async def _create_timed_async(completions, trace, **kwargs):
+    streaming = getattr(completions, "with_streaming_response", None)
+    if streaming is None:
+        return await completions.create(**kwargs)
+    sent = time.perf_counter()
+    async with streaming.create(**kwargs) as response:
+        trace["ttfb_s"] = time.perf_counter() - sent
+        trace["retries"] = trace.get("retries", 0) + _sdk_retries(response)
+        return await response.parse()
+
+
+def _completions(client):
+    """``client.chat.completions``, bounded by the current deadline when one is set.
+
+    SDK retries are disabled under a deadline: each would get the full remaining time again.
+    """
+    timeout = call_timeout()
+    if timeout is None:
+        return client.chat.completions
+    return client.with_options(timeout=timeout, max_retries=0).chat.completions
+
 
-            self.client = AzureOpenAI(api_key=self.api_key, azure_endpoint=self.endpoint, api_version=self.api_version)
+def _failure(message, exc):
+    """Exception to raise for a failed call: DeadlineExceeded once the deadline has passed."""
+    left = remaining()
+    if is_deadline_exceeded(exc) or (left is not None and left <= 0):
+        return DeadlineExceeded(f"{message}: deadline exceeded", exc)
+    return ValidationException(message, exc)
+
+
+def _request_options(response_schema, structured_output):
+    """``(response_format, cache variant)`` for a call with an optional ADSP template."""
+    if response_schema is None:
+        return {"type": "json_object"}, ""
+    variant = f"schema:{schema_fingerprint(response_schema)}"
+    if structured_output:
+        return response_format_for(response_schema), f"strict-{variant}"
+    return {"type": "json_object"}, variant
+
+
+def _parse_answer(txt, response_schema, stats):
+    """Decode the model's answer; with a template it is validated and, if needed, repaired locally.
+
+    Raises ValueError when the output cannot be repaired.
+    """
+    if response_schema is None:
+        return json.loads(txt)
+    result, repaired = parse_structured(txt, response_schema)
+    if repaired:
+        stats["repaired"] += 1
+        logger.info("Repaired malformed structured output locally")
+    return result
+
+
+def _record_call(telemetry, deployment, started, trace, resp, error):
+    usage = usage_from_response(resp) if resp is not None else {}
+    telemetry.record_call(
+        deployment,
+        latency=time.perf_counter() - started,
+        queue_wait=trace.get("queue_wait_s", 0.0),
+        ttfb=trace.get("ttfb_s"),
+        retries=trace.get("retries", 0),
+        error=error,
+        **usage,
+    )
+
+
+class AzureOpenAILLM(BaseLLM):
+    # Extractors pass their ADSP template as `response_schema`
+    supports_response_schema = True
+
+    def __init__(self, cache=None, scheduler=None, http_client=None, telemetry=None, structured_output: bool = True):
+        """`cache` is an optional ResponseCache consulted before every completion;
+        `scheduler` an optional RateLimitScheduler that admits and retries calls;
+        `http_client` an optional shared httpx.Client (see client_pool).
+        Token usage of every completion is recorded in `self.usage`, and timings
+        in `telemetry` (the process-wide TELEMETRY by default). Set
+        `structured_output=False` for deployments without strict json_schema
+        support; answers are then still validated and repaired locally."""
+        self.cache = cache
+        self.scheduler = scheduler
+        self.usage = UsageTracker()
+        self.telemetry = telemetry if telemetry is not None else TELEMETRY
+        self.structured_output = structured_output
+        self.structured_stats = {"repaired": 0, "rerequested": 0}
+        try:
+            self.endpoint, self.api_key, self.deployment, self.api_version = _load_azure_config()
+            self.client = AzureOpenAI(api_key=self.api_key, azure_endpoint=self.endpoint, api_version=self.api_version,
+                                      max_retries=_client_retries(scheduler), http_client=http_client)
         except ValidationException:
             raise
         except Exception as e:
             logger.exception("Failed to initialize AzureOpenAI client")
             raise ValidationException("AzureOpenAILLM init failed", e) from e
 
-    def complete_json(self, system_prompt: str, user_payload: str):
-        msgs = []
-        # Ensure system prompt mentions JSON for Azure OpenAI requirement
-        if system_prompt:
-            msgs.append({"role": "system", "content": system_prompt})
-        else:
-            msgs.append({"role": "system", "content": "You are a helpful assistant that responds with valid JSON."})
-        msgs.append({"role": "user", "content": user_payload})
+    def complete_json(self, system_prompt: str, user_payload: str, bypass_cache: bool = False, priority: int = None,
+                      response_schema=None):
+        """Return the model's JSON answer. `priority` selects the scheduler lane
+        (defaults to the surrounding `priority_scope`, else interactive).
 
-        try:
-            resp = self.client.chat.completions.create(
+        With an ADSP template as `response_schema` the request uses a strict
+        json_schema response format and the answer is validated against it,
+        blank-filling absent keys. Malformed output is repaired locally; the
+        request is repeated once only when that fails.
+        """
+        system_prompt, msgs = _build_messages(system_prompt, user_payload)
+        response_format, variant = _request_options(response_schema, self.structured_output)
+
+        key = None
+        if self.cache is not None and not bypass_cache:
+            key = self.cache.make_key(self.deployment, self.api_version, system_prompt, user_payload, variant)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        trace = {}
+
+        def call():
+            return _create_timed(
+                _completions(self.client),
+                trace,
                 model=self.deployment,
                 messages=msgs,
                 temperature=0,
-                response_format={"type": "json_object"},
+                response_format=response_format,
             )
-            txt = resp.choices[0].message.content
-            return json.loads(txt)
+
+        started = time.perf_counter()
+        resp, error = None, None
+        try:
+            for attempt in range(2 if response_schema is not None else 1):
+                if self.scheduler is not None:
+                    resp = self.scheduler.run(call, self.scheduler.estimate(system_prompt, user_payload), priority, trace)
+                else:
+                    resp = call()
+                self.usage.record(resp, time.perf_counter() - started, self.deployment)
+                try:
+                    result = _parse_answer(resp.choices[0].message.content, response_schema, self.structured_stats)
+                    break
+                except ValueError:
+                    if attempt or response_schema is None:
+                        raise
+                    self.structured_stats["rerequested"] += 1
+                    trace["retries"] = trace.get("retries", 0) + 1
+                    logger.warning("Structured output could not be repaired; requesting again")
+            if key is not None:
+                self.cache.put(key, result, latency=time.perf_counter() - started)
+            return result
         except Exception as e:
+            error = e
             logger.exception("AzureOpenAI completion failed")
-            raise ValidationException("AzureOpenAILLM.complete_json failed", e) from e
+            raise _failure("AzureOpenAILLM.complete_json failed", e) from e
+        finally:
+            _record_call(self.telemetry, self.deployment, started, trace, resp, error)
+
+    def complete_json_streaming(self, system_prompt: str, user_payload: str, on_section, response_schema=None,
+                                priority: int = None, bypass_cache: bool = False):
+        """Streaming variant of `complete_json`.
+
+        Calls ``on_section(key, value)`` as soon as each top-level object of the
+        answer has streamed in (validated against `response_schema` when given),
+        so callers can start working before the completion ends, and returns the
+        complete answer. A cached answer replays its sections immediately. When
+        an unrepairable answer is requested again, sections already reported may
+        be reported again or be missing from the returned answer; callers should
+        keep only work done on sections equal to those in the returned answer.
+        """
+        system_prompt, msgs = _build_messages(system_prompt, user_payload)
+        response_format, variant = _request_options(response_schema, self.structured_output)
+
+        def emit(key, value):
+            if response_schema is not None and key in response_schema:
+                value = parse_structured(json.dumps({key: value}), {key: response_schema[key]})[0][key]
+            on_section(key, value)
+
+        key = None
+        if self.cache is not None and not bypass_cache:
+            key = self.cache.make_key(self.deployment, self.api_version, system_prompt, user_payload, variant)
+            cached = self.cache.get(key)
+            if cached is not None:
+                for name, value in cached.items():
+                    if isinstance(value, dict):
+                        emit(name, value)
+                return cached
+
+        trace = {}
+
+        def call():
+            parser = IncrementalSectionParser()
+            trace.pop("ttfb_s", None)
+            sent = time.perf_counter()
+            usage = None
+            stream = _completions(self.client).create(
+                model=self.deployment,
+                messages=msgs,
+                temperature=0,
+                response_format=response_format,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            try:
+                for chunk in stream:
+                    left = remaining()
+                    if left is not None and left <= 0:
+                        # Read timeouts apply per chunk, so a trickling stream is cut off here
+                        raise DeadlineExceeded("Deadline exceeded while streaming the completion")
+                    trace.setdefault("ttfb_s", time.perf_counter() - sent)
+                    if getattr(chunk, "usage", None):
+                        usage = chunk.usage
+                    if chunk.choices:
+                        for name, value in parser.feed(chunk.choices[0].delta.content or ""):
+                            emit(name, value)
+            finally:
+                # Also when on_section or the stream raises partway, so the connection is released
+                stream.close()
+            return SimpleNamespace(text=parser.text, usage=usage)
+
+        started = time.perf_counter()
+        resp, error = None, None
+        try:
+            for attempt in range(2 if response_schema is not None else 1):
+                if self.scheduler is not None:
+                    resp = self.scheduler.run(call, self.scheduler.estimate(system_prompt, user_payload), priority, trace)
+                else:
+                    resp = call()
+                self.usage.record(resp, time.perf_counter() - started, self.deployment)
+                try:
+                    result = _parse_answer(resp.text, response_schema, self.structured_stats)
+                    break
+                except ValueError:
+                    if attempt or response_schema is None:
+                        raise
+                    self.structured_stats["rerequested"] += 1
+                    trace["retries"] = trace.get("retries", 0) + 1
+                    logger.warning("Structured output could not be repaired; requesting again")
+            if key is not None:
+                self.cache.put(key, result, latency=time.perf_counter() - started)
+            return result
+        except Exception as e:
+            error = e
+            logger.exception("AzureOpenAI streaming completion failed")
+            raise _failure("AzureOpenAILLM.complete_json_streaming failed", e) from e
+        finally:
+            _record_call(self.telemetry, self.deployment, started, trace, resp, error)
+
+
+class AsyncAzureOpenAILLM:
+    """Asyncio counterpart of AzureOpenAILLM built on AsyncAzureOpenAI.
+
+    At most `max_concurrency` completions are in flight per instance; further
+    callers wait on a semaphore instead of opening more connections.
+    """
+
+    supports_response_schema = True
+
+    def __init__(self, max_concurrency: int = 16, cache=None, scheduler=None, http_client=None, telemetry=None,
+                 structured_output: bool = True):
+        self.cache = cache
+        self.scheduler = scheduler
+        self.usage = UsageTracker()
+        self.telemetry = telemetry if telemetry is not None else TELEMETRY
+        self.structured_output = structured_output
+        self.structured_stats = {"repaired": 0, "rerequested": 0}
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._semaphore_loop = None
+        try:
+            self.endpoint, self.api_key, self.deployment, self.api_version = _load_azure_config()
+            self.client = AsyncAzureOpenAI(api_key=self.api_key, azure_endpoint=self.endpoint, api_version=self.api_version,
+                                           max_retries=_client_retries(scheduler), http_client=http_client)
+        except ValidationException:
+            raise
+        except Exception as e:
+            logger.exception("Failed to initialize AsyncAzureOpenAI client")
+            raise ValidationException("AsyncAzureOpenAILLM init failed", e) from e
+
+    def _limiter(self):
+        # asyncio primitives are bound to one event loop; rebuild when the loop changes
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def complete_json_async(self, system_prompt: str, user_payload: str, bypass_cache: bool = False,
+                                  priority: int = None, response_schema=None):
+        system_prompt, msgs = _build_messages(system_prompt, user_payload)
+        response_format, variant = _request_options(response_schema, self.structured_output)
+
+        key = None
+        if self.cache is not None and not bypass_cache:
+            key = self.cache.make_key(self.deployment, self.api_version, system_prompt, user_payload, variant)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        trace = {}
+
+        async def call():
+            queued = time.perf_counter()
+            async with self._limiter():
+                trace["queue_wait_s"] = trace.get("queue_wait_s", 0.0) + time.perf_counter() - queued
+                return await _create_timed_async(
+                    _completions(self.client),
+                    trace,
+                    model=self.deployment,
+                    messages=msgs,
+                    temperature=0,
+                    response_format=response_format,
+                )
+
+        started = time.perf_counter()
+        resp, error = None, None
+        try:
+            for attempt in range(2 if response_schema is not None else 1):
+                if self.scheduler is not None:
+                    resp = await self.scheduler.run_async(call, self.scheduler.estimate(system_prompt, user_payload),
+                                                          priority, trace)
+                else:
+                    resp = await call()
+                self.usage.record(resp, time.perf_counter() - started, self.deployment)
+                try:
+                    result = _parse_answer(resp.choices[0].message.content, response_schema, self.structured_stats)
+                    break
+                except ValueError:
+                    if attempt or response_schema is None:
+                        raise
+                    self.structured_stats["rerequested"] += 1
+                    trace["retries"] = trace.get("retries", 0) + 1
+                    logger.warning("Structured output could not be repaired; requesting again")
+            if key is not None:
+                self.cache.put(key, result, latency=time.perf_counter() - started)
+            return result
+        except Exception as e:
+            error = e
+            logger.exception("AsyncAzureOpenAI completion failed")
+            raise _failure("AsyncAzureOpenAILLM.complete_json_async failed", e) from e
+        finally:
+            _record_call(self.telemetry, self.deployment, started, trace, resp, error)
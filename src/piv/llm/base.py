@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+
+
+class BaseLLM(ABC):
+    """Interface the pipeline needs from an LLM client.
+
+    Implementations return the parsed JSON object for a system prompt and user
+    payload. Extra keyword arguments (``bypass_cache``, ``priority``...) are
+    options of particular clients and may be ignored.
+    """
+
+    @abstractmethod
+    def complete_json(self, system_prompt: str, user_payload: str, **kwargs):
+        ...
@@ -0,0 +1,94 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import atexit
+import os
+import threading
+import httpx
+from openai import DefaultHttpxClient
+from logger import CustomLogger
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+_lock = threading.Lock()
+_http_client = None
+_llms = {}
+
+
+def http_settings() -> dict:
+    """Connection pool and timeout settings, read from the environment on each call.
+
+    PIV_HTTP_MAX_CONNECTIONS (32), PIV_HTTP_MAX_KEEPALIVE (16),
+    PIV_HTTP_KEEPALIVE_EXPIRY (60s), PIV_HTTP_CONNECT_TIMEOUT (10s) and
+    PIV_HTTP_READ_TIMEOUT (120s; completions of long documents are slow).
+    """
+    def number(name, default):
+        value = os.getenv(name)
+        return float(value) if value else default
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=int(number("PIV_HTTP_MAX_CONNECTIONS", 32)),
+            max_keepalive_connections=int(number("PIV_HTTP_MAX_KEEPALIVE", 16)),
+            keepalive_expiry=number("PIV_HTTP_KEEPALIVE_EXPIRY", 60.0),
+        ),
+        "timeout": httpx.Timeout(number("PIV_HTTP_READ_TIMEOUT", 120.0),
+                                 connect=number("PIV_HTTP_CONNECT_TIMEOUT", 10.0)),
+    }
+
+
+def shared_http_client() -> httpx.Client:
+    """The process-wide pooled HTTP client used by every synchronous OpenAI client (thread-safe)."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = DefaultHttpxClient(**http_settings())
+        return _http_client
+
+
+def get_llm(mode: str = None, cache_path: str = None):
+    """Process-wide LLM client for `mode` (see `create_llm`), built once and then shared.
+
+    Clients are keyed by mode, response-cache path and Azure configuration, and
+    all use the shared HTTP pool, so repeated pipeline runs and UI sessions
+    reuse warm connections.
+    """
+    from .factory import create_llm
+    from .response_cache import ResponseCache
+    from .scheduler import RateLimitScheduler
+
+    mode = (mode or os.getenv("PIV_LLM_MODE") or "azure").lower()
+    config = tuple(os.getenv(name) for name in (
+        "AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_DEPLOYMENT_NAME", "AZURE_OPENAI_API_VERSION",
+        "PIV_LLM_RECORDINGS", "PIV_STRUCTURED_OUTPUT", "PIV_LLM_HEDGE"))
+    key = (mode, cache_path, config)
+    with _lock:
+        llm = _llms.get(key)
+    if llm is not None:
+        return llm
+    # Only the live Azure client reads the response cache; the offline modes would leave it unused
+    cache = ResponseCache(cache_path) if cache_path and mode == "azure" else None
+    llm = create_llm(mode, cache=cache, scheduler=RateLimitScheduler.from_env(), http_client=shared_http_client())
+    with _lock:
+        # Another thread may have won the race; keep the first client
+        shared = _llms.setdefault(key, llm)
+    if shared is not llm and cache is not None:
+        cache.close()
+    return shared
+
+
+def close_shared_clients():
+    """Close pooled connections and forget cached LLM clients."""
+    global _http_client
+    with _lock:
+        _llms.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+
+atexit.register(close_shared_clients)
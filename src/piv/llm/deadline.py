@@ -0,0 +1,71 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import contextlib
+import contextvars
+import time
+from exception import ValidationException
+
+# Absolute deadline as a time.time() timestamp (wall clock, so it survives in graph state)
+_deadline = contextvars.ContextVar("piv_deadline", default=None)
+
+
+class DeadlineExceeded(ValidationException):
+    """The per-document time budget ran out before the work finished."""
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float = None, until: float = None):
+    """Bound everything in the block by a deadline `seconds` from now or at timestamp `until`.
+
+    Nested scopes can only shorten the effective deadline.
+    """
+    candidates = [t for t in (_deadline.get(), until, None if seconds is None else time.time() + seconds)
+                  if t is not None]
+    token = _deadline.set(min(candidates) if candidates else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.time()
+
+
+def check_deadline(what: str = "operation"):
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+
+def call_timeout(default=None):
+    """Timeout for one request: the time left before the deadline (checked first), else `default`."""
+    check_deadline("LLM call")
+    left = remaining()
+    return default if left is None else left
+
+
+def is_deadline_exceeded(exc) -> bool:
+    """True when `exc`, or any exception it was raised from, is a DeadlineExceeded."""
+    while exc is not None:
+        if isinstance(exc, DeadlineExceeded):
+            return True
+        exc = exc.__cause__
+    return False
+
+
+def in_current_context(fn):
+    """Wrap `fn` to run in a copy of the caller's context variables (deadline, priority lane).
+
+    Thread pools do not inherit context variables; submit the wrapped function instead.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+    return run
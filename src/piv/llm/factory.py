@@ -0,0 +1,49 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import os
+from exception import ValidationException
+from .offline import DEFAULT_RECORDINGS_PATH, RecordingLLM, ReplayLLM, RuleBasedLLM
+
+LLM_MODES = ("azure", "record", "replay", "fake")
+
+
+def create_llm(mode: str = None, cache=None, scheduler=None, http_client=None):
+    """Build the LLM client for the entry points.
+
+    `mode` defaults to PIV_LLM_MODE (else "azure"):
+
+    - ``azure``: live AzureOpenAILLM with the given cache, scheduler and httpx client
+    - ``record``: the same, saving every request/response to PIV_LLM_RECORDINGS
+    - ``replay``: serve PIV_LLM_RECORDINGS offline; PIV_LLM_REPLAY_LATENCY fixes
+      the per-call delay (seconds), otherwise recorded latencies are replayed
+    - ``fake``: rule-based answers from the table extractor, no network
+
+    PIV_LLM_HEDGE set to a percentile (e.g. ``0.95``) wraps the azure client in a
+    HedgedLLM that duplicates calls slower than that percentile of past latencies.
+    """
+    mode = (mode or os.getenv("PIV_LLM_MODE") or "azure").lower()
+    recordings = os.getenv("PIV_LLM_RECORDINGS") or DEFAULT_RECORDINGS_PATH
+    if mode not in LLM_MODES:
+        raise ValidationException(f"Unknown LLM mode '{mode}'; expected one of {', '.join(LLM_MODES)}")
+    if mode == "fake":
+        return RuleBasedLLM()
+    if mode == "replay":
+        latency = os.getenv("PIV_LLM_REPLAY_LATENCY")
+        return ReplayLLM(recordings, latency=float(latency) if latency else None)
+
+    from .azure_openai_client import AzureOpenAILLM
+    # PIV_STRUCTURED_OUTPUT=0 for deployments without strict json_schema support
+    structured = os.getenv("PIV_STRUCTURED_OUTPUT", "1") != "0"
+    if mode == "record":
+        # No response cache while recording: a cache hit would replay as instantaneous
+        return RecordingLLM(AzureOpenAILLM(scheduler=scheduler, http_client=http_client,
+                                           structured_output=structured), recordings)
+    llm = AzureOpenAILLM(cache=cache, scheduler=scheduler, http_client=http_client, structured_output=structured)
+    hedge = os.getenv("PIV_LLM_HEDGE")
+    if hedge and hedge != "0":
+        from .hedging import HedgedLLM
+        return HedgedLLM(llm, percentile=float(hedge))
+    return llm
@@ -0,0 +1,135 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import collections
+import inspect
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logger import CustomLogger
+from .base import BaseLLM
+from .deadline import in_current_context
+from .telemetry import TELEMETRY
+from .tokens import estimate_tokens
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+DEFAULT_PERCENTILE = 0.95
+DEFAULT_MIN_SAMPLES = 20
+
+
+class _HedgePolicy:
+    """Latency history and hedging counters; hedged calls are also counted in `telemetry`."""
+
+    def __init__(self, percentile, min_samples, initial_delay, history, telemetry=None, deployment=None):
+        self.percentile = percentile
+        self.telemetry = telemetry
+        self.deployment = deployment
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self._latencies = collections.deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "extra_prompt_tokens": 0}
+
+    def delay(self):
+        """Seconds to wait before sending a duplicate; `initial_delay` (None: do not hedge)
+        until `min_samples` latencies are known."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        return samples[max(0, math.ceil(self.percentile * len(samples)) - 1)]
+
+    def record(self, latency, hedged=False, hedge_won=False, prompt_tokens=0):
+        with self._lock:
+            self._latencies.append(latency)
+            self._stats["calls"] += 1
+            if hedged:
+                self._stats["hedged"] += 1
+                self._stats["extra_prompt_tokens"] += prompt_tokens
+            if hedge_won:
+                self._stats["hedge_wins"] += 1
+        if hedged and self.telemetry is not None:
+            self.telemetry.record_hedge(self.deployment, won=hedge_won, prompt_tokens=prompt_tokens)
+
+    def stats(self) -> dict:
+        """Hedging counters; `overhead_ratio` is the share of extra requests over logical calls."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["extra_requests"] = stats["hedged"]
+        stats["overhead_ratio"] = stats["hedged"] / stats["calls"] if stats["calls"] else 0.0
+        stats["hedge_delay_s"] = self.delay()
+        return stats
+
+
+def _accepts(fn, name) -> bool:
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in params or any(p.kind is p.VAR_KEYWORD for p in params.values())
+
+
+class HedgedLLM(BaseLLM):
+    """Sends a duplicate request when a call outlives the `percentile` latency seen so far.
+
+    Whichever request answers first wins; a losing request still runs to completion
+    on its worker thread (blocking HTTP cannot be cancelled) and its answer is
+    dropped. Until `min_samples` latencies are known, `initial_delay` is used, and
+    None disables hedging. Duplicates bypass the response cache when the inner
+    client supports it. Streaming is not hedged, so the graph falls back to
+    whole-response extraction when this wrapper is used. Hedged calls are counted
+    in `telemetry` (the inner client's, else the process-wide TELEMETRY).
+    """
+
+    def __init__(self, inner, percentile: float = DEFAULT_PERCENTILE, min_samples: int = DEFAULT_MIN_SAMPLES,
+                 initial_delay: float = None, max_workers: int = 16, history: int = 500, telemetry=None):
+        self.inner = inner
+        self.supports_response_schema = getattr(inner, "supports_response_schema", False)
+        telemetry = telemetry if telemetry is not None else getattr(inner, "telemetry", TELEMETRY)
+        self.policy = _HedgePolicy(percentile, min_samples, initial_delay, history, telemetry,
+                                   getattr(inner, "deployment", None))
+        self._bypass_cache = _accepts(inner.complete_json, "bypass_cache")
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="piv-hedge")
+
+    def stats(self) -> dict:
+        return self.policy.stats()
+
+    def complete_json(self, system_prompt: str, user_payload: str, **kwargs):
+        delay = self.policy.delay()
+        started = time.perf_counter()
+        if delay is None:
+            result = self.inner.complete_json(system_prompt, user_payload, **kwargs)
+            self.policy.record(time.perf_counter() - started)
+            return result
+
+        call = in_current_context(self.inner.complete_json)
+        primary = self._pool.submit(call, system_prompt, user_payload, **kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            result = primary.result()
+            self.policy.record(time.perf_counter() - started)
+            return result
+
+        hedge_kwargs = dict(kwargs, bypass_cache=True) if self._bypass_cache else kwargs
+        hedge = self._pool.submit(call, system_prompt, user_payload, **hedge_kwargs)
+        logger.info("Hedging LLM call after %.2fs", delay)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                self.policy.record(time.perf_counter() - started, hedged=True, hedge_won=future is hedge,
+                                   prompt_tokens=estimate_tokens(system_prompt + user_payload))
+                return future.result()
+        self.policy.record(time.perf_counter() - started, hedged=True,
+                           prompt_tokens=estimate_tokens(system_prompt + user_payload))
+        raise error
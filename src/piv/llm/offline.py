@@ -0,0 +1,133 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import json
+import os
+import threading
+import time
+from logger import CustomLogger
+from exception import ValidationException
+from ..preprocessing.table_extractor import extract_sections_via_rules
+from .base import BaseLLM
+from .prompts import parse_schema_block
+from .response_cache import ResponseCache
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+DEFAULT_RECORDINGS_PATH = os.path.join(os.getcwd(), ".piv_cache", "llm_recordings.jsonl")
+
+
+def recording_key(system_prompt: str, user_payload: str) -> str:
+    # Deployment-independent so recordings replay against any configuration
+    return ResponseCache.make_key("", "", system_prompt or "", user_payload)
+
+
+def _emit_sections(answer, on_section):
+    """Report each top-level object of a complete answer, as a streaming client would."""
+    for key, value in (answer or {}).items():
+        if isinstance(value, dict):
+            on_section(key, value)
+
+
+class RecordingLLM(BaseLLM):
+    """Passes calls through to `inner` and appends each request/response pair to a JSONL file.
+
+    Streaming calls go to the inner client's `complete_json_streaming` when it
+    has one, so recorded runs take the same extraction path as live ones.
+    """
+
+    def __init__(self, inner, path: str = DEFAULT_RECORDINGS_PATH):
+        self.inner = inner
+        self.supports_response_schema = getattr(inner, "supports_response_schema", False)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _record(self, system_prompt, user_payload, started, result):
+        record = {
+            "key": recording_key(system_prompt, user_payload),
+            "latency": time.perf_counter() - started,
+            "response": result,
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+        return result
+
+    def complete_json(self, system_prompt: str, user_payload: str, **kwargs):
+        started = time.perf_counter()
+        result = self.inner.complete_json(system_prompt, user_payload, **kwargs)
+        return self._record(system_prompt, user_payload, started, result)
+
+    def complete_json_streaming(self, system_prompt: str, user_payload: str, on_section, **kwargs):
+        started = time.perf_counter()
+        stream = getattr(self.inner, "complete_json_streaming", None)
+        if callable(stream):
+            result = stream(system_prompt, user_payload, on_section, **kwargs)
+        else:
+            result = self.inner.complete_json(system_prompt, user_payload, **kwargs)
+            _emit_sections(result, on_section)
+        return self._record(system_prompt, user_payload, started, result)
+
+
+class ReplayLLM(BaseLLM):
+    """Serves responses captured by RecordingLLM without network access.
+
+    Each call sleeps for a synthetic latency: the recorded one times
+    `latency_scale`, or the fixed `latency` seconds when given. Requests that
+    were never recorded raise ValidationException. Streaming calls replay the
+    answer through the section callback, so replays take the streaming path.
+    """
+
+    def __init__(self, path: str = DEFAULT_RECORDINGS_PATH, latency: float = None, latency_scale: float = 1.0):
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.recordings = {}
+        try:
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.recordings[record["key"]] = record
+        except (OSError, json.JSONDecodeError) as e:
+            logger.exception("Failed to load LLM recordings: %s", path)
+            raise ValidationException(f"Failed to load LLM recordings: {path}", e) from e
+
+    def complete_json(self, system_prompt: str, user_payload: str, **kwargs):
+        record = self.recordings.get(recording_key(system_prompt, user_payload))
+        if record is None:
+            raise ValidationException("ReplayLLM: no recording for this request")
+        delay = self.latency if self.latency is not None else record.get("latency", 0.0) * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        return json.loads(json.dumps(record["response"]))
+
+    def complete_json_streaming(self, system_prompt: str, user_payload: str, on_section, **kwargs):
+        """Replay the recorded answer through `on_section`, section by section, then return it."""
+        result = self.complete_json(system_prompt, user_payload, **kwargs)
+        _emit_sections(result, on_section)
+        return result
+
+
+class RuleBasedLLM(BaseLLM):
+    """Deterministic stand-in that answers extraction prompts with the table-layout rules.
+
+    The JSON template in the system prompt (full or targeted sub-schema) is
+    filled from the document in the user payload; unmatched fields stay blank.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def complete_json(self, system_prompt: str, user_payload: str, **kwargs):
+        try:
+            schema = parse_schema_block(system_prompt or "")
+        except (ValueError, json.JSONDecodeError) as e:
+            raise ValidationException("RuleBasedLLM: no JSON template in system prompt", e) from e
+        if self.latency > 0:
+            time.sleep(self.latency)
+        sections, _ = extract_sections_via_rules(user_payload, schema)
+        return sections
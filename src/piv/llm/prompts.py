@@ -3,6 +3,7 @@ import sys
 from pathlib import Path as PathlibPath
 sys.path.insert(0, str(PathlibPath(__file__).parent.parent.parent.parent))
 
+import json
 from pathlib import Path
 from logger import CustomLogger
 from exception import ValidationException
@@ -21,3 +22,22 @@ def load_prompt(path):
     except Exception as e:
         logger.exception("Failed to load prompt: %s", path)
         raise ValidationException(f"Failed to load prompt: {path}", e) from e
+
+
+def parse_schema_block(text):
+    """Parse the JSON template in `text`: the block starting at the first line that
+    is exactly ``{`` and ending at the next line that is exactly ``}``."""
+    lines = text.splitlines()
+    start = lines.index("{")
+    end = lines.index("}", start)
+    return json.loads("\n".join(lines[start:end + 1]))
+
+
+def load_extractor_schema(path):
+    """Return the ADSP JSON template embedded in the section extractor prompt."""
+    text = load_prompt(path)
+    try:
+        return parse_schema_block(text)
+    except (ValueError, json.JSONDecodeError) as e:
+        logger.exception("No JSON schema found in prompt: %s", path)
+        raise ValidationException(f"No JSON schema found in prompt: {path}", e) from e
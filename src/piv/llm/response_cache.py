@@ -0,0 +1,150 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from logger import CustomLogger
+from exception import ValidationException
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.getcwd(), ".piv_cache", "llm_responses.sqlite3")
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache for deterministic (temperature 0) JSON completions.
+
+    Lookups hit an in-process LRU first and a persistent SQLite table second;
+    disk hits are promoted into memory. Entries expire after `ttl_seconds` and the
+    SQLite tier is trimmed to `max_entries` by last access. Pass ``path=None`` for
+    a memory-only cache.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, memory_entries: int = 256, max_entries: int = 10000,
+                 ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "latency_saved_s": 0.0}
+        self._db = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, "
+                    "accessed REAL NOT NULL, latency REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.exception("Failed to open LLM response cache: %s", path)
+                raise ValidationException(f"Failed to open LLM response cache: {path}", e) from e
+
+    @staticmethod
+    def make_key(deployment, api_version, system_prompt: str, payload: str, variant: str = "") -> str:
+        """Cache key for one request; `variant` distinguishes request options such as response formats."""
+        parts = [deployment or "", api_version or "", _sha(system_prompt), _sha(payload), variant]
+        return _sha("\n".join(parts))
+
+    def _remember(self, key, value, created, latency):
+        self._memory[key] = (value, created, latency)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """Return the cached JSON object for `key`, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None and now - hit[1] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                self._stats["latency_saved_s"] += hit[2]
+                return json.loads(hit[0])
+            self._memory.pop(key, None)
+
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created, latency FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._remember(key, row[0], row[1], row[2])
+            self._stats["disk_hits"] += 1
+            self._stats["latency_saved_s"] += row[2]
+            return json.loads(row[0])
+
+    def put(self, key: str, value, latency: float = 0.0):
+        """Store a JSON-serialisable completion along with the latency it took to produce."""
+        text = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._remember(key, text, now, latency)
+            self._stats["writes"] += 1
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed, latency) VALUES (?, ?, ?, ?, ?)",
+                    (key, text, now, now, latency),
+                )
+                self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+                (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+                if count > self.max_entries:
+                    self._db.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+                    self._stats["evictions"] += count - self.max_entries
+                self._db.commit()
+            except sqlite3.Error:
+                # A failed cache write must never fail the completion itself
+                logger.warning("Could not write LLM response cache entry", exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self):
+        """Close the SQLite connection; the memory tier keeps working."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {**self._stats, "hit_rate": hits / total if total else 0.0}
@@ -0,0 +1,261 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from logger import CustomLogger
+from .deadline import check_deadline, remaining
+from .tokens import estimate_tokens
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Lower value = served first. Streamlit requests are interactive; run_batch runs as batch.
+# Lanes are ordered by the scheduler instance, i.e. only within one process: a separate
+# batch process has its own scheduler and competes with the UI only through Azure's limits.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+_current_priority = contextvars.ContextVar("piv_llm_priority", default=PRIORITY_INTERACTIVE)
+
+# Poll interval while a higher-priority lane is waiting
+_YIELD_SECONDS = 0.02
+
+
+@contextlib.contextmanager
+def priority_scope(priority: int):
+    """Run LLM calls made inside the block in the given priority lane."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most one minute of capacity."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than capacity wait for a full bucket)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+def _bounded(wait: float) -> float:
+    # Sleep at most a second, and never past the current deadline
+    left = remaining()
+    return max(0.0, min(wait, 1.0, left if left is not None else wait))
+
+
+def is_rate_limited(exc) -> bool:
+    return getattr(exc, "status_code", None) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(exc):
+    """Server-requested delay from ``retry-after-ms`` / ``retry-after`` headers, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+class RateLimitScheduler:
+    """Admission control for Azure OpenAI calls sized to a deployment's TPM/RPM quota.
+
+    Each call reserves its estimated tokens (prompt estimate plus
+    `completion_tokens`) and one request from token buckets before it is sent.
+    Waiting callers are served strictly by priority lane. On HTTP 429 the call
+    is retried after the server's Retry-After delay (or jittered exponential
+    backoff), and every lane pauses for that period.
+    """
+
+    def __init__(self, tpm: int = None, rpm: int = None, max_retries: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 60.0, completion_tokens: int = 1500):
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_tokens = completion_tokens
+        self._lock = threading.Lock()
+        self._waiting = {}
+        self._paused_until = 0.0
+        self._stats = {"requests": 0, "rate_limited": 0, "retries": 0, "queue_wait_s": 0.0}
+
+    @classmethod
+    def from_env(cls):
+        """Build from PIV_AZURE_TPM / PIV_AZURE_RPM; returns None when neither is set."""
+        tpm = os.getenv("PIV_AZURE_TPM")
+        rpm = os.getenv("PIV_AZURE_RPM")
+        if not tpm and not rpm:
+            return None
+        return cls(tpm=int(tpm) if tpm else None, rpm=int(rpm) if rpm else None)
+
+    def estimate(self, system_prompt: str, payload: str) -> int:
+        return estimate_tokens(system_prompt) + estimate_tokens(payload) + self.completion_tokens
+
+    def _try_acquire(self, tokens: int, priority: int) -> float:
+        """Take capacity and return 0, or return how long to wait before trying again."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._paused_until:
+                return self._paused_until - now
+            if any(count for lane, count in self._waiting.items() if lane < priority):
+                return _YIELD_SECONDS
+            wait = 0.0
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.wait_time(tokens, now))
+            if self.requests is not None:
+                wait = max(wait, self.requests.wait_time(1, now))
+            if wait > 0:
+                return wait
+            if self.tokens is not None:
+                self.tokens.consume(tokens)
+            if self.requests is not None:
+                self.requests.consume(1)
+            self._stats["requests"] += 1
+            return 0.0
+
+    def _enter(self, priority):
+        with self._lock:
+            self._waiting[priority] = self._waiting.get(priority, 0) + 1
+
+    def _leave(self, priority, waited):
+        with self._lock:
+            self._waiting[priority] -= 1
+            self._stats["queue_wait_s"] += waited
+
+    def acquire(self, tokens: int, priority: int = None) -> float:
+        """Block until the call may be sent; returns the seconds spent waiting."""
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                wait = self._try_acquire(tokens, priority)
+                if wait <= 0:
+                    break
+                check_deadline("rate-limit admission")
+                time.sleep(_bounded(wait))
+        finally:
+            waited = time.monotonic() - started
+            self._leave(priority, waited)
+        return waited
+
+    async def acquire_async(self, tokens: int, priority: int = None) -> float:
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                wait = self._try_acquire(tokens, priority)
+                if wait <= 0:
+                    break
+                check_deadline("rate-limit admission")
+                await asyncio.sleep(_bounded(wait))
+        finally:
+            waited = time.monotonic() - started
+            self._leave(priority, waited)
+        return waited
+
+    def _backoff(self, exc, attempt: int) -> float:
+        delay = retry_after_seconds(exc)
+        if delay is None:
+            # Full jitter keeps many clients from retrying in lockstep
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        else:
+            delay = min(self.max_delay, delay) + random.uniform(0, self.base_delay / 4)
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._stats["rate_limited"] += 1
+        return delay
+
+    def run(self, call, tokens: int, priority: int = None, trace: dict = None):
+        """Run `call()` under the rate limit, retrying it on 429 responses.
+
+        When given, `trace` accumulates ``queue_wait_s`` and ``retries`` for this call.
+        """
+        attempt = 0
+        while True:
+            waited = self.acquire(tokens, priority)
+            if trace is not None:
+                trace["queue_wait_s"] = trace.get("queue_wait_s", 0.0) + waited
+            try:
+                return call()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                delay = self._backoff(e, attempt)
+                logger.warning("Azure OpenAI rate limited; retrying in %.2fs (attempt %d)", delay, attempt + 1)
+                with self._lock:
+                    self._stats["retries"] += 1
+                if trace is not None:
+                    trace["retries"] = trace.get("retries", 0) + 1
+                attempt += 1
+
+    async def run_async(self, call, tokens: int, priority: int = None, trace: dict = None):
+        """Async variant of `run`; `call` returns an awaitable."""
+        attempt = 0
+        while True:
+            waited = await self.acquire_async(tokens, priority)
+            if trace is not None:
+                trace["queue_wait_s"] = trace.get("queue_wait_s", 0.0) + waited
+            try:
+                return await call()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                delay = self._backoff(e, attempt)
+                logger.warning("Azure OpenAI rate limited; retrying in %.2fs (attempt %d)", delay, attempt + 1)
+                with self._lock:
+                    self._stats["retries"] += 1
+                if trace is not None:
+                    trace["retries"] = trace.get("retries", 0) + 1
+                attempt += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,66 @@
+import json
+
+
+class IncrementalSectionParser:
+    """Incremental scanner over a streamed top-level JSON object.
+
+    `feed` accepts arbitrary text deltas and returns the ``(key, value)`` pairs
+    of top-level members whose object value closed within that delta, in
+    stream order. Scalar members are ignored; the complete answer is still
+    parsed (and repaired) from `text` once the stream ends.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._last_string = None
+        self._key = None
+        self._value_start = None
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, delta: str):
+        if not delta:
+            return []
+        self._text += delta
+        text = self._text
+        closed = []
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start:i + 1]
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and self._depth == 1 and self._last_string is not None:
+                self._key = json.loads(self._last_string)
+            elif ch in ",}" and self._depth == 1:
+                self._last_string = None
+            if ch in "{[":
+                self._depth += 1
+                if self._depth == 2 and ch == "{":
+                    self._value_start = i
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    try:
+                        closed.append((self._key, json.loads(text[self._value_start:i + 1])))
+                    except json.JSONDecodeError:
+                        pass
+                    self._value_start = None
+        self._pos = len(text)
+        return closed
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import re
+from typing import Annotated
+from pydantic import BeforeValidator, ConfigDict, Field, create_model
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# A string right after "{" or "," with no colon yet: a key cut off before its value
+_DANGLING_KEY = re.compile(r'[{,]\s*"(?:[^"\\]|\\.)*"$')
+
+_models = {}
+
+
+def schema_fingerprint(template) -> str:
+    return hashlib.sha256(json.dumps(template, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def response_format_for(template, name: str = "adsp_sections") -> dict:
+    """Strict ``json_schema`` response format for an ADSP template: every key required, all leaves strings."""
+    def node(value):
+        if isinstance(value, dict):
+            return {
+                "type": "object",
+                "properties": {k: node(v) for k, v in value.items()},
+                "required": list(value),
+                "additionalProperties": False,
+            }
+        return {"type": "string"}
+
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": node(template)}}
+
+
+def _as_text(value):
+    # Models occasionally answer numbers, null or bullet lists for string fields
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list):
+        return "\n".join(str(_as_text(v)) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def _as_object(value):
+    return value if isinstance(value, dict) else {}
+
+
+Text = Annotated[str, BeforeValidator(_as_text)]
+
+
+def sections_model(template):
+    """Pydantic model mirroring `template`; absent keys default to "" and unknown keys are dropped.
+
+    Field names such as "Practice/Account" are not identifiers, so they are
+    aliases; dump with ``by_alias=True``.
+    """
+    key = schema_fingerprint(template)
+    if key not in _models:
+        _models[key] = _build_model("Sections", template)
+    return _models[key]
+
+
+def _build_model(name, template):
+    fields = {}
+    for i, (field_name, child) in enumerate(template.items()):
+        if isinstance(child, dict):
+            sub = _build_model(f"{name}_{i}", child)
+            fields[f"f{i}"] = (Annotated[sub, BeforeValidator(_as_object)], Field(default_factory=sub, alias=field_name))
+        else:
+            fields[f"f{i}"] = (Text, Field("", alias=field_name))
+    return create_model(name, __config__=ConfigDict(extra="ignore", populate_by_name=False), **fields)
+
+
+def repair_json(text: str):
+    """Parse model output, fixing the usual defects of truncated or sloppy JSON.
+
+    Strips code fences and text around the object, terminates an open string,
+    completes a dangling key, drops trailing commas and closes open brackets.
+    Raises ValueError when the result still does not parse.
+    """
+    try:
+        return json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        pass
+    s = _FENCE.sub("", text or "")
+    start = s.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in model output")
+    s = s[start:]
+
+    stack, in_string, escaped = [], False, False
+    for i, ch in enumerate(s):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+            if not stack:
+                # Ignore anything after the top-level object
+                s = s[:i + 1]
+                break
+
+    if escaped:
+        s = s[:-1]
+    if in_string:
+        s += '"'
+    s = s.rstrip()
+    if s.endswith(":"):
+        s += ' ""'
+    elif s.endswith(","):
+        s = s[:-1]
+    elif stack and stack[-1] == "}" and _DANGLING_KEY.search(s):
+        s += ': ""'
+    s = _TRAILING_COMMA.sub(r"\1", s + "".join(reversed(stack)))
+    try:
+        return json.loads(s)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"unrepairable model output: {e}") from e
+
+
+def parse_structured(text: str, template):
+    """Return ``(sections, repaired)``: `text` parsed (repairing it if needed) and
+    validated against `template`, with absent keys filled with ""."""
+    try:
+        data, repaired = json.loads(text), False
+    except (TypeError, json.JSONDecodeError):
+        data, repaired = repair_json(text), True
+    if not isinstance(data, dict):
+        raise ValueError("model output is not a JSON object")
+    model = sections_model(template)
+    return model.model_validate(data).model_dump(by_alias=True), repaired
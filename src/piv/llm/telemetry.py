@@ -0,0 +1,206 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import json
+import math
+import threading
+from collections import deque
+from logger import CustomLogger
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Seconds; spans queueing behind a rate limit up to multi-minute completions
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Metric name -> buckets; recorded per deployment
+METRICS = {
+    "queue_wait_seconds": LATENCY_BUCKETS,
+    "ttfb_seconds": LATENCY_BUCKETS,
+    "latency_seconds": LATENCY_BUCKETS,
+    "prompt_tokens": TOKEN_BUCKETS,
+    "completion_tokens": TOKEN_BUCKETS,
+}
+
+
+def classify_error(exc) -> str:
+    """Coarse error class for an LLM call failure."""
+    status = getattr(exc, "status_code", None)
+    name = type(exc).__name__
+    if status == 429 or name == "RateLimitError":
+        return "rate_limited"
+    if name in ("APITimeoutError", "TimeoutError", "ReadTimeout", "ConnectTimeout", "DeadlineExceeded"):
+        return "timeout"
+    if name in ("APIConnectionError", "ConnectError"):
+        return "connection"
+    if isinstance(exc, json.JSONDecodeError):
+        return "invalid_json"
+    if status is not None and status >= 500:
+        return "server_error"
+    if status is not None and status >= 400:
+        return "client_error"
+    return name
+
+
+class Histogram:
+    """Cumulative bucket counts (for Prometheus) plus a window of recent samples (for quantiles)."""
+
+    def __init__(self, buckets, window: int = 10000):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q: float):
+        """Nearest-rank quantile over the sample window; None when empty."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def snapshot(self) -> dict:
+        cumulative, total = {}, 0
+        for bound, n in zip(self.buckets + ("+Inf",), self.counts):
+            total += n
+            cumulative[str(bound)] = total
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": cumulative,
+            **{f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES},
+        }
+
+
+class LLMTelemetry:
+    """In-process metrics for LLM calls, aggregated per deployment.
+
+    Every call records queue wait, time to first byte, total latency, prompt and
+    completion tokens, retries and (on failure) an error class from
+    `classify_error`; hedged calls are counted by `record_hedge`. `snapshot()`/`to_json()` give histograms with p50/p95/p99;
+    `to_prometheus()` renders the text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def _histogram(self, name, deployment):
+        key = (name, deployment)
+        if key not in self._histograms:
+            self._histograms[key] = Histogram(METRICS[name])
+        return self._histograms[key]
+
+    def _inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record_call(self, deployment: str, latency: float, queue_wait: float = 0.0, ttfb: float = None,
+                    prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0,
+                    retries: int = 0, error=None):
+        deployment = deployment or "unknown"
+        error_class = classify_error(error) if error is not None else None
+        with self._lock:
+            self._inc("calls_total", {"deployment": deployment})
+            self._histogram("queue_wait_seconds", deployment).observe(queue_wait or 0.0)
+            self._histogram("latency_seconds", deployment).observe(latency)
+            if ttfb is not None:
+                self._histogram("ttfb_seconds", deployment).observe(ttfb)
+            if retries:
+                self._inc("retries_total", {"deployment": deployment}, retries)
+            if error_class is not None:
+                self._inc("errors_total", {"deployment": deployment, "error_class": error_class})
+                return
+            self._histogram("prompt_tokens", deployment).observe(prompt_tokens)
+            self._histogram("completion_tokens", deployment).observe(completion_tokens)
+            self._inc("cached_tokens_total", {"deployment": deployment}, cached_tokens)
+
+    def record_hedge(self, deployment: str, won: bool = False, prompt_tokens: int = 0):
+        """Count a hedged call (a duplicate request was sent) and the duplicate's prompt tokens."""
+        deployment = deployment or "unknown"
+        with self._lock:
+            self._inc("hedged_total", {"deployment": deployment})
+            self._inc("hedge_extra_prompt_tokens_total", {"deployment": deployment}, prompt_tokens)
+            if won:
+                self._inc("hedge_wins_total", {"deployment": deployment})
+
+    def snapshot(self) -> dict:
+        """``{deployment: {"counters": {...}, "histograms": {...}}}``."""
+        out = {}
+        with self._lock:
+            for (name, deployment), hist in sorted(self._histograms.items()):
+                out.setdefault(deployment, {"counters": {}, "histograms": {}})["histograms"][name] = hist.snapshot()
+            for (name, labels), value in sorted(self._counters.items()):
+                labels = dict(labels)
+                entry = out.setdefault(labels.pop("deployment"), {"counters": {}, "histograms": {}})["counters"]
+                if labels:
+                    entry.setdefault(name, {})[labels["error_class"]] = value
+                else:
+                    entry[name] = value
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = "piv_llm") -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        for name in sorted({n for (n, _), _ in counters}):
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for (n, labels), value in counters:
+                if n == name:
+                    lines.append(f"{prefix}_{name}{_labels(dict(labels))} {value}")
+        for name in sorted({n for (n, _), _ in histograms}):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for (n, deployment), hist in histograms:
+                if n != name:
+                    continue
+                total = 0
+                for bound, count in zip(hist.buckets + ("+Inf",), hist.counts):
+                    total += count
+                    lines.append(f"{prefix}_{name}_bucket{_labels({'deployment': deployment, 'le': bound})} {total}")
+                lines.append(f"{prefix}_{name}_sum{_labels({'deployment': deployment})} {hist.sum}")
+                lines.append(f"{prefix}_{name}_count{_labels({'deployment': deployment})} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dump to `path`: Prometheus text for ``.prom``/``.txt``, JSON otherwise."""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix in (".prom", ".txt") else self.to_json()
+        path.write_text(text, encoding="utf-8")
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+# Process-wide default used by the Azure clients
+TELEMETRY = LLMTelemetry()
@@ -0,0 +1,10 @@
+
+# Rough average for English prose with GPT tokenizers; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text) -> int:
+    """Cheap token estimate (no tokenizer dependency) used for budgets and rate limits."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -0,0 +1,60 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import threading
+from collections import deque
+from logger import CustomLogger
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+
+def usage_from_response(resp) -> dict:
+    """Token counts from a chat completion's ``usage`` (zeros when the provider omits it)."""
+    usage = getattr(resp, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", None) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", None) or 0,
+    }
+
+
+class UsageTracker:
+    """Per-call token accounting for LLM clients.
+
+    Keeps the last `history` call records plus running totals, so the share of
+    prompt tokens served from the provider's prompt cache (and the latency of
+    those calls) can be compared against uncached ones.
+    """
+
+    def __init__(self, history: int = 1000):
+        self.calls = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._totals = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "latency_s": 0.0}
+
+    def record(self, resp, latency: float, deployment: str = None) -> dict:
+        entry = {"deployment": deployment, "latency_s": latency, **usage_from_response(resp)}
+        with self._lock:
+            self.calls.append(entry)
+            self._totals["calls"] += 1
+            self._totals["latency_s"] += latency
+            for key in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+                self._totals[key] += entry[key]
+        logger.info("LLM call: %d prompt tokens (%d cached), %d completion tokens, %.2fs",
+                    entry["prompt_tokens"], entry["cached_tokens"], entry["completion_tokens"], latency)
+        return entry
+
+    def summary(self) -> dict:
+        with self._lock:
+            totals = dict(self._totals)
+            cached = [c["latency_s"] for c in self.calls if c["cached_tokens"]]
+            uncached = [c["latency_s"] for c in self.calls if not c["cached_tokens"]]
+        prompt = totals["prompt_tokens"]
+        totals["cached_ratio"] = totals["cached_tokens"] / prompt if prompt else 0.0
+        totals["mean_latency_cached_s"] = sum(cached) / len(cached) if cached else None
+        totals["mean_latency_uncached_s"] = sum(uncached) / len(uncached) if uncached else None
+        return totals
@@ -0,0 +1,133 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from logger import CustomLogger
+from exception import ValidationException
+from ..io.excel_reader import SHEET_SEPARATOR
+from ..llm.deadline import in_current_context
+from ..llm.tokens import estimate_tokens
+from .schema import empty_sections, field_id, get_field, iter_schema_fields, set_field
+from .semantic_extractor import extract_sections_via_llm, extract_sections_via_llm_async
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Documents above this many estimated tokens are extracted chunk by chunk
+DEFAULT_CHUNK_TOKENS = 24000
+DEFAULT_MAX_WORKERS = 8
+
+
+def split_document(text, max_tokens: int = DEFAULT_CHUNK_TOKENS):
+    """Split workbook text into chunks of at most `max_tokens` estimated tokens.
+
+    Whole sheets are packed together while they fit; a sheet that is too large on
+    its own is cut between rows. A single row larger than the limit becomes its
+    own chunk rather than being cut mid-cell.
+    """
+    chunks, current, used = [], [], 0
+    sep_tokens = estimate_tokens(SHEET_SEPARATOR)
+
+    def flush():
+        nonlocal current, used
+        if current:
+            chunks.append(SHEET_SEPARATOR.join(current))
+        current, used = [], 0
+
+    for sheet in (text or "").split(SHEET_SEPARATOR):
+        if not sheet.strip():
+            continue
+        cost = estimate_tokens(sheet) + sep_tokens
+        if used + cost <= max_tokens:
+            current.append(sheet)
+            used += cost
+            continue
+        flush()
+        if cost <= max_tokens:
+            current, used = [sheet], cost
+            continue
+        rows, rows_used = [], 0
+        for row in sheet.split("\n"):
+            row_cost = estimate_tokens(row) + 1
+            if rows and rows_used + row_cost > max_tokens:
+                chunks.append("\n".join(rows))
+                rows, rows_used = [], 0
+            rows.append(row)
+            rows_used += row_cost
+        if rows:
+            current, used = ["\n".join(rows)], rows_used
+    flush()
+    return chunks
+
+
+def _normalise(value) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def merge_partial_sections(partials, schema):
+    """Merge per-chunk extractions field by field.
+
+    Blank values are ignored. When chunks disagree the value reported by most
+    chunks wins (compared ignoring case and whitespace), ties going to the
+    earliest chunk, so the result depends only on chunk order. Returns
+    ``(sections, conflicts)`` with `conflicts` mapping field ids to the distinct
+    values seen.
+    """
+    merged = empty_sections(schema)
+    conflicts = {}
+    for section_key, path in iter_schema_fields(schema):
+        votes = {}
+        for index, partial in enumerate(partials):
+            value = get_field(partial if isinstance(partial, dict) else {}, section_key, path)
+            if isinstance(value, dict) or not str(value).strip():
+                continue
+            key = _normalise(value)
+            count, first, original = votes.get(key, (0, index, str(value).strip()))
+            votes[key] = (count + 1, first, original)
+        if not votes:
+            continue
+        ranked = sorted(votes.values(), key=lambda v: (-v[0], v[1]))
+        set_field(merged, section_key, path, ranked[0][2])
+        if len(ranked) > 1:
+            conflicts[field_id(section_key, path)] = [v[2] for v in sorted(votes.values(), key=lambda v: v[1])]
+    return merged, conflicts
+
+
+def extract_sections_chunked(text, prompts_dir, llm, schema, max_tokens: int = DEFAULT_CHUNK_TOKENS,
+                             max_workers: int = DEFAULT_MAX_WORKERS):
+    """Map-reduce extraction: one concurrent `complete_json` call per chunk, then a field-wise merge.
+
+    Returns ``(sections, report)``; the report lists the chunk count and conflicts.
+    """
+    try:
+        chunks = split_document(text, max_tokens)
+        if not chunks:
+            return empty_sections(schema), {"chunks": 0, "conflicts": {}}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            extract = in_current_context(lambda chunk: extract_sections_via_llm(chunk, prompts_dir, llm))
+            partials = list(pool.map(extract, chunks))
+        sections, conflicts = merge_partial_sections(partials, schema)
+        logger.info("Extracted %d chunks with %d conflicting fields", len(chunks), len(conflicts))
+        return sections, {"chunks": len(chunks), "conflicts": conflicts}
+    except Exception as e:
+        logger.exception("Failed chunked section extraction")
+        raise ValidationException("extract_sections_chunked failed", e) from e
+
+
+async def extract_sections_chunked_async(text, prompts_dir, llm, schema, max_tokens: int = DEFAULT_CHUNK_TOKENS):
+    """Async variant of `extract_sections_chunked`; concurrency is bounded by the client itself."""
+    try:
+        chunks = split_document(text, max_tokens)
+        if not chunks:
+            return empty_sections(schema), {"chunks": 0, "conflicts": {}}
+        partials = await asyncio.gather(*(extract_sections_via_llm_async(chunk, prompts_dir, llm) for chunk in chunks))
+        sections, conflicts = merge_partial_sections(partials, schema)
+        logger.info("Extracted %d chunks with %d conflicting fields", len(chunks), len(conflicts))
+        return sections, {"chunks": len(chunks), "conflicts": conflicts}
+    except Exception as e:
+        logger.exception("Failed chunked section extraction")
+        raise ValidationException("extract_sections_chunked_async failed", e) from e
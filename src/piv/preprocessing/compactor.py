@@ -0,0 +1,134 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import re
+from logger import CustomLogger
+from exception import ValidationException
+from ..io.excel_reader import SHEET_SEPARATOR
+from ..llm.tokens import estimate_tokens
+from .schema import iter_schema_fields
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Template rows that never carry intake content
+DEFAULT_BOILERPLATE = [
+    r"^(instructions?|guidelines?|notes?)\s*:?$",
+    r"^please (fill|complete|enter|provide|use)\b",
+    r"^(do not|don't) (edit|modify|delete|change)\b",
+    r"^for internal use only\b",
+    r"^page \d+( of \d+)?$",
+    r"^(template )?version\s*:?\s*v?\d+(\.\d+)*$",
+]
+
+# Rows at the top of the first sheet are always kept: the title doubles as the Project Name fallback
+KEEP_LEADING_ROWS = 3
+
+_TOKEN = re.compile(r"[^\W_]+")
+# A row label of 5+ characters repeated back to back at the start of a row, as produced by
+# merged label cells; only anchored at the row start so equal neighbouring values survive
+_REPEATED_LABEL = re.compile(r"^(\S.{3,}?\S)(?:\s+\1)+(?!\S)")
+
+
+def _schema_vocabulary(schema):
+    vocab = set()
+    for section_key, path in iter_schema_fields(schema or {}):
+        vocab.update(_TOKEN.findall(section_key.lower()))
+        for key in path:
+            vocab.update(_TOKEN.findall(key.lower()))
+    return vocab
+
+
+def _relevance(row: str, vocab) -> int:
+    return sum(1 for tok in set(_TOKEN.findall(row.lower())) if tok in vocab)
+
+
+def compact_document(text, schema=None, token_budget: int = None, boilerplate=None, collapse_repeats: bool = False):
+    """Shrink workbook text before it is placed into the extraction prompt.
+
+    Collapses whitespace, drops template boilerplate and rows identical to the
+    row just before them (rows elsewhere are kept: in label-over-value layouts
+    an equal value such as "TBD" belongs to a different label). With
+    `collapse_repeats` a row label repeated by merged cells is squashed. When
+    `token_budget` is given and still exceeded, the rows (and sheets) most
+    relevant to the schema field names are kept, in their original order. Returns ``(text, stats)`` where
+    `stats` reports tokens before/after/saved and rows dropped per reason.
+    """
+    try:
+        patterns = [re.compile(p, re.IGNORECASE) for p in (DEFAULT_BOILERPLATE if boilerplate is None else boilerplate)]
+        vocab = _schema_vocabulary(schema)
+        dropped = {"duplicate": 0, "boilerplate": 0, "budget": 0}
+
+        sheets = []
+        for sheet_text in (text or "").split(SHEET_SEPARATOR):
+            rows = []
+            for raw in sheet_text.split("\n"):
+                row = " ".join(raw.split())
+                if not row:
+                    continue
+                if collapse_repeats:
+                    row = _REPEATED_LABEL.sub(r"\1", row)
+                if any(p.search(row) for p in patterns):
+                    dropped["boilerplate"] += 1
+                    continue
+                if rows and row == rows[-1]:
+                    dropped["duplicate"] += 1
+                    continue
+                rows.append(row)
+            if rows:
+                sheets.append(rows)
+
+        if token_budget is not None:
+            sheets = _trim_to_budget(sheets, vocab, token_budget, dropped)
+
+        compacted = SHEET_SEPARATOR.join("\n".join(rows) for rows in sheets)
+        before, after = estimate_tokens(text), estimate_tokens(compacted)
+        stats = {
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": before - after,
+            "rows_dropped": dropped,
+        }
+        logger.info("Compacted document from %d to %d estimated tokens", before, after)
+        return compacted, stats
+    except Exception as e:
+        logger.exception("Failed to compact document")
+        raise ValidationException("compact_document failed", e) from e
+
+
+def _trim_to_budget(sheets, vocab, token_budget, dropped):
+    """Keep the highest-relevance rows that fit in `token_budget`, in document order."""
+    sep_tokens = estimate_tokens(SHEET_SEPARATOR)
+    if sum(estimate_tokens(r) + 1 for rows in sheets for r in rows) + sep_tokens * len(sheets) <= token_budget:
+        return sheets
+
+    sheet_scores = [sum(_relevance(r, vocab) for r in rows) for rows in sheets]
+    ranked = []
+    for s_idx, rows in enumerate(sheets):
+        for r_idx, row in enumerate(rows):
+            pinned = s_idx == 0 and r_idx < KEEP_LEADING_ROWS
+            # Pinned rows first, then by row relevance, then by sheet relevance, then position
+            ranked.append((not pinned, -_relevance(row, vocab), -sheet_scores[s_idx], s_idx, r_idx))
+    ranked.sort()
+
+    keep, kept_sheets, used = set(), set(), 0
+    for _, _, _, s_idx, r_idx in ranked:
+        cost = estimate_tokens(sheets[s_idx][r_idx]) + 1
+        if s_idx not in kept_sheets:
+            cost += sep_tokens
+        if used + cost > token_budget:
+            continue
+        keep.add((s_idx, r_idx))
+        kept_sheets.add(s_idx)
+        used += cost
+
+    trimmed = []
+    for s_idx, rows in enumerate(sheets):
+        kept = [row for r_idx, row in enumerate(rows) if (s_idx, r_idx) in keep]
+        dropped["budget"] += len(rows) - len(kept)
+        if kept:
+            trimmed.append(kept)
+    return trimmed
@@ -0,0 +1,59 @@
+
+import copy
+
+
+def iter_schema_fields(schema):
+    """Yield ``(section_key, path)`` for every leaf field of the ADSP template.
+
+    `path` is a tuple of keys below ``fields``; nested groups such as
+    ``Quantitative`` produce two-element paths.
+    """
+    for section_key, section in schema.items():
+        stack = [((), (section or {}).get("fields", {}))]
+        while stack:
+            prefix, node = stack.pop(0)
+            for name, value in node.items():
+                if isinstance(value, dict):
+                    stack.append((prefix + (name,), value))
+                else:
+                    yield section_key, prefix + (name,)
+
+
+def field_id(section_key, path) -> str:
+    """Dotted identifier used in reports, e.g. ``expected_benefits.Quantitative.Softtek Hard Dollars``."""
+    return ".".join((section_key,) + tuple(path))
+
+
+def empty_sections(schema):
+    """A fresh copy of the template with every value blank."""
+    return copy.deepcopy(schema)
+
+
+def get_field(sections, section_key, path):
+    node = (sections.get(section_key) or {}).get("fields") or {}
+    for key in path:
+        if not isinstance(node, dict):
+            return ""
+        node = node.get(key)
+    return node if node is not None else ""
+
+
+def set_field(sections, section_key, path, value):
+    section = sections.setdefault(section_key, {})
+    if not isinstance(section, dict):
+        section = sections[section_key] = {}
+    node = section.setdefault("fields", {})
+    for key in path[:-1]:
+        if not isinstance(node.get(key), dict):
+            node[key] = {}
+        node = node[key]
+    node[path[-1]] = value
+
+
+def missing_fields(sections, schema):
+    """``(section_key, path)`` pairs whose value is absent or blank in `sections`."""
+    return [
+        (section_key, path)
+        for section_key, path in iter_schema_fields(schema)
+        if not str(get_field(sections, section_key, path) or "").strip()
+    ]
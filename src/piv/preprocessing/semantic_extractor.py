@@ -3,7 +3,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from ..llm.prompts import load_prompt
+from ..llm.prompts import load_extractor_schema, load_prompt
 from logger import CustomLogger
 from exception import ValidationException
 
@@ -12,11 +12,65 @@ _logger_instance = CustomLogger()
 logger = _logger_instance.get_logger(__name__)
 
 
+DOCUMENT_PLACEHOLDER = "{DOCUMENT_TEXT}"
+
+
+def build_extraction_prompt(text, prompts_dir):
+    """Return ``(system_prompt, user_payload)`` for the section extraction request.
+
+    Everything in section_extractor.md before ``{DOCUMENT_TEXT}`` (instructions and
+    schema) becomes the system prompt, identical for every document, so the
+    provider can serve it from its prompt cache; the document follows in the user
+    message together with any text after the placeholder.
+    """
+    prompt = load_prompt(f"{prompts_dir}/section_extractor.md")
+    prefix, placeholder, suffix = prompt.partition(DOCUMENT_PLACEHOLDER)
+    if not placeholder:
+        return prompt.strip(), text
+    return prefix.strip(), text + suffix.rstrip()
+
+
+def complete_sections(llm, system_prompt, payload, schema):
+    """`llm.complete_json`, handing the ADSP template to clients that enforce it (`supports_response_schema`)."""
+    if getattr(llm, "supports_response_schema", False):
+        return llm.complete_json(system_prompt, payload, response_schema=schema)
+    return llm.complete_json(system_prompt, payload)
+
+
+async def complete_sections_async(llm, system_prompt, payload, schema):
+    if getattr(llm, "supports_response_schema", False):
+        return await llm.complete_json_async(system_prompt, payload, response_schema=schema)
+    return await llm.complete_json_async(system_prompt, payload)
+
+
 def extract_sections_via_llm(text, prompts_dir, llm):
     try:
-        prompt = load_prompt(f"{prompts_dir}/section_extractor.md")
-        payload = prompt.replace("{DOCUMENT_TEXT}", text)
-        return llm.complete_json("", payload)
+        system_prompt, payload = build_extraction_prompt(text, prompts_dir)
+        schema = load_extractor_schema(f"{prompts_dir}/section_extractor.md")
+        return complete_sections(llm, system_prompt, payload, schema)
     except Exception as e:
         logger.exception("Failed to extract sections via LLM")
         raise ValidationException("extract_sections_via_llm failed", e) from e
+
+
+async def extract_sections_via_llm_async(text, prompts_dir, llm):
+    """Same as `extract_sections_via_llm` for clients exposing `complete_json_async`."""
+    try:
+        system_prompt, payload = build_extraction_prompt(text, prompts_dir)
+        schema = load_extractor_schema(f"{prompts_dir}/section_extractor.md")
+        return await complete_sections_async(llm, system_prompt, payload, schema)
+    except Exception as e:
+        logger.exception("Failed to extract sections via LLM")
+        raise ValidationException("extract_sections_via_llm_async failed", e) from e
+
+
+def extract_sections_streaming(text, prompts_dir, llm, on_section):
+    """Stream the extraction from a client with `complete_json_streaming`, calling
+    ``on_section(section_key, section)`` as each section arrives."""
+    try:
+        system_prompt, payload = build_extraction_prompt(text, prompts_dir)
+        schema = load_extractor_schema(f"{prompts_dir}/section_extractor.md")
+        return llm.complete_json_streaming(system_prompt, payload, on_section, response_schema=schema)
+    except Exception as e:
+        logger.exception("Failed to extract sections via streaming LLM")
+        raise ValidationException("extract_sections_streaming failed", e) from e
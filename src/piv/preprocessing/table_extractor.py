@@ -0,0 +1,138 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import re
+from difflib import SequenceMatcher
+from logger import CustomLogger
+from exception import ValidationException
+from .schema import empty_sections, field_id, get_field, iter_schema_fields, missing_fields, set_field
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+# Minimum similarity between a row's leading words and a field name to treat the row as that field
+MIN_CONFIDENCE = 0.85
+# Rows without a Section column are matched against every field, so demand a closer match
+MIN_CONFIDENCE_NO_SECTION = 0.92
+# A runner-up field scoring within this margin of the best makes the row ambiguous
+AMBIGUITY_MARGIN = 0.05
+
+_TOKEN = re.compile(r"[^\W_]+")
+# Separators allowed between a field label and its value in "Label: value" rows
+_LEADING_SEPARATOR = re.compile(r"^[\s:=]+")
+# Template text left in a value cell, e.g. "[Project Name]", "<date>" or "Enter the deadline here";
+# such fields count as missing so the LLM (and its Project Name fallback) handles them
+_PLACEHOLDER = re.compile(
+    r"^(\[[^\]]*\]|<[^>]*>|\{[^}]*\}|x{3,}|[._]{3,}|((please )?(enter|insert|type|add|fill in)\b.*\bhere\W*))$",
+    re.IGNORECASE,
+)
+
+
+def _norm(text: str) -> str:
+    return " ".join(_TOKEN.findall(text.lower()))
+
+
+def _build_catalogue(schema):
+    """Per section: list of (path, normalised field name, token count)."""
+    catalogue = {}
+    for section_key, path in iter_schema_fields(schema):
+        name = _norm(path[-1])
+        catalogue.setdefault(section_key, []).append((path, name, len(name.split())))
+    return catalogue
+
+
+def _split_section(tokens, line, section_labels):
+    """Return (section_key, remainder) if the row starts with a section label, else (None, line)."""
+    for n in (2, 1):
+        if len(tokens) < n:
+            continue
+        label = "_".join(m.group() for m in tokens[:n]).upper()
+        if label in section_labels:
+            return section_labels[label], line[tokens[n - 1].end():]
+    return None, line
+
+
+def _best_matches(remainder, candidates):
+    """Score every candidate field against the leading tokens of `remainder`."""
+    tokens = list(_TOKEN.finditer(remainder))
+    scored = []
+    for section_key, path, name, n_tokens in candidates:
+        lead = " ".join(m.group().lower() for m in tokens[:n_tokens])
+        value = remainder[tokens[n_tokens - 1].end():] if len(tokens) >= n_tokens else ""
+        score = 1.0 if lead == name else SequenceMatcher(None, lead, name).ratio()
+        scored.append((score, section_key, path, _LEADING_SEPARATOR.sub("", value).strip()))
+    scored.sort(key=lambda s: s[0], reverse=True)
+    return scored
+
+
+def extract_sections_via_rules(text, schema, min_confidence: float = MIN_CONFIDENCE):
+    """Map "Section | Field | Value" rows onto the ADSP template without calling the LLM.
+
+    Each row is matched on its leading tokens: an optional section label (e.g.
+    ``BUSINESS_CASE``) narrows the candidates to that section's fields, then field
+    names are compared fuzzily. Returns ``(sections, report)`` where `report` holds
+    per-field ``confidence`` (0.0 when the field was never seen), the ``missing``,
+    ``ambiguous`` and ``placeholder`` field ids, and ``complete`` which is True only
+    when every field was found with a value and nothing was ambiguous. Values that
+    are template placeholders (``[Project Name]``, ``<date>``, "Enter ... here") are
+    left blank, so those fields count as missing.
+    """
+    try:
+        catalogue = _build_catalogue(schema)
+        section_labels = {key.upper(): key for key in catalogue}
+        all_candidates = [
+            (section_key, path, name, n) for section_key, fields in catalogue.items() for path, name, n in fields
+        ]
+
+        sections = empty_sections(schema)
+        confidence = {field_id(s, p): 0.0 for s, p in iter_schema_fields(schema)}
+        ambiguous = set()
+        placeholders = set()
+
+        for line in (text or "").splitlines():
+            tokens = list(_TOKEN.finditer(line))
+            if not tokens:
+                continue
+            section_key, remainder = _split_section(tokens, line, section_labels)
+            if section_key is not None:
+                candidates = [(section_key, p, name, n) for p, name, n in catalogue[section_key]]
+                threshold = min_confidence
+            else:
+                candidates = all_candidates
+                threshold = max(min_confidence, MIN_CONFIDENCE_NO_SECTION)
+
+            scored = _best_matches(remainder, candidates)
+            if not scored or scored[0][0] < threshold:
+                continue
+            score, sec, path, value = scored[0]
+            fid = field_id(sec, path)
+            if _PLACEHOLDER.match(value):
+                placeholders.add(fid)
+                value = ""
+            if len(scored) > 1 and scored[1][0] >= threshold and score - scored[1][0] < AMBIGUITY_MARGIN:
+                ambiguous.add(fid)
+                ambiguous.add(field_id(scored[1][1], scored[1][2]))
+
+            existing = get_field(sections, sec, path)
+            if existing and value and existing != value:
+                # The same field filled twice with different answers
+                ambiguous.add(fid)
+            if value or not existing:
+                set_field(sections, sec, path, value)
+            confidence[fid] = max(confidence[fid], score)
+
+        missing = [field_id(s, p) for s, p in missing_fields(sections, schema)]
+        report = {
+            "confidence": confidence,
+            "missing": missing,
+            "ambiguous": sorted(ambiguous),
+            "placeholder": sorted(placeholders),
+            "complete": not missing and not ambiguous,
+        }
+        return sections, report
+    except Exception as e:
+        logger.exception("Failed to extract sections via rules")
+        raise ValidationException("extract_sections_via_rules failed", e) from e
@@ -0,0 +1,110 @@
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+import json
+import re
+from logger import CustomLogger
+from exception import ValidationException
+from ..llm.prompts import load_prompt
+from .schema import field_id, get_field, iter_schema_fields, missing_fields, set_field
+from .semantic_extractor import complete_sections, complete_sections_async
+
+# Initialize logger
+_logger_instance = CustomLogger()
+logger = _logger_instance.get_logger(__name__)
+
+
+def sub_schema(fields):
+    """Blank ADSP template containing only the given ``(section_key, path)`` fields."""
+    subset = {}
+    for section_key, path in fields:
+        set_field(subset, section_key, path, "")
+    return subset
+
+
+TARGETED_INSTRUCTIONS = (
+    "Some fields could not be extracted from the intake document in the user message. "
+    "Extract only the fields in the JSON template below."
+)
+# The reply format from section_extractor.md, restated for the smaller template
+TARGETED_FORMAT = ("Return ONLY valid JSON following this exact schema. All keys must be present; "
+                   "if a value is not available, return an empty string.")
+_INSTRUCTION = re.compile(r"^\d+\.\s")
+
+
+def build_targeted_prompt(text, prompts_dir, subset):
+    """Return ``(system_prompt, user_payload)`` asking only for the fields in `subset`.
+
+    The system prompt is short: the quality instructions of section_extractor.md
+    that mention a requested field, the reply format and `subset` as the JSON
+    template. The user payload is the document alone.
+    """
+    names = {path[-1] for _, path in iter_schema_fields(subset)}
+    hints = [line for line in load_prompt(f"{prompts_dir}/section_extractor.md").splitlines()
+             if _INSTRUCTION.match(line) and any(name in line for name in names)]
+    lines = [TARGETED_INSTRUCTIONS, *hints, TARGETED_FORMAT, "", json.dumps(subset, indent=2)]
+    return "\n".join(lines), text
+
+
+def _targets(sections, schema, fields):
+    """Missing fields grouped by section, in schema order."""
+    fields = missing_fields(sections, schema) if fields is None else list(fields)
+    grouped = {}
+    for section_key, path in fields:
+        grouped.setdefault(section_key, []).append(tuple(path))
+    return grouped
+
+
+def _merge(sections, grouped, answer):
+    """Copy non-blank answers for requested fields only into `sections`; returns the report."""
+    requested, filled = [], []
+    for section_key, paths in grouped.items():
+        for path in paths:
+            requested.append(field_id(section_key, path))
+            value = get_field(answer if isinstance(answer, dict) else {}, section_key, path)
+            if isinstance(value, dict) or not str(value).strip():
+                continue
+            set_field(sections, section_key, path, value)
+            filled.append(field_id(section_key, path))
+    return {"requested": requested, "filled": filled, "still_missing": [f for f in requested if f not in filled]}
+
+
+def extract_missing_fields(text, prompts_dir, llm, schema, sections, fields=None):
+    """Re-extract only blank fields (or the given ``(section_key, path)`` `fields`).
+
+    A single short prompt asks for every missing field at once, so the document
+    is sent one more time at most; non-blank answers are merged into `sections`
+    in place. Returns ``(sections, report)`` listing requested, filled and
+    still-missing field ids.
+    """
+    try:
+        grouped = _targets(sections, schema, fields)
+        if not grouped:
+            return sections, {"requested": [], "filled": [], "still_missing": []}
+        subset = sub_schema((key, path) for key, paths in grouped.items() for path in paths)
+        system_prompt, payload = build_targeted_prompt(text, prompts_dir, subset)
+        report = _merge(sections, grouped, complete_sections(llm, system_prompt, payload, subset))
+        logger.info("Targeted re-extraction filled %d of %d fields", len(report["filled"]), len(report["requested"]))
+        return sections, report
+    except Exception as e:
+        logger.exception("Failed targeted re-extraction")
+        raise ValidationException("extract_missing_fields failed", e) from e
+
+
+async def extract_missing_fields_async(text, prompts_dir, llm, schema, sections, fields=None):
+    """Async variant of `extract_missing_fields` for clients exposing `complete_json_async`."""
+    try:
+        grouped = _targets(sections, schema, fields)
+        if not grouped:
+            return sections, {"requested": [], "filled": [], "still_missing": []}
+
+        subset = sub_schema((key, path) for key, paths in grouped.items() for path in paths)
+        system_prompt, payload = build_targeted_prompt(text, prompts_dir, subset)
+        report = _merge(sections, grouped, await complete_sections_async(llm, system_prompt, payload, subset))
+        logger.info("Targeted re-extraction filled %d of %d fields", len(report["filled"]), len(report["requested"]))
+        return sections, report
+    except Exception as e:
+        logger.exception("Failed targeted re-extraction")
+        raise ValidationException("extract_missing_fields_async failed", e) from e
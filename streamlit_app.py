@@ -7,7 +7,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 import streamlit as st
 from dotenv import load_dotenv
 from src.piv.graph.graph import build_graph
-from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.client_pool import get_llm
+from src.piv.io.text_cache import WorkbookTextCache
+from src.piv.llm.response_cache import DEFAULT_CACHE_PATH
 import tempfile
 import pandas as pd
 
@@ -18,18 +20,24 @@ st.caption("Validate Header, Business Case, and Project Scope using Azure OpenAI
 
 load_dotenv()
 
-# Build LLM client
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+
+@st.cache_resource
+def load_graph():
+    """Build the LLM client and graph once per server process, shared by every session and rerun."""
+    llm = get_llm(cache_path=DEFAULT_CACHE_PATH)
+    # Re-uploads of an unchanged workbook reuse the text extracted last time
+    context = {"llm": llm, "prompts_dir": str(PROMPTS_DIR), "text_cache": WorkbookTextCache()}
+    return build_graph(context)
+
+
 try:
-    llm = AzureOpenAILLM()
+    graph = load_graph()
 except Exception as e:
     st.error(f"Azure OpenAI configuration error: {e}")
     st.stop()
 
-# Build graph
-PROMPTS_DIR = Path(__file__).parent / "prompts"
-context = {"llm": llm, "prompts_dir": str(PROMPTS_DIR)}
-graph = build_graph(context)
-
 uploaded_file = st.file_uploader("Upload Excel Intake File (.xlsx)", type=["xlsx"])
 
 if uploaded_file:
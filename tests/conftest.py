@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from src.piv.llm.prompts import load_extractor_schema
+from tests.generate_sample import create_sample_excel
+
+
+@pytest.fixture
+def azure_env(monkeypatch):
+    """Dummy Azure OpenAI settings so clients can be constructed without credentials."""
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-test")
+    monkeypatch.setenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
+
+
+@pytest.fixture
+def prompts_dir():
+    """The bundled prompt templates."""
+    return Path(__file__).parent.parent / "prompts"
+
+
+@pytest.fixture
+def extractor_schema(prompts_dir):
+    """The section template embedded in the bundled extractor prompt."""
+    return load_extractor_schema(prompts_dir / "section_extractor.md")
+
+
+@pytest.fixture
+def sample_xlsx(tmp_path):
+    """The generated sample intake workbook, written to a fresh temp dir."""
+    path = tmp_path / "sample.xlsx"
+    create_sample_excel(path)
+    return path
+
+
+@pytest.fixture
+def initial_state():
+    """Build the empty pipeline state for a workbook path."""
+    def make(path):
+        return {"source_path": str(path), "document_text": "", "sections": {}, "validation": {},
+                "final_feedback": None}
+    return make
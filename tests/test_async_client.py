@@ -0,0 +1,48 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.piv.graph.graph import build_graph
+from src.piv.llm.azure_openai_client import AsyncAzureOpenAILLM
+
+
+class _SlowCompletions:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        content = json.dumps({"header": {"fields": {"Project Name": "From LLM"}}})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _async_llm(max_concurrency):
+    llm = AsyncAzureOpenAILLM(max_concurrency=max_concurrency)
+    completions = _SlowCompletions()
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return llm, completions
+
+
+def test_concurrency_is_bounded(azure_env):
+    llm, completions = _async_llm(max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(llm.complete_json_async("", f"doc {i}") for i in range(12)))
+
+    results = asyncio.run(run())
+    assert len(results) == 12
+    assert completions.peak == 3
+
+
+def test_graph_uses_async_extract_node(azure_env, prompts_dir, initial_state):
+    llm, _ = _async_llm(max_concurrency=2)
+    graph = build_graph({"llm": llm, "prompts_dir": str(prompts_dir)})
+    out = asyncio.run(graph.ainvoke(initial_state(Path(__file__).parent / "sample_intake.xlsx")))
+    assert out["extraction"]["method"] == "llm"
+    assert out["sections"]["header"]["fields"]["Project Name"] == "From LLM"
+    assert "NEEDS REVISION" in out["final_feedback"]
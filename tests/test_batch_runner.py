@@ -0,0 +1,97 @@
+import io
+import json
+import time
+
+import pytest
+from openpyxl import Workbook
+
+from src.piv.batch.files import collect_workbooks
+from src.piv.batch.runner import run_batch
+from src.piv.graph.graph import build_graph
+from src.piv.llm.deadline import DeadlineExceeded
+from src.piv.llm.offline import RuleBasedLLM
+from tests.generate_sample import create_sample_excel
+
+def test_records_stream_in_input_order(tmp_path, prompts_dir):
+    create_sample_excel(tmp_path / "a_sample.xlsx")
+    Workbook().save(tmp_path / "b_blank.xlsx")
+    (tmp_path / "c_corrupt.xlsx").write_bytes(b"not a workbook")
+    create_sample_excel(tmp_path / "d_sample.xlsx")
+    paths = collect_workbooks(str(tmp_path))
+
+    out = io.StringIO()
+    graph = build_graph({"llm": RuleBasedLLM(), "prompts_dir": str(prompts_dir)})
+    summary = run_batch(paths, graph, out, parse_workers=2, max_in_flight=2)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["source_path"] for r in records] == paths
+    assert [r["status"] for r in records] == ["ok", "ok", "error", "ok"]
+    assert records[1]["short_circuit"] == "empty_document"
+    assert records[0]["final_feedback"] == records[3]["final_feedback"]
+    assert summary["files"] == 4 and summary["failed"] == 1
+    assert summary["files_per_s"] > 0
+
+
+class _SlowGraph:
+    """Finishes documents in reverse order; the second one runs out of time."""
+
+    def invoke(self, state):
+        from src.piv.llm.scheduler import PRIORITY_BATCH, current_priority
+        assert current_priority() == PRIORITY_BATCH
+        if state["source_path"].endswith("1"):
+            raise DeadlineExceeded("Deadline exceeded before LLM call")
+        time.sleep(0.2 if state["source_path"].endswith("0") else 0.0)
+        return {"validation": {}, "final_feedback": state["document_text"]}
+
+
+def test_failures_do_not_stop_the_batch(tmp_path, monkeypatch):
+    import src.piv.batch.runner as runner
+
+    monkeypatch.setattr(runner, "ProcessPoolExecutor", runner.ThreadPoolExecutor)
+    monkeypatch.setattr(runner, "parse_workbook", lambda path, *args: (f"text of {path}", 0.0))
+    out = io.StringIO()
+    summary = run_batch(["doc0", "doc1", "doc2"], _SlowGraph(), out, parse_workers=3, max_in_flight=3)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["index"] for r in records] == [0, 1, 2]
+    assert records[1]["error"]["code"] == "deadline_exceeded"
+    assert records[2]["final_feedback"] == "text of doc2"
+    assert summary["failed"] == 1
+
+
+def test_blank_text_from_the_pool_is_not_read_again(monkeypatch, prompts_dir):
+    import src.piv.batch.runner as runner
+    import src.piv.graph.graph as graph_module
+
+    monkeypatch.setattr(runner, "ProcessPoolExecutor", runner.ThreadPoolExecutor)
+    monkeypatch.setattr(runner, "parse_workbook", lambda path, *args: ("", 0.0))
+    monkeypatch.setattr(graph_module, "read_workbook_text", lambda *a, **k: pytest.fail("parsed twice"))
+    out = io.StringIO()
+    graph = build_graph({"llm": RuleBasedLLM(), "prompts_dir": str(prompts_dir)})
+    run_batch(["blank.xlsx"], graph, out, parse_workers=1, max_in_flight=1)
+
+    record = json.loads(out.getvalue())
+    assert record["status"] == "ok" and record["short_circuit"] == "empty_document"
+
+
+class _CheckpointedGraph(_SlowGraph):
+    checkpointer = object()
+
+
+def test_checkpoint_lookup_failure_is_recorded(monkeypatch):
+    import src.piv.batch.runner as runner
+
+    def has_document_text(graph, path):
+        if path == "doc0":
+            raise OSError("checkpoint database is locked")
+        return True
+
+    monkeypatch.setattr(runner, "has_document_text", has_document_text)
+    monkeypatch.setattr(runner, "invoke_checkpointed", lambda graph, initial, **kw: {"final_feedback": "resumed"})
+    out = io.StringIO()
+    summary = run_batch(["doc0", "doc2"], _CheckpointedGraph(), out, parse_workers=1, max_in_flight=1, resume=True)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert records[0]["error"]["code"] == "OSError"
+    assert records[1]["final_feedback"] == "resumed"
+    assert summary["failed"] == 1
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+from exception import ValidationException
+from src.piv.graph.checkpoint import invoke_checkpointed, open_checkpointer
+from src.piv.graph.graph import build_graph
+from src.piv.io.excel_reader import read_workbook_text
+from src.piv.llm.offline import RuleBasedLLM
+
+
+class _CountingReader:
+    def __init__(self):
+        self.reads = 0
+
+    def read(self, path, **options):
+        self.reads += 1
+        return read_workbook_text(path, **options)
+
+
+class _FlakyLLM(RuleBasedLLM):
+    def __init__(self, failures=0):
+        super().__init__()
+        self.failures = failures
+        self.calls = 0
+
+    def complete_json(self, system_prompt, user_payload, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ValidationException("connection reset")
+        return super().complete_json(system_prompt, user_payload, **kwargs)
+
+
+@pytest.fixture
+def setup(tmp_path, prompts_dir, sample_xlsx, initial_state):
+    def make(llm, **options):
+        reader = _CountingReader()
+        graph = build_graph({"llm": llm, "prompts_dir": str(prompts_dir), "rule_extraction": False,
+                             "targeted_retry": False, "text_cache": reader,
+                             "checkpointer": open_checkpointer(tmp_path / "checkpoints.sqlite"), **options})
+        return graph, initial_state(sample_xlsx), reader
+    return make
+
+
+def test_finished_run_is_only_revalidated(setup):
+    llm = _FlakyLLM()
+    graph, initial, reader = setup(llm)
+    first = invoke_checkpointed(graph, initial, resume=False)
+    again = invoke_checkpointed(graph, initial, resume=True)
+    assert (reader.reads, llm.calls) == (1, 1)
+    # Only this invocation's spans: validators and format, not the first run's
+    assert len(invoke_checkpointed(graph, initial, resume=True)["timings"]) == len(again["timings"]) < len(first["timings"])
+    assert again["final_feedback"] == first["final_feedback"]
+    assert set(again["validation"]) == set(first["validation"])
+
+    invoke_checkpointed(graph, initial, resume=False)
+    assert (reader.reads, llm.calls) == (2, 2)
+
+
+def test_interrupted_run_resumes_at_extract(setup):
+    llm = _FlakyLLM(failures=1)
+    graph, initial, reader = setup(llm)
+    with pytest.raises(ValidationException):
+        invoke_checkpointed(graph, initial, resume=False)
+    out = invoke_checkpointed(graph, initial, resume=True, deadline_s=30)
+    assert reader.reads == 1 and llm.calls == 2
+    assert out["final_feedback"].startswith("ADSP Validation Summary")
+
+
+def test_run_interrupted_before_extract_gets_a_fresh_deadline(setup, monkeypatch):
+    import src.piv.graph.graph as graph_module
+
+    compact = graph_module.compact_document
+    calls = []
+
+    def flaky_compact(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValidationException("compaction failed")
+        return compact(*args, **kwargs)
+
+    monkeypatch.setattr(graph_module, "compact_document", flaky_compact)
+    graph, initial, reader = setup(_FlakyLLM(), deadline_s=0.01)
+    with pytest.raises(ValidationException):
+        invoke_checkpointed(graph, initial, resume=False)
+    time.sleep(0.02)
+    out = invoke_checkpointed(graph, initial, resume=True, deadline_s=30)
+    assert reader.reads == 1 and len(calls) == 2
+    assert out["deadline"] > time.time()
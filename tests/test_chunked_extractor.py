@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+
+import openpyxl
+
+from src.piv.graph.graph import build_graph
+from src.piv.io.excel_reader import SHEET_SEPARATOR
+from src.piv.llm.tokens import estimate_tokens
+from src.piv.preprocessing.chunked_extractor import merge_partial_sections, split_document
+
+
+def test_split_respects_sheet_and_row_boundaries():
+    small = "Sheet one row"
+    big = "\n".join(f"row {i} " + "x" * 30 for i in range(40))
+    chunks = split_document(SHEET_SEPARATOR.join([small, big, small]), max_tokens=100)
+
+    assert all(estimate_tokens(c) <= 100 for c in chunks)
+    rows = [row for c in chunks for part in c.split(SHEET_SEPARATOR) for row in part.split("\n")]
+    assert rows == [small] + big.split("\n") + [small]
+
+
+def test_merge_prefers_majority_then_earliest_chunk(extractor_schema):
+    partials = [
+        {"header": {"fields": {"Project Name": "Alpha", "Deadline": "2025-01-01"}}},
+        {"header": {"fields": {"Project Name": "Beta", "Deadline": ""}}},
+        {"header": {"fields": {"Project Name": "beta ", "Start Date": "2024-06-01"}}},
+    ]
+    merged, conflicts = merge_partial_sections(partials, extractor_schema)
+
+    assert merged["header"]["fields"]["Project Name"] == "Beta"
+    assert merged["header"]["fields"]["Deadline"] == "2025-01-01"
+    assert merged["header"]["fields"]["Start Date"] == "2024-06-01"
+    assert merged["project_scope"]["fields"]["In Scope"] == ""
+    assert conflicts == {"header.Project Name": ["Alpha", "Beta"]}
+    # Order of completion does not matter, only chunk order
+    assert merge_partial_sections(partials, extractor_schema)[0] == merged
+
+
+class _SlowLLM:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def complete_json(self, system_prompt, user_payload):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return {"header": {"fields": {"Project Name": user_payload.split("\n")[0]}}}
+
+
+def test_graph_extracts_large_documents_in_parallel_chunks(tmp_path, prompts_dir, initial_state):
+    path = tmp_path / "large.xlsx"
+    wb = openpyxl.Workbook()
+    wb.active.title = "Sheet 0"
+    for i in range(4):
+        ws = wb.active if i == 0 else wb.create_sheet(f"Sheet {i}")
+        ws.append([f"Sheet {i}"])
+        ws.append(["filler " * 60])
+    wb.save(path)
+    llm = _SlowLLM()
+    graph = build_graph({"llm": llm, "prompts_dir": str(prompts_dir), "compaction": False,
+                         "rule_extraction": False, "chunk_tokens": 120})
+
+    out = graph.invoke(initial_state(path))
+    assert out["extraction"]["method"] == "llm_chunked"
+    assert out["extraction"]["chunks"] == 4
+    assert llm.peak > 1
+    assert out["sections"]["header"]["fields"]["Project Name"] == "Sheet 0"
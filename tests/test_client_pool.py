@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.piv.llm import client_pool
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    client_pool.close_shared_clients()
+    yield
+    client_pool.close_shared_clients()
+
+
+def test_llm_clients_are_shared_and_pooled(azure_env, monkeypatch):
+    monkeypatch.setenv("PIV_LLM_MODE", "azure")
+    monkeypatch.setenv("PIV_HTTP_MAX_CONNECTIONS", "7")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        clients = list(pool.map(lambda _: client_pool.get_llm(), range(8)))
+
+    assert all(c is clients[0] for c in clients)
+    http = client_pool.shared_http_client()
+    assert clients[0].client._client is http
+    assert http._transport._pool._max_connections == 7
+    # Each mode and cache path gets its own client
+    other = client_pool.get_llm(cache_path=None, mode="fake")
+    assert other is not clients[0]
+
+
+class _RacingDict(dict):
+    """Lookups miss, as if another thread stored its client right after this one looked."""
+
+    def get(self, key, default=None):
+        return default
+
+
+def test_losing_racer_closes_its_cache(azure_env, tmp_path, monkeypatch):
+    from src.piv.llm.response_cache import ResponseCache
+
+    closed = []
+    monkeypatch.setattr(ResponseCache, "close", lambda self: closed.append(self))
+    path = str(tmp_path / "cache.sqlite3")
+    first = client_pool.get_llm(mode="azure", cache_path=path)
+    monkeypatch.setattr(client_pool, "_llms", _RacingDict(client_pool._llms))
+
+    assert client_pool.get_llm(mode="azure", cache_path=path) is first
+    assert len(closed) == 1
+
+
+def test_fake_mode_opens_no_cache(tmp_path):
+    client_pool.get_llm(mode="fake", cache_path=str(tmp_path / "cache.sqlite3"))
+    assert not (tmp_path / "cache.sqlite3").exists()
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from src.piv.llm.prompts import load_extractor_schema
+from src.piv.preprocessing.compactor import compact_document
+
+SCHEMA = load_extractor_schema(Path(__file__).parent.parent / "prompts" / "section_extractor.md")
+
+
+def test_dedupes_and_drops_boilerplate():
+    text = "\n".join([
+        "Intake Form",
+        "Please fill in every field before submitting",
+        "HEADER   Project   Name  Intake Validator",
+        "HEADER Project Name Intake Validator",
+        "Budget Budget Budget 100",
+    ])
+    compacted, stats = compact_document(text, SCHEMA, collapse_repeats=True)
+
+    assert compacted == "Intake Form\nHEADER Project Name Intake Validator\nBudget 100"
+    assert stats["rows_dropped"] == {"duplicate": 1, "boilerplate": 1, "budget": 0}
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"] > 0
+
+
+def test_equal_neighbouring_values_are_kept():
+    text = "Softtek Hard Dollars 5000 5000\nStatus N/A N/A N/A"
+    assert compact_document(text, SCHEMA)[0] == text
+    # Only a repeated label at the row start is collapsed, and only on request
+    assert compact_document("Budget Budget 100 100", SCHEMA, collapse_repeats=True)[0] == "Budget 100 100"
+    assert compact_document("Budget Budget 100 100", SCHEMA)[0] == "Budget Budget 100 100"
+
+
+def test_labels_and_values_on_separate_rows_stay_aligned():
+    text = "Softtek Hard Dollars\nTBD\nSofttek Soft Dollars\nTBD\nCustomer Hard Dollars\n5000"
+    compacted, stats = compact_document(text, SCHEMA)
+    assert compacted == text
+    assert stats["rows_dropped"]["duplicate"] == 0
+
+
+def test_budget_keeps_schema_rows_and_title():
+    fields = "\n".join([
+        "Fixing of FMS2134 job failure",
+        "HEADER Deadline 30-Sep-25",
+        "BUSINESS_CASE Why now Manual process is slow",
+    ])
+    noise = "\n".join(f"raw export {i} lorem ipsum dolor sit amet" for i in range(100))
+    compacted, stats = compact_document(noise + "\n\n" + fields, SCHEMA, token_budget=60)
+
+    assert stats["tokens_after"] <= 60
+    assert "HEADER Deadline 30-Sep-25" in compacted
+    assert "BUSINESS_CASE Why now Manual process is slow" in compacted
+    assert compacted.startswith("raw export 0")  # leading rows of the first sheet stay pinned
+    assert stats["rows_dropped"]["budget"] > 0
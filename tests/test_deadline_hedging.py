@@ -0,0 +1,88 @@
+import time
+
+import httpx
+import pytest
+
+from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.deadline import DeadlineExceeded, deadline_scope, in_current_context, remaining
+from src.piv.llm.hedging import HedgedLLM
+from src.piv.llm.telemetry import LLMTelemetry
+
+
+def _completion(content):
+    return {
+        "id": "cmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-test",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def test_deadline_bounds_request_timeout(azure_env):
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json=_completion('{"ok": true}'))
+
+    llm = AzureOpenAILLM(http_client=httpx.Client(transport=httpx.MockTransport(handler)), telemetry=LLMTelemetry())
+    with deadline_scope(seconds=5):
+        assert llm.complete_json("sys", "doc") == {"ok": True}
+        # Nested scopes only shorten the deadline
+        with deadline_scope(seconds=60):
+            assert remaining() <= 5
+    assert 0 < timeouts[0] <= 5
+
+
+def test_expired_deadline_is_not_sent(azure_env):
+    sent = []
+    http = httpx.Client(transport=httpx.MockTransport(lambda request: sent.append(request)))
+    llm = AzureOpenAILLM(http_client=http, telemetry=LLMTelemetry())
+    with deadline_scope(seconds=-1), pytest.raises(DeadlineExceeded):
+        llm.complete_json("sys", "doc")
+    assert sent == []
+
+
+def test_deadline_reaches_worker_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with deadline_scope(seconds=30), ThreadPoolExecutor(1) as pool:
+        assert pool.submit(remaining).result() is None
+        assert pool.submit(in_current_context(remaining)).result() <= 30
+
+
+class _SlowFirstLLM:
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = 0
+
+    def complete_json(self, system_prompt, user_payload, bypass_cache=False):
+        delay = self.delays[self.calls]
+        self.calls += 1
+        time.sleep(delay)
+        return {"call": self.calls, "bypass_cache": bypass_cache}
+
+
+def test_slow_call_is_hedged():
+    inner = _SlowFirstLLM([1.0, 0.0])
+    telemetry = LLMTelemetry()
+    llm = HedgedLLM(inner, initial_delay=0.05, telemetry=telemetry)
+    started = time.perf_counter()
+    assert llm.complete_json("sys", "doc") == {"call": 2, "bypass_cache": True}
+    assert time.perf_counter() - started < 0.9
+
+    stats = llm.stats()
+    assert stats["calls"] == 1 and stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    assert stats["overhead_ratio"] == 1.0
+    assert stats["extra_prompt_tokens"] > 0
+    counters = telemetry.snapshot()["unknown"]["counters"]
+    assert counters["hedged_total"] == 1 and counters["hedge_wins_total"] == 1
+    assert "piv_llm_hedged_total" in telemetry.to_prometheus()
+
+
+def test_hedge_delay_follows_latency_percentile():
+    llm = HedgedLLM(_SlowFirstLLM([0.0] * 4), percentile=0.5, min_samples=4, telemetry=LLMTelemetry())
+    assert llm.policy.delay() is None
+    for _ in range(4):
+        llm.complete_json("sys", "doc")
+    assert llm.stats()["hedged"] == 0
+    assert llm.policy.delay() < 0.05
@@ -0,0 +1,128 @@
+import datetime
+
+import openpyxl
+import pytest
+
+from exception import ValidationException
+from src.piv.io.excel_reader import iter_workbook_rows, read_workbook_text
+
+
+def test_streaming_matches_full_load(sample_xlsx):
+    assert read_workbook_text(str(sample_xlsx), streaming=True) == read_workbook_text(str(sample_xlsx))
+
+
+def test_streaming_resolves_hyperlinks_across_sheets(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["A1"] = "Ticket Hyperlink"
+    ws["B1"] = "BP-00479"
+    ws["B1"].hyperlink = "https://jira.example.com/browse/BP-00479"
+    hidden = wb.create_sheet("Data")
+    hidden.sheet_state = "hidden"
+    for i in range(1, 6):
+        hidden.cell(row=i, column=2, value=i)
+    path = tmp_path / "links.xlsx"
+    wb.save(path)
+
+    rows = list(iter_workbook_rows(str(path)))
+    assert rows[0] == "Ticket Hyperlink BP-00479 (https://jira.example.com/browse/BP-00479)"
+    # Sheets are separated by a single blank row
+    assert rows[1:] == ["", "1", "2", "3", "4", "5"]
+    assert "\n".join(rows) == read_workbook_text(str(path))
+
+
+def test_ooxml_backend_parity(tmp_path, sample_xlsx):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Section", "Field", "Value"])
+    ws.append(["HEADER", "Start Date", datetime.date(2025, 7, 15)])
+    ws.append(["HEADER", "Budget", 1250.5])
+    ws.append(["HEADER", "Approved", True])
+    ws["C5"] = "BP-00479"
+    ws["C5"].hyperlink = "https://jira.example.com/browse/BP-00479"
+    ws.merge_cells("A6:C6")
+    ws["A6"] = "Merged title"
+    extra = wb.create_sheet("Extra")
+    extra["B3"] = "  padded  "
+    path = tmp_path / "parity.xlsx"
+    wb.save(path)
+
+    for p in (path, sample_xlsx):
+        assert read_workbook_text(str(p), backend="ooxml") == read_workbook_text(str(p))
+
+
+def test_ooxml_backend_falls_back_to_openpyxl(tmp_path):
+    bogus = tmp_path / "not_a_zip.xlsx"
+    bogus.write_text("plain text")
+    with pytest.raises(ValidationException):
+        read_workbook_text(str(bogus), backend="ooxml")
+
+
+def test_ooxml_fallback_keeps_streaming(sample_xlsx, monkeypatch):
+    import src.piv.io.ooxml_reader as ooxml_reader
+
+    def unsupported(path):
+        raise ValueError("unsupported layout")
+
+    calls = []
+    monkeypatch.setattr(ooxml_reader, "iter_ooxml_rows", unsupported)
+    monkeypatch.setattr(ooxml_reader, "read_workbook_text", lambda path, **options: calls.append(options) or "")
+    read_workbook_text(str(sample_xlsx), backend="ooxml", streaming=True)
+    assert calls == [{"streaming": True}]
+
+
+@pytest.mark.parametrize("backend", ["openpyxl", "ooxml"])
+def test_parallel_sheets_keep_sheet_order(tmp_path, backend):
+    wb = openpyxl.Workbook()
+    for s in range(4):
+        ws = wb.active if s == 0 else wb.create_sheet(f"Sheet{s}")
+        for r in range(1, 4):
+            ws.cell(row=r, column=1, value=f"sheet {s} row {r}")
+    wb.create_sheet("Empty")
+    path = tmp_path / "multi.xlsx"
+    wb.save(path)
+
+    expected = read_workbook_text(str(path))
+    assert read_workbook_text(str(path), backend=backend, workers=2, parallel_min_bytes=0) == expected
+    # Below the size threshold the call stays in-process and still matches
+    assert read_workbook_text(str(path), backend=backend, workers=2) == expected
+
+
+def test_parallel_reader_shares_tables_and_streaming(sample_xlsx, monkeypatch):
+    from src.piv.io import parallel_reader
+    from src.piv.io.ooxml_reader import iter_ooxml_rows, read_ooxml_tables
+
+    path = str(sample_xlsx)
+    assert list(iter_ooxml_rows(path, tables=read_ooxml_tables(path))) == list(iter_ooxml_rows(path))
+    # openpyxl workers each load the workbook once for a run of sheets
+    assert parallel_reader._sheet_batches(5, 2, "openpyxl") == [[0, 1, 2], [3, 4]]
+
+    calls = []
+    monkeypatch.setattr(parallel_reader, "read_workbook_text", lambda path, **options: calls.append(options) or "")
+    parallel_reader.read_workbook_text_parallel(path, workers=4, streaming=True)
+    assert calls == [{"backend": "openpyxl", "streaming": True}]
+
+
+def test_hyperlink_scan_memory_does_not_grow_with_rows(tmp_path):
+    import tracemalloc
+    import zipfile
+
+    from src.piv.io.excel_reader import _sheet_hyperlinks
+
+    def peak(rows):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        for r in range(rows):
+            ws.append([f"row {r}", r])
+        ws["A1"].hyperlink = "https://example.com"
+        path = tmp_path / f"rows{rows}.xlsx"
+        wb.save(path)
+        with zipfile.ZipFile(path) as archive:
+            tracemalloc.start()
+            try:
+                assert _sheet_hyperlinks(archive, "xl/worksheets/sheet1.xml")[0] == {(1, 1): "https://example.com"}
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    assert peak(20000) < 3 * peak(2000)
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from exception import ValidationException
+from src.piv.graph.graph import build_graph, merge_validation
+from src.piv.llm.offline import RuleBasedLLM
+
+VALIDATORS = ["header", "business", "problem", "scope", "benefits"]
+
+
+def test_validators_fan_out_after_extract(prompts_dir):
+    graph = build_graph({"llm": RuleBasedLLM(), "prompts_dir": str(prompts_dir)})
+    edges = {(edge.source, edge.target) for edge in graph.get_graph().edges}
+    for name in VALIDATORS:
+        assert ("extract", name) in edges
+        assert (name, "format") in edges
+    assert not any(source in VALIDATORS and target in VALIDATORS for source, target in edges)
+
+
+def test_parallel_validation_is_merged(prompts_dir, sample_xlsx, initial_state):
+    graph = build_graph({"llm": RuleBasedLLM(), "prompts_dir": str(prompts_dir), "rule_extraction": False})
+    out = graph.invoke(initial_state(sample_xlsx))
+    assert set(out["validation"]) == {"header", "business_case", "problem_statement", "project_scope",
+                                      "expected_benefits"}
+    assert out["final_feedback"].startswith("ADSP Validation Summary")
+
+
+def test_merge_validation_does_not_mutate():
+    left = {"header": 1}
+    assert merge_validation(left, {"scope": 2}) == {"header": 1, "scope": 2}
+    assert left == {"header": 1}
+    assert merge_validation(None, {"scope": 2}) == {"scope": 2}
+
+
+class _CountingLLM(RuleBasedLLM):
+    def __init__(self, answer=None):
+        super().__init__()
+        self.answer = answer
+        self.calls = 0
+
+    def complete_json(self, system_prompt, user_payload, **kwargs):
+        self.calls += 1
+        if self.answer is not None:
+            return self.answer
+        return super().complete_json(system_prompt, user_payload, **kwargs)
+
+
+def test_blank_workbook_skips_extraction(tmp_path, prompts_dir, initial_state):
+    from openpyxl import Workbook
+
+    blank = tmp_path / "blank.xlsx"
+    Workbook().save(blank)
+    llm = _CountingLLM()
+    out = build_graph({"llm": llm, "prompts_dir": str(prompts_dir)}).invoke(initial_state(blank))
+    assert llm.calls == 0
+    assert out["short_circuit"] == "empty_document"
+    assert not out["validation"]["header"].passed
+    assert out["final_feedback"].endswith("NEEDS REVISION")
+
+
+def test_empty_extraction_is_reported_missing(prompts_dir, sample_xlsx, initial_state):
+    llm = _CountingLLM(answer={})
+    out = build_graph({"llm": llm, "prompts_dir": str(prompts_dir), "rule_extraction": False,
+                       "streaming": False, "targeted_retry": False}).invoke(initial_state(sample_xlsx))
+    assert llm.calls == 1
+    assert out["short_circuit"] == "empty_sections"
+    assert len(out["validation"]) == 5
+
+
+def test_fail_fast_stops_at_first_error(prompts_dir, sample_xlsx, initial_state):
+    answer = {"header": {"fields": {"Project Name": "Only a name"}}, "business_case": {"fields": {"Why now": "x"}}}
+    graph = build_graph({"llm": _CountingLLM(answer=answer), "prompts_dir": str(prompts_dir),
+                         "rule_extraction": False, "streaming": False, "targeted_retry": False, "fail_fast": True})
+    out = graph.invoke(initial_state(sample_xlsx))
+    assert list(out["validation"]) == ["header"]
+    assert out["short_circuit"] == "fail_fast:header"
+    assert out["final_feedback"].endswith("NEEDS REVISION")
+
+
+class _StreamingLLM(_CountingLLM):
+    def complete_json_streaming(self, system_prompt, user_payload, on_section, **kwargs):
+        answer = self.complete_json(system_prompt, user_payload, **kwargs)
+        for key, section in answer.items():
+            on_section(key, section)
+        return answer
+
+
+def test_fail_fast_with_streaming_reports_where_it_stopped(prompts_dir, sample_xlsx, initial_state):
+    graph = build_graph({"llm": _StreamingLLM(), "prompts_dir": str(prompts_dir), "rule_extraction": False,
+                         "fail_fast": True})
+    out = graph.invoke(initial_state(sample_xlsx))
+    # Every section was validated while streaming, but the header node still stopped the run
+    assert len(out["early_validation"]) == len(out["validation"]) == 5
+    assert out["short_circuit"] == "fail_fast:header"
+
+
+def test_validator_nodes_follow_the_rule_spec(tmp_path, prompts_dir, sample_xlsx, initial_state):
+    from src.piv.agents.rules import load_rules
+
+    spec = load_rules()
+    del spec["project_scope"]
+    spec["risks"] = [{"field": "Top risk", "required": "Missing top risk"}]
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps(spec), encoding="utf-8")
+
+    graph = build_graph({"llm": RuleBasedLLM(), "prompts_dir": str(prompts_dir), "rule_extraction": False,
+                         "validation_rules": str(rules)})
+    out = graph.invoke(initial_state(sample_xlsx))
+    assert "scope" not in graph.get_graph().nodes
+    assert set(out["validation"]) == {"header", "business_case", "problem_statement", "expected_benefits", "risks"}
+    assert out["validation"]["risks"].issues[0].field == "Top risk"
+
+
+def test_rule_sections_must_not_clash_with_nodes(tmp_path, prompts_dir):
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"format": []}), encoding="utf-8")
+    with pytest.raises(ValidationException, match="format"):
+        build_graph({"llm": RuleBasedLLM(), "prompts_dir": str(prompts_dir), "validation_rules": str(rules)})
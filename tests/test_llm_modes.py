@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from exception import ValidationException
+from src.piv.graph.graph import build_graph
+from src.piv.llm.factory import create_llm
+from src.piv.llm.offline import RecordingLLM, ReplayLLM, RuleBasedLLM
+
+
+@pytest.fixture
+def run(prompts_dir, sample_xlsx, initial_state):
+    def invoke(llm):
+        graph = build_graph({"llm": llm, "prompts_dir": str(prompts_dir), "rule_extraction": False})
+        return graph.invoke(initial_state(sample_xlsx))
+    return invoke
+
+
+def test_record_then_replay_is_deterministic(tmp_path, monkeypatch, run):
+    recordings = tmp_path / "recordings.jsonl"
+
+    monkeypatch.setenv("PIV_LLM_MODE", "fake")
+    assert isinstance(create_llm(), RuleBasedLLM)
+    recorded = run(RecordingLLM(create_llm(), recordings))
+    assert recorded["sections"]["header"]["fields"]["Practice/Account"] == "Digital Transformation / AI Lab"
+
+    monkeypatch.setenv("PIV_LLM_MODE", "replay")
+    monkeypatch.setenv("PIV_LLM_RECORDINGS", str(recordings))
+    monkeypatch.setenv("PIV_LLM_REPLAY_LATENCY", "0.05")
+    replay = create_llm()
+    started = time.perf_counter()
+    replayed = run(replay)
+    assert time.perf_counter() - started >= 0.05
+    assert replayed["sections"] == recorded["sections"]
+    # Both runs take the live streaming path and validate sections as they arrive
+    assert recorded["extraction"]["method"] == replayed["extraction"]["method"] == "llm_streaming"
+    assert replayed["early_validation"] == recorded["early_validation"] != []
+    assert replayed["final_feedback"] == recorded["final_feedback"]
+
+    with pytest.raises(ValidationException):
+        ReplayLLM(str(recordings)).complete_json("sys", "never recorded")
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValidationException):
+        create_llm("live")
@@ -0,0 +1,77 @@
+import json
+
+import openpyxl
+
+from src.piv.batch.backends import LocalBatchBackend
+from src.piv.batch.offline import _chunk_lines, load_results, run_offline_batch
+from tests.generate_sample import create_sample_excel
+
+
+class _RecordingResponder:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self, body):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("deployment unavailable")
+        assert body["response_format"]["json_schema"]["strict"] is True
+        return json.dumps({"header": {"fields": {"Project Name": "From batch"}}})
+
+
+def _workbooks(tmp_path):
+    incomplete = tmp_path / "incomplete.xlsx"
+    create_sample_excel(incomplete)
+    complete = tmp_path / "complete.xlsx"
+    create_sample_excel(complete)
+    wb = openpyxl.load_workbook(complete)
+    wb.active["C5"] = "Intake Validator"
+    wb.save(complete)
+    return [str(incomplete), str(complete)]
+
+
+def test_offline_batch_is_resumable(tmp_path, prompts_dir):
+    paths = _workbooks(tmp_path)
+    work_dir = tmp_path / "work"
+
+    failing = _RecordingResponder(fail=True)
+    out = run_offline_batch(paths, work_dir, LocalBatchBackend(tmp_path / "svc", failing), prompts_dir,
+                            deployment="dep", poll_interval=0)
+    # The complete workbook never reaches the batch; the incomplete one failed and is kept for retry
+    assert failing.calls == 1
+    assert out[paths[1]]["method"] == "rules"
+    assert out[paths[0]]["error"]["code"] == "RuntimeError"
+
+    ok = _RecordingResponder()
+    out = run_offline_batch(paths, work_dir, LocalBatchBackend(tmp_path / "svc", ok), prompts_dir,
+                            deployment="dep", poll_interval=0)
+    assert ok.calls == 1
+    assert out[paths[0]]["method"] == "batch"
+    assert out[paths[0]]["sections"]["header"]["fields"]["Project Name"] == "From batch"
+    assert "ADSP" in out[paths[0]]["final_feedback"]
+
+    # Everything is done now: a third run submits nothing
+    again = _RecordingResponder()
+    run_offline_batch(paths, work_dir, LocalBatchBackend(tmp_path / "svc", again), prompts_dir,
+                      deployment="dep", poll_interval=0)
+    assert again.calls == 0
+    assert len(load_results(work_dir)) == 2
+
+
+def test_unreadable_workbook_is_recorded_and_skipped(tmp_path, prompts_dir):
+    paths = _workbooks(tmp_path)
+    corrupt = tmp_path / "corrupt.xlsx"
+    corrupt.write_bytes(b"not a workbook")
+    ok = _RecordingResponder()
+    out = run_offline_batch([str(corrupt)] + paths, tmp_path / "work", LocalBatchBackend(tmp_path / "svc", ok),
+                            prompts_dir, deployment="dep", poll_interval=0)
+    assert out[str(corrupt)]["error"]["code"]
+    assert out[paths[0]]["method"] == "batch" and out[paths[1]]["method"] == "rules"
+
+
+def test_batch_files_split_by_count_and_size():
+    requests = [{"custom_id": str(i), "body": "x" * 100} for i in range(5)]
+    assert [len(c) for c in _chunk_lines(requests, max_requests=2)] == [2, 2, 1]
+    line = len(json.dumps(requests[0]) + "\n")
+    assert [len(c) for c in _chunk_lines(requests, max_bytes=3 * line)] == [3, 2]
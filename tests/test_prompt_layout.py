@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.preprocessing.semantic_extractor import build_extraction_prompt, extract_sections_via_llm
+
+
+def _response(prompt_tokens, cached_tokens):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=40,
+                              prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens)),
+    )
+
+
+def test_static_instructions_form_a_stable_prefix(prompts_dir):
+    system_a, user_a = build_extraction_prompt("Project Name | Alpha", prompts_dir)
+    system_b, user_b = build_extraction_prompt("Project Name | Beta", prompts_dir)
+    assert system_a == system_b
+    assert '"Practice/Account"' in system_a and "{DOCUMENT_TEXT}" not in system_a
+    assert user_a == "Project Name | Alpha"
+
+
+def test_usage_accounting_per_call(azure_env, prompts_dir):
+    llm = AzureOpenAILLM()
+    responses = iter([_response(1200, 0), _response(1210, 1024)])
+    sent = []
+
+    def create(**kwargs):
+        sent.append(kwargs["messages"])
+        return next(responses)
+
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    extract_sections_via_llm("doc one", prompts_dir, llm)
+    extract_sections_via_llm("doc two", prompts_dir, llm)
+
+    assert sent[0][0] == sent[1][0] and sent[1][1]["content"] == "doc two"
+    assert [c["cached_tokens"] for c in llm.usage.calls] == [0, 1024]
+    summary = llm.usage.summary()
+    assert summary["calls"] == 2 and summary["completion_tokens"] == 80
+    assert summary["cached_ratio"] == 1024 / 2410
@@ -0,0 +1,58 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.response_cache import ResponseCache
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = json.dumps({"echo": kwargs["messages"][-1]["content"]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def llm(azure_env, tmp_path):
+    client = AzureOpenAILLM(cache=ResponseCache(str(tmp_path / "cache.sqlite3")))
+    completions = _FakeCompletions()
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def test_repeated_prompt_is_served_from_cache(llm):
+    client, completions = llm
+    assert client.complete_json("sys", "doc") == {"echo": "doc"}
+    assert client.complete_json("sys", "doc") == {"echo": "doc"}
+    assert completions.calls == 1
+    assert client.complete_json("sys", "doc", bypass_cache=True) == {"echo": "doc"}
+    assert completions.calls == 2
+    stats = client.cache.stats()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 1
+
+
+def test_disk_tier_survives_new_process_and_expires(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    key = ResponseCache.make_key("gpt-test", "v1", "sys", "doc")
+    ResponseCache(path).put(key, {"a": 1}, latency=2.5)
+
+    fresh = ResponseCache(path)
+    assert fresh.get(key) == {"a": 1}
+    assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["latency_saved_s"] == 2.5
+
+    expired = ResponseCache(path, ttl_seconds=0)
+    assert expired.get(key) is None
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), memory_entries=0, max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(name, {"v": name})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"v": "c"}
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,80 @@
+import json
+import random
+
+import pytest
+
+from src.piv.agents.registry import LEGACY_VALIDATORS, SECTION_VALIDATORS
+from src.piv.agents.rules import compile_rules, load_rules
+
+VALUES = [
+    None, "", "   ", "short", "n/a",
+    "We need to replace the legacy database integration to improve latency",
+    "A long enough answer without any of the special words in it at all",
+    "Improves KPI uptime and reduces cost", "2024-01-15", "15/01/2024", "not a date",
+    "https://jira.example.com/PROJ-1", "PROJ-1 (https://jira.example.com/PROJ-1)", "jira.example.com/PROJ-1",
+    "  padded API pipeline text that is certainly longer than thirty characters  ",
+]
+
+FIELDS = {
+    "header": ["Practice/Account", "Project Name", "Ticket Hyperlink", "Start Date", "Deadline"],
+    "business_case": ["Why now", "Consequences of delay", "Technical justification", "Softtek Big Y",
+                      "Organizational KPI"],
+    "problem_statement": ["Problem Definition", "Current Pain Points", "Business/System Impact", "Who is affected"],
+    "project_scope": ["In Scope", "Out of Scope"],
+    "expected_benefits": ["Qualitative Benefits"],
+}
+QUANTITATIVE = ["Softtek Hard Dollars", "Softtek Soft Dollars", "Customer Hard Dollars", "Customer Soft Dollars"]
+
+
+def _sections(section_key, rng, count=300):
+    yield None
+    yield "not a dict"
+    yield {}
+    yield {"fields": None}
+    for value in VALUES:
+        yield {"fields": {name: value for name in FIELDS[section_key]}}
+    for _ in range(count):
+        fields = {name: rng.choice(VALUES) for name in FIELDS[section_key] if rng.random() < 0.9}
+        if section_key == "expected_benefits":
+            fields["Quantitative"] = rng.choice([None, "oops", {}, {k: rng.choice([None, "", " ", "1000", 5])
+                                                                   for k in QUANTITATIVE}])
+        yield {"fields": fields}
+
+
+@pytest.mark.parametrize("section_key", list(LEGACY_VALIDATORS))
+def test_compiled_rules_match_legacy_agents(section_key):
+    rng = random.Random(section_key)
+    legacy, compiled = LEGACY_VALIDATORS[section_key], SECTION_VALIDATORS[section_key]
+    for section in _sections(section_key, rng):
+        assert compiled(section).model_dump() == legacy(section).model_dump(), section
+
+
+def test_rule_changes_need_no_code(tmp_path):
+    spec = load_rules()
+    spec["project_scope"].append({"field": "Assumptions", "required": {"severity": "WARNING", "message": "None"}})
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+
+    validate = compile_rules(load_rules(path))["project_scope"]
+    result = validate({"fields": {"In Scope": "x", "Out of Scope": "y"}})
+    assert result.passed
+    assert [(i.field, i.severity) for i in result.issues] == [("Assumptions", "WARNING")]
+
+
+def test_yaml_spec(tmp_path):
+    yaml = pytest.importorskip("yaml")
+    path = tmp_path / "rules.yaml"
+    path.write_text(yaml.safe_dump(load_rules()), encoding="utf-8")
+    validators = compile_rules(load_rules(path))
+    section = {"fields": {"Ticket Hyperlink": "jira/PROJ-1", "Start Date": "2024-01-15"}}
+    assert validators["header"](section) == LEGACY_VALIDATORS["header"](section)
+
+
+def test_checks_run_in_spec_order():
+    validate = compile_rules({"s": [{"field": "f", "required": "Missing",
+                                     "min_length": {"min": 50, "severity": "WARNING", "message": "short"},
+                                     "keywords": {"any": ["x"], "message": "no x"}}]})["s"]
+    assert [i.description for i in validate({"fields": {"f": "abc"}}).issues] == ["short"]
+    assert [i.description for i in validate({"fields": {"f": "a" * 60}}).issues] == ["no x"]
+    assert not validate({"fields": {"f": "a" * 60}}).passed
+    assert validate({"fields": {}}).issues[0].severity == "ERROR"
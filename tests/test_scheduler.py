@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RateLimitScheduler, retry_after_seconds
+
+
+def _rate_limit_error(headers):
+    request = httpx.Request("POST", "https://example.openai.azure.com/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("Too Many Requests", response=response, body=None)
+
+
+class _FlakyCompletions:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise _rate_limit_error({"retry-after-ms": "20"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({"ok": True})))])
+
+
+def test_retry_after_header_parsing():
+    assert retry_after_seconds(_rate_limit_error({"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(_rate_limit_error({"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(_rate_limit_error({})) is None
+
+
+def test_429_is_retried_instead_of_failing(azure_env):
+    scheduler = RateLimitScheduler(rpm=600, base_delay=0.01)
+    llm = AzureOpenAILLM(scheduler=scheduler)
+    completions = _FlakyCompletions(failures=2)
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    assert llm.complete_json("", "doc") == {"ok": True}
+    assert completions.calls == 3
+    assert scheduler.stats()["rate_limited"] == 2
+
+
+def test_token_bucket_delays_calls_over_tpm():
+    scheduler = RateLimitScheduler(tpm=600)  # refills 10 tokens per second
+    assert scheduler.acquire(600) < 0.05
+    assert scheduler.acquire(5) >= 0.4
+
+
+def test_interactive_lane_goes_first():
+    scheduler = RateLimitScheduler()
+    scheduler._paused_until = time.monotonic() + 0.2  # as if a 429 just paused every lane
+    order = []
+
+    def worker(priority, name):
+        scheduler.acquire(1, priority)
+        order.append(name)
+
+    batch = threading.Thread(target=worker, args=(PRIORITY_BATCH, "batch"))
+    batch.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=worker, args=(PRIORITY_INTERACTIVE, "interactive"))
+    interactive.start()
+    batch.join()
+    interactive.join()
+    assert order == ["interactive", "batch"]
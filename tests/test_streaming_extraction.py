@@ -0,0 +1,146 @@
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from exception import ValidationException
+from src.piv.graph.graph import build_graph
+from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.streaming import IncrementalSectionParser
+from src.piv.llm.telemetry import LLMTelemetry
+from src.piv.preprocessing.semantic_extractor import extract_sections_streaming
+
+ANSWER = {
+    "header": {"fields": {"Practice/Account": "AI Lab", "Project Name": "Intake {v2}", "Ticket Hyperlink": "",
+                          "Start Date": "2025-01-01", "Deadline": "2025-06-30"}},
+    "business_case": {"fields": {"Why now": "Backlog \"growing\""}},
+    "problem_statement": {"fields": {"Problem Definition": "Slow intake"}},
+    "project_scope": {"fields": {"In Scope": "Validation", "Out of Scope": "Billing"}},
+    "expected_benefits": {"fields": {"Qualitative Benefits": "Faster", "Quantitative": {"Customer Hard Dollars": "$1"}}},
+}
+
+
+def test_parser_reports_sections_as_they_close():
+    text = json.dumps(ANSWER, indent=2)
+    parser = IncrementalSectionParser()
+    seen = []
+    for i in range(0, len(text), 7):
+        seen.extend(key for key, _ in parser.feed(text[i:i + 7]))
+    assert seen == list(ANSWER)
+    assert parser.text == text
+
+
+def _sse(pieces, pause_after_first):
+    def chunk(content=None, usage=None):
+        body = {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                "choices": [] if content is None else [{"index": 0, "delta": {"content": content}, "finish_reason": None}]}
+        if usage:
+            body["usage"] = usage
+        return f"data: {json.dumps(body)}\n\n".encode()
+
+    def stream():
+        for i, piece in enumerate(pieces):
+            yield chunk(piece)
+            if i == 0:
+                time.sleep(pause_after_first)
+        yield chunk(usage={"prompt_tokens": 900, "completion_tokens": 120, "total_tokens": 1020})
+        yield b"data: [DONE]\n\n"
+
+    return stream()
+
+
+def _streaming_llm(pause=0.0):
+    text = json.dumps(ANSWER)
+    split = text.index('"business_case"')
+    pieces = [text[:split], text[split:]]
+
+    def handler(request):
+        if not json.loads(request.content).get("stream"):
+            return httpx.Response(200, json={"id": "c", "object": "chat.completion", "created": 0, "model": "m",
+                                             "choices": [{"index": 0, "finish_reason": "stop",
+                                                          "message": {"role": "assistant", "content": text}}]})
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=_sse(pieces, pause))
+
+    return AzureOpenAILLM(http_client=httpx.Client(transport=httpx.MockTransport(handler)), telemetry=LLMTelemetry())
+
+
+def test_sections_are_dispatched_before_the_stream_ends(azure_env, prompts_dir):
+    llm = _streaming_llm(pause=0.2)
+    arrivals = {}
+    result = extract_sections_streaming("doc", prompts_dir, llm, lambda key, _: arrivals.setdefault(key, time.perf_counter()))
+    finished = time.perf_counter()
+
+    assert list(arrivals) == list(ANSWER)
+    assert finished - arrivals["header"] >= 0.15
+    assert result["business_case"]["fields"]["Why now"] == 'Backlog "growing"'
+    # Absent keys are filled before sections reach the callback and in the result
+    assert result["business_case"]["fields"]["Softtek Big Y"] == ""
+    assert llm.usage.calls[-1]["completion_tokens"] == 120
+
+
+def test_graph_validates_streamed_sections_early(azure_env, prompts_dir, sample_xlsx, initial_state):
+    initial = initial_state(sample_xlsx)
+    options = {"prompts_dir": str(prompts_dir), "rule_extraction": False, "targeted_retry": False}
+
+    streamed = build_graph({"llm": _streaming_llm(), **options}).invoke(dict(initial))
+    buffered = build_graph({"llm": _streaming_llm(), "streaming": False, **options}).invoke(dict(initial))
+
+    assert streamed["extraction"]["method"] == "llm_streaming"
+    assert streamed["early_validation"] == sorted(ANSWER)
+    assert buffered["extraction"]["method"] == "llm"
+    assert streamed["final_feedback"] == buffered["final_feedback"]
+
+
+def test_streaming_honours_bypass_cache(azure_env):
+    from src.piv.llm.response_cache import ResponseCache
+
+    llm = _streaming_llm()
+    llm.cache = ResponseCache(path=None)
+    for _ in range(2):
+        llm.complete_json_streaming("system", "doc", lambda *_: None, bypass_cache=True)
+    assert len(llm.usage.calls) == 2
+
+
+class _Stream:
+    def __init__(self):
+        self.closed = False
+
+    def __iter__(self):
+        delta = SimpleNamespace(content=json.dumps(ANSWER))
+        yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_is_closed_when_the_callback_fails(azure_env):
+    stream = _Stream()
+    llm = AzureOpenAILLM(telemetry=LLMTelemetry())
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: stream)))
+
+    def on_section(key, section):
+        raise RuntimeError("validator crashed")
+
+    with pytest.raises(ValidationException):
+        llm.complete_json_streaming("system", "doc", on_section)
+    assert stream.closed
+
+
+class _RerequestingLLM:
+    """Streams a header, then returns a different one, as after an unrepairable first answer."""
+
+    def complete_json_streaming(self, system_prompt, user_payload, on_section, response_schema=None):
+        on_section("header", {"fields": {"Project Name": "Discarded"}})
+        on_section("business_case", ANSWER["business_case"])
+        return {"header": ANSWER["header"], "business_case": ANSWER["business_case"]}
+
+
+def test_early_results_for_discarded_sections_are_dropped(prompts_dir):
+    options = {"prompts_dir": str(prompts_dir), "rule_extraction": False, "compaction": False}
+    out = build_graph({"llm": _RerequestingLLM(), **options}).invoke(
+        {"source_path": "doc.xlsx", "document_text": "Project Name: Intake"})
+    assert out["early_validation"] == ["business_case"]
+    header = {i.field for i in out["validation"]["header"].issues}
+    assert "Project Name" not in header and "Start Date" not in header
@@ -0,0 +1,66 @@
+import json
+
+import httpx
+import pytest
+
+from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.structured import parse_structured, repair_json
+from src.piv.llm.telemetry import LLMTelemetry
+from src.piv.preprocessing.semantic_extractor import extract_sections_via_llm
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('```json\n{"a": {"b": "x"}}\n```', {"a": {"b": "x"}}),
+    ('{"a": {"b": "trunc', {"a": {"b": "trunc"}}),
+    ('{"a": {"b": "x",}, }', {"a": {"b": "x"}}),
+    ('{"a": {"b": "x", "c"', {"a": {"b": "x", "c": ""}}),
+    ('Here you go: {"a": 1} done', {"a": 1}),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_validation_fills_absent_keys_and_coerces_values(extractor_schema):
+    sections, repaired = parse_structured('{"header": {"fields": {"Project Name": 42, "Bogus": "x"}}', extractor_schema)
+    assert repaired
+    assert sections["header"]["fields"] == {"Practice/Account": "", "Project Name": "42", "Ticket Hyperlink": "",
+                                           "Start Date": "", "Deadline": ""}
+    assert sections["expected_benefits"]["fields"]["Quantitative"]["Customer Soft Dollars"] == ""
+
+
+def _completion(content):
+    return {"id": "c", "object": "chat.completion", "created": 0, "model": "m",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]}
+
+
+def _llm(contents):
+    sent = []
+    replies = iter(contents)
+
+    def handle(request):
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json=_completion(next(replies)))
+
+    http = httpx.Client(transport=httpx.MockTransport(handle))
+    return AzureOpenAILLM(http_client=http, telemetry=LLMTelemetry()), sent
+
+
+def test_repairable_output_needs_no_second_request(azure_env, prompts_dir, extractor_schema):
+    llm, sent = _llm(['{"header": {"fields": {"Project Name": "Alpha"'])
+    sections = extract_sections_via_llm("doc", prompts_dir, llm)
+
+    assert len(sent) == 1
+    assert sent[0]["response_format"]["type"] == "json_schema"
+    assert sent[0]["response_format"]["json_schema"]["schema"]["required"] == list(extractor_schema)
+    assert sections["header"]["fields"]["Project Name"] == "Alpha"
+    assert sections["project_scope"]["fields"] == {"In Scope": "", "Out of Scope": ""}
+    assert llm.structured_stats == {"repaired": 1, "rerequested": 0}
+
+
+def test_unrepairable_output_is_requested_again(azure_env, prompts_dir):
+    llm, sent = _llm(["I cannot help with that.", '{"header": {"fields": {"Project Name": "Beta"}}}'])
+    sections = extract_sections_via_llm("doc", prompts_dir, llm)
+
+    assert len(sent) == 2
+    assert sections["header"]["fields"]["Project Name"] == "Beta"
+    assert llm.structured_stats == {"repaired": 0, "rerequested": 1}
@@ -0,0 +1,62 @@
+import openpyxl
+
+from src.piv.graph.graph import build_graph
+from src.piv.io.excel_reader import read_workbook_text
+from src.piv.preprocessing.table_extractor import extract_sections_via_rules
+
+
+class _NoLLM:
+    def complete_json(self, system_prompt, user_payload):
+        raise AssertionError("LLM should not be called for a complete table layout")
+
+
+def test_sample_layout_maps_onto_schema(sample_xlsx, extractor_schema):
+    sections, report = extract_sections_via_rules(read_workbook_text(str(sample_xlsx)), extractor_schema)
+
+    assert sections["header"]["fields"]["Practice/Account"] == "Digital Transformation / AI Lab"
+    assert sections["problem_statement"]["fields"]["Business/System Impact"] == "Delays in project kickoff and resource allocation."
+    assert sections["expected_benefits"]["fields"]["Quantitative"]["Customer Hard Dollars"] == "$100,000"
+    # The sample leaves Project Name blank on purpose, so the LLM fallback is still needed
+    assert report["missing"] == ["header.Project Name"]
+    assert not report["complete"]
+
+
+def test_fuzzy_labels_and_conflicts(extractor_schema):
+    text = "\n".join([
+        "HEADER Project Name: Intake Validator",
+        "BUSINESS CASE Organisational KPIs Throughput +20%",
+        "Why now Backlog is growing",
+        "BUSINESS_CASE Why now Audit deadline",
+    ])
+    sections, report = extract_sections_via_rules(text, extractor_schema)
+
+    assert sections["header"]["fields"]["Project Name"] == "Intake Validator"
+    assert sections["business_case"]["fields"]["Organizational KPI"] == "Throughput +20%"
+    assert 0.85 <= report["confidence"]["business_case.Organizational KPI"] < 1.0
+    assert report["ambiguous"] == ["business_case.Why now"]
+
+
+def test_graph_skips_llm_when_rules_are_complete(prompts_dir, sample_xlsx, initial_state):
+    wb = openpyxl.load_workbook(sample_xlsx)
+    wb.active["C5"] = "Intake Validator"
+    wb.save(sample_xlsx)
+    graph = build_graph({"llm": _NoLLM(), "prompts_dir": str(prompts_dir)})
+
+    out = graph.invoke(initial_state(sample_xlsx))
+    assert out["extraction"]["method"] == "rules"
+    assert out["sections"]["header"]["fields"]["Project Name"] == "Intake Validator"
+
+
+def test_placeholder_values_count_as_missing(extractor_schema):
+    text = "\n".join([
+        "HEADER Project Name [Project Name]",
+        "HEADER Start Date <dd/mm/yyyy>",
+        "HEADER Deadline Enter the deadline here",
+        "HEADER Practice/Account AI Lab",
+    ])
+    sections, report = extract_sections_via_rules(text, extractor_schema)
+
+    assert sections["header"]["fields"]["Project Name"] == ""
+    assert sections["header"]["fields"]["Practice/Account"] == "AI Lab"
+    assert report["placeholder"] == ["header.Deadline", "header.Project Name", "header.Start Date"]
+    assert "header.Project Name" in report["missing"] and not report["complete"]
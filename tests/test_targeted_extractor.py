@@ -0,0 +1,63 @@
+import json
+
+from src.piv.llm.prompts import parse_schema_block
+from src.piv.preprocessing.schema import empty_sections, set_field
+from src.piv.preprocessing.semantic_extractor import build_extraction_prompt
+from src.piv.preprocessing.targeted_extractor import TARGETED_INSTRUCTIONS, extract_missing_fields
+
+
+class _SectionLLM:
+    """Answers with the template it was sent, filling every field with its name."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def complete_json(self, system_prompt, user_payload):
+        self.prompts.append((system_prompt, user_payload))
+        template = parse_schema_block(system_prompt)
+        for section in template.values():
+            quantitative = section["fields"].get("Quantitative", {})
+            for name in quantitative:
+                quantitative[name] = "" if name == "Customer Soft Dollars" else f"{name} value"
+        return template
+
+
+def test_only_missing_fields_are_requested_and_merged(prompts_dir, extractor_schema):
+    sections = empty_sections(extractor_schema)
+    for section_key, section in extractor_schema.items():
+        for name, value in section["fields"].items():
+            if not isinstance(value, dict):
+                set_field(sections, section_key, (name,), "known")
+    llm = _SectionLLM()
+
+    sections, report = extract_missing_fields("doc", prompts_dir, llm, extractor_schema, sections)
+
+    assert len(llm.prompts) == 1
+    system_prompt, payload = llm.prompts[0]
+    # A short prompt for the missing fields only, with the document sent once
+    assert payload == "doc"
+    assert len(system_prompt) < len(build_extraction_prompt("doc", prompts_dir)[0]) / 2
+    assert '"header"' not in system_prompt and '"Softtek Hard Dollars"' in system_prompt
+    assert "Quantitative Benefits" in system_prompt and "Project Name Fallback" not in system_prompt
+    quantitative = sections["expected_benefits"]["fields"]["Quantitative"]
+    assert quantitative["Softtek Hard Dollars"] == "Softtek Hard Dollars value"
+    assert sections["header"]["fields"]["Project Name"] == "known"
+    assert report["still_missing"] == ["expected_benefits.Quantitative.Customer Soft Dollars"]
+    assert len(report["requested"]) == 4
+
+
+class _FailingLLM:
+    def complete_json(self, system_prompt, user_payload):
+        if system_prompt.startswith(TARGETED_INSTRUCTIONS):
+            raise RuntimeError("retry failed")
+        return {"header": {"fields": {"Project Name": "First pass"}}}
+
+
+def test_failed_retry_keeps_first_pass_sections(prompts_dir):
+    from src.piv.graph.graph import build_graph
+
+    graph = build_graph({"llm": _FailingLLM(), "prompts_dir": str(prompts_dir), "rule_extraction": False,
+                         "compaction": False, "streaming": False, "targeted_retry": True})
+    out = graph.invoke({"source_path": "doc.xlsx", "document_text": "Project Name: anything"})
+    assert out["sections"]["header"]["fields"]["Project Name"] == "First pass"
+    assert out["extraction"]["retry"]["error"]
@@ -0,0 +1,46 @@
+import json
+
+import httpx
+import pytest
+
+from exception import ValidationException
+from src.piv.llm.azure_openai_client import AzureOpenAILLM
+from src.piv.llm.telemetry import LLMTelemetry
+
+
+def _completion(content):
+    return {
+        "id": "cmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-test",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 1200, "completion_tokens": 80, "total_tokens": 1280,
+                  "prompt_tokens_details": {"cached_tokens": 1024}},
+    }
+
+
+def test_calls_are_recorded_per_deployment(azure_env):
+    replies = iter([httpx.Response(200, json=_completion('{"ok": true}')),
+                    httpx.Response(200, json=_completion("not json")),
+                    httpx.Response(400, json={"error": {"message": "bad request"}})])
+    http = httpx.Client(transport=httpx.MockTransport(lambda request: next(replies)))
+    telemetry = LLMTelemetry()
+    llm = AzureOpenAILLM(http_client=http, telemetry=telemetry)
+
+    assert llm.complete_json("sys", "doc") == {"ok": True}
+    for _ in range(2):
+        with pytest.raises(ValidationException):
+            llm.complete_json("sys", "doc")
+
+    snap = telemetry.snapshot()[llm.deployment]
+    assert snap["counters"]["calls_total"] == 3
+    assert snap["counters"]["errors_total"] == {"client_error": 1, "invalid_json": 1}
+    assert snap["counters"]["cached_tokens_total"] == 1024
+    # The 400 raises before a response is handed back, so only two TTFB samples
+    assert snap["histograms"]["ttfb_seconds"]["count"] == 2
+    assert snap["histograms"]["prompt_tokens"]["p50"] == 1200
+    assert snap["histograms"]["latency_seconds"]["p99"] >= snap["histograms"]["latency_seconds"]["p50"]
+    json.loads(telemetry.to_json())
+
+    prom = telemetry.to_prometheus()
+    assert f'piv_llm_calls_total{{deployment="{llm.deployment}"}} 3' in prom
+    assert f'piv_llm_latency_seconds_bucket{{deployment="{llm.deployment}",le="+Inf"}} 3' in prom
+    assert "# TYPE piv_llm_latency_seconds histogram" in prom
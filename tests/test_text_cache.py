@@ -0,0 +1,32 @@
+from src.piv.io import text_cache
+from src.piv.io.excel_reader import read_workbook_text
+from src.piv.io.text_cache import WorkbookTextCache
+
+
+def test_repeated_reads_hit_cache(tmp_path, monkeypatch, sample_xlsx):
+    path = sample_xlsx
+    cache = WorkbookTextCache(tmp_path / "cache")
+
+    first = cache.read(str(path))
+    assert first == read_workbook_text(str(path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook should not be re-parsed")
+
+    monkeypatch.setattr(text_cache, "read_workbook_text", fail)
+    # Same bytes under a different name still hit
+    copy = tmp_path / "copy.xlsx"
+    copy.write_bytes(path.read_bytes())
+    assert cache.read(str(copy)) == first
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = WorkbookTextCache(tmp_path / "cache", max_bytes=25)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    assert cache.get("a") == "x" * 10  # refresh "a" so "b" is least recently used
+    cache.put("c", "z" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
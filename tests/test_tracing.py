@@ -0,0 +1,64 @@
+import json
+import tracemalloc
+
+import pytest
+
+from src.piv.graph.graph import build_graph
+from src.piv.graph.tracing import error_spans, to_chrome_trace, to_prometheus, traced, write_trace
+from src.piv.llm.offline import RuleBasedLLM
+
+
+@pytest.fixture
+def run(prompts_dir, sample_xlsx, initial_state):
+    def invoke(**context):
+        graph = build_graph({"llm": RuleBasedLLM(), "prompts_dir": str(prompts_dir), "rule_extraction": False,
+                             **context})
+        return graph.invoke(initial_state(sample_xlsx))
+    return invoke
+
+
+def test_every_node_reports_a_span(run):
+    out = run(trace_memory=True)
+    spans = {span["node"]: span for span in out["timings"]}
+    assert set(spans) == {"read", "compact", "extract", "header", "business", "problem", "scope", "benefits",
+                          "format"}
+    read = spans["read"]
+    assert read["wall_s"] > 0 and read["cpu_s"] >= 0 and read["peak_alloc_bytes"] > 0
+    assert read["document"].endswith("sample.xlsx")
+    assert not tracemalloc.is_tracing()
+
+
+def test_failing_node_still_reports_its_span():
+    def node(state):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError) as info:
+        traced("extract", node, memory=True)({"source_path": "doc.xlsx"})
+    assert not tracemalloc.is_tracing()
+    # Found through wrapping exceptions too
+    try:
+        raise RuntimeError("extract failed") from info.value
+    except RuntimeError as wrapped:
+        assert [span["node"] for span in error_spans(wrapped)] == ["extract"]
+
+
+def test_span_exports(tmp_path, run):
+    spans = run()["timings"]
+    assert "peak_alloc_bytes" not in spans[0]
+
+    trace = to_chrome_trace(spans)
+    assert {event["ph"] for event in trace["traceEvents"]} == {"X"}
+    assert len(trace["traceEvents"]) == len(spans)
+
+    prom = to_prometheus(spans)
+    assert 'piv_node_wall_seconds_count{node="extract"} 1' in prom
+    assert 'piv_node_cpu_seconds_bucket{node="format",le="+Inf"} 1' in prom
+
+    write_trace(spans, tmp_path / "trace.json")
+    assert json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    write_trace(spans, tmp_path / "nodes.prom")
+    assert (tmp_path / "nodes.prom").read_text() == prom
+
+
+def test_tracing_can_be_disabled(run):
+    assert not run(tracing=False).get("timings")